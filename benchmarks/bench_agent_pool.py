@@ -0,0 +1,126 @@
+"""Benchmark: per-request agent overhead with and without the agent pool.
+
+Measures what a dashboard request pays *before* inference starts:
+
+  before — create_timmy() on every request (the old chat_timmy path)
+  after  — agent_pool.lease() around each request
+
+The Ollama model is replaced with a stub so no server is needed and the
+numbers isolate construction overhead (Agent, model object, SqliteDb).
+When agno is not importable, Agent and SqliteDb are stubbed too, with the
+stub DB opening a real sqlite3 connection so the "before" path still
+pays a file handle per request.
+
+Usage:
+    python benchmarks/bench_agent_pool.py [--requests 200]
+"""
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+class StubModel:
+    """Stand-in for agno.models.ollama.Ollama — no network, no state."""
+
+    def __init__(self, id: str = "stub", **kwargs) -> None:
+        self.id = id
+
+
+class StubDb:
+    """Stand-in for agno.db.sqlite.SqliteDb when agno is unavailable."""
+
+    def __init__(self, db_file: str) -> None:
+        self._conn = sqlite3.connect(db_file)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY)")
+
+
+class StubAgent:
+    """Stand-in for agno.agent.Agent when agno is unavailable."""
+
+    def __init__(self, **kwargs) -> None:
+        self.__dict__.update(kwargs)
+
+
+def _real_agno_available() -> bool:
+    try:
+        from agno.agent import Agent  # noqa: F401
+        from agno.db.sqlite import SqliteDb  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def _install_stubs() -> None:
+    for mod in ["agno", "agno.agent", "agno.models", "agno.models.ollama",
+                "agno.db", "agno.db.sqlite"]:
+        sys.modules.setdefault(mod, MagicMock())
+
+
+def _timed(fn, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"  {label:<8} mean {statistics.mean(samples):8.3f} ms   "
+        f"p50 {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    real = _real_agno_available()
+    if not real:
+        _install_stubs()
+
+    import timmy.agent as agent_mod
+    from timmy.pool import AgentPool
+
+    db_file = str(Path(tempfile.mkdtemp()) / "bench.db")
+    stubs = {"Ollama": StubModel}
+    if not real:
+        stubs.update({"Agent": StubAgent, "SqliteDb": StubDb})
+
+    with patch.multiple(agent_mod, **stubs):
+        def before():
+            agent_mod.create_timmy(db_file=db_file, backend="ollama")
+
+        pool = AgentPool()
+
+        def after():
+            with pool.lease(db_file=db_file, backend="ollama",
+                            factory=agent_mod.create_timmy):
+                pass
+
+        before()  # import / first-touch warm-up outside the measurement
+        before_ms = _timed(before, args.requests)
+        after_ms = _timed(after, args.requests)
+
+    print(f"Agent acquisition overhead over {args.requests} requests "
+          f"({'real agno Agent + SqliteDb' if real else 'stubbed agno'}, stub model):")
+    _report("before", before_ms)
+    _report("after", after_ms)
+    print(f"  speedup  {statistics.mean(before_ms) / statistics.mean(after_ms):8.1f}x")
+    print(f"  pool     {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
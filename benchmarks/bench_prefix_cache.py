@@ -0,0 +1,115 @@
+"""Benchmark: prefill time per turn with and without prefix KV reuse.
+
+Drives a 10-turn conversation through TimmyAirLLMAgent with a stubbed
+model.  The stub charges a fixed cost per *uncached* prompt token — the
+shape of AirLLM's layer-by-layer prefill, where every prefix token costs
+a pass over the weights — and honours past_key_values the way HF
+generate() does, so the only variable is the agent's prefix cache.
+
+Usage:
+    python benchmarks/bench_prefix_cache.py [--ms-per-token 0.5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.modules.setdefault("airllm", MagicMock())
+
+QUESTIONS = [
+    "What is sovereignty?",
+    "How does Bitcoin relate to it?",
+    "Explain self-custody in one paragraph.",
+    "What is a hardware wallet?",
+    "How should I back up a seed phrase?",
+    "What is a multisig setup?",
+    "Why run your own node?",
+    "What does Lightning add on top?",
+    "How do L402 payments work?",
+    "Summarise everything we discussed.",
+]
+REPLY = "Sir, affirmative. Local keys, local node, local models — no permission needed."
+
+
+class _Ids(list):
+    @property
+    def shape(self):
+        return (len(self), len(self[0]))
+
+
+class _Cache:
+    def __init__(self, length: int) -> None:
+        self.length = length
+
+    def get_seq_length(self) -> int:
+        return self.length
+
+    def crop(self, length: int) -> None:
+        self.length = min(self.length, length)
+
+
+class StubModel:
+    """Word-level tokenizer + generate() that sleeps per uncached prompt token."""
+
+    def __init__(self, ms_per_token: float) -> None:
+        self._ms = ms_per_token
+        self._vocab: dict[str, int] = {}
+        self.prefill: list[tuple[int, int, float]] = []  # (prompt, computed, ms)
+        self.tokenizer = MagicMock(side_effect=self._tokenize)
+        self.tokenizer.decode.return_value = REPLY
+
+    def _ids(self, text: str) -> list[int]:
+        return [self._vocab.setdefault(w, len(self._vocab)) for w in text.split()]
+
+    def _tokenize(self, texts, **kwargs):
+        return {"input_ids": _Ids([self._ids(texts[0])])}
+
+    def generate(self, input_ids, past_key_values=None, **kwargs):
+        prompt = list(input_ids[0])
+        cached = past_key_values.get_seq_length() if past_key_values else 0
+        start = time.perf_counter()
+        time.sleep((len(prompt) - cached) * self._ms / 1000)
+        self.prefill.append((len(prompt), len(prompt) - cached,
+                             (time.perf_counter() - start) * 1000))
+        sequence = prompt + self._ids(REPLY)
+        return SimpleNamespace(sequences=[sequence],
+                               past_key_values=_Cache(len(sequence) - 1))
+
+
+def _conversation(cache_entries: int, ms_per_token: float) -> list[tuple[int, int, float]]:
+    with patch("timmy.backends.is_apple_silicon", return_value=False), \
+         patch("timmy.backends.settings.airllm_prefix_cache_entries", cache_entries):
+        from timmy.backends import TimmyAirLLMAgent
+        agent = TimmyAirLLMAgent(model_size="8b")
+    agent._model = StubModel(ms_per_token)
+    for question in QUESTIONS:
+        agent.run(question)
+    return agent._model.prefill
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ms-per-token", type=float, default=0.5,
+                        help="simulated prefill cost per uncached token")
+    args = parser.parse_args()
+
+    off = _conversation(0, args.ms_per_token)
+    on = _conversation(2, args.ms_per_token)
+
+    print(f"Prefill per turn, {args.ms_per_token} ms per uncached token (stub model):")
+    print(f"  {'turn':>4}  {'prompt':>6}  {'computed off':>12}  {'ms off':>8}"
+          f"  {'computed on':>11}  {'ms on':>8}")
+    for turn, ((p, c_off, ms_off), (_, c_on, ms_on)) in enumerate(zip(off, on), 1):
+        print(f"  {turn:>4}  {p:>6}  {c_off:>12}  {ms_off:>8.1f}  {c_on:>11}  {ms_on:>8.1f}")
+    total_off = sum(ms for *_, ms in off)
+    total_on = sum(ms for *_, ms in on)
+    print(f"  total prefill: {total_off:.1f} ms without cache, {total_on:.1f} ms with cache "
+          f"({total_off / total_on:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    # Ollama host — override with OLLAMA_URL env var or .env file
+    # Ollama host — override with OLLAMA_URL env var or .env file.
+    # Comma-separate several hosts to load-balance across them.
     ollama_url: str = "http://localhost:11434"
 
     # LLM model passed to Agno/Ollama — override with OLLAMA_MODEL
@@ -18,12 +19,153 @@ class Settings(BaseSettings):
     # "airllm"  — always use AirLLM (requires pip install ".[bigbrain]")
     # "auto"    — use AirLLM on Apple Silicon if airllm is installed,
     #             fall back to Ollama otherwise
-    timmy_model_backend: Literal["ollama", "airllm", "auto"] = "ollama"
+    # "cascade" — easy prompts on a small tier, hard ones on AirLLM at
+    #             airllm_model_size (see cascade_* below)
+    timmy_model_backend: Literal["ollama", "airllm", "auto", "cascade"] = "ollama"
 
     # AirLLM model size when backend is airllm or auto.
     # Larger = smarter, but needs more RAM / disk.
     # 8b  ~16 GB  |  70b  ~140 GB  |  405b  ~810 GB
-    airllm_model_size: Literal["8b", "70b", "405b"] = "70b"
+    # "auto" picks the largest size that fits airllm_auto_token_seconds
+    # on this machine (see timmy.profiles).
+    airllm_model_size: Literal["8b", "70b", "405b", "auto"] = "70b"
+
+    # AirLLM block-wise weight compression: "8bit" halves and "4bit"
+    # quarters the bytes read from disk per token, at some quality cost.
+    # "auto" picks the least compression that fits the per-token budget.
+    airllm_quantization: Literal["none", "8bit", "4bit", "auto"] = "none"
+
+    # Target seconds per generated token for "auto" size / quantization.
+    airllm_auto_token_seconds: float = 2.0
+
+    # Disk read throughput in MB/s used by the cost estimate.  0 measures
+    # it once next to the HuggingFace cache (kept in ~/.timmy/hardware.json).
+    airllm_disk_mbps: float = 0.0
+
+    # past_key_values kept for prompt-prefix reuse across AirLLM turns
+    # (system prompt + history).  0 disables the prefix cache.
+    airllm_prefix_cache_entries: int = 2
+
+    # Page cache: airllm_prewarm reads every layer shard ahead (up to half
+    # of RAM) when the agent is built; airllm_prefetch reads layer N+1 on a
+    # background thread while layer N computes.
+    airllm_prewarm: bool = False
+    airllm_prefetch: bool = True
+
+    # Micro-batching: concurrent AirLLM requests arriving within
+    # airllm_batch_wait_ms share one generate() call (and one pass over the
+    # layers on disk), up to airllm_max_batch_size.  1 disables batching.
+    airllm_max_batch_size: int = 1
+    airllm_batch_wait_ms: float = 25.0
+
+    # Cascade routing: prompts scoring at or above cascade_threshold (0–1,
+    # from NLU intent, length and keywords) go to the large AirLLM model,
+    # the rest to the small tier — Ollama or AirLLM 8B.  Prompts longer
+    # than cascade_max_easy_words words always count as hard.
+    cascade_small_tier: Literal["ollama", "8b"] = "ollama"
+    cascade_threshold: float = 0.5
+    cascade_max_easy_words: int = 40
+
+    # Unix socket for `timmy daemon`.  CLI commands that resolve to AirLLM
+    # use a daemon listening here instead of loading the model themselves.
+    timmy_daemon_socket: str = "~/.timmy/daemon.sock"
+
+    # ── Conversation context ─────────────────────────────────────────────────
+    # Token budget for history in each prompt (both backends).  The newest
+    # turns that fit are sent verbatim; older turns are folded into a
+    # rolling summary capped at context_summary_tokens.
+    context_budget_tokens: int = 1024
+    context_summary_tokens: int = 256
+
+    # ── Long-term memory ─────────────────────────────────────────────────────
+    # Opt-in (needs NumPy: pip install ".[memory]").  Every exchange is
+    # embedded into a local index; each prompt gets the memory_top_k most
+    # similar earlier exchanges (at least memory_min_score cosine similarity),
+    # within memory_budget_tokens taken from the context budget.
+    # "hashing" embeds locally with no model; "ollama" uses memory_embed_model.
+    memory_enabled: bool = False
+    memory_embedder: Literal["hashing", "ollama"] = "hashing"
+    memory_embed_model: str = "nomic-embed-text"
+    # <path>.f32 (memory-mapped vectors) + <path>.jsonl ("" = memory only).
+    memory_path: str = "data/memory"
+    # Ring size: past this, each new exchange replaces the oldest.
+    memory_max_entries: int = 10000
+    memory_top_k: int = 3
+    memory_min_score: float = 0.25
+    memory_budget_tokens: int = 256
+
+    # ── Agent pool ───────────────────────────────────────────────────────────
+    # Max live agents per (backend, model, size, db) key.  AirLLM keys are
+    # always capped at one — a second 70B copy would double RAM.
+    agent_pool_max_size: int = 4
+    # Seconds an idle pooled agent is kept warm before it is dropped.
+    agent_pool_idle_seconds: float = 600.0
+
+    # ── Inference executor ───────────────────────────────────────────────────
+    # Threads that run blocking agent.run() calls off the event loop.
+    inference_workers: int = 2
+    # Calls allowed to wait for a free worker before new ones get a 503.
+    inference_queue_size: int = 8
+    # Seconds suggested to clients in the Retry-After header of that 503.
+    inference_retry_after: int = 5
+
+    # ── Response cache ───────────────────────────────────────────────────────
+    # Opt-in: replies keyed by normalised prompt, backend, model and chat
+    # history are served from memory without running the model again.
+    response_cache_enabled: bool = False
+    response_cache_ttl_seconds: float = 3600.0
+    # Cap on cached prompt keys + replies held in memory (LRU beyond that).
+    response_cache_max_bytes: int = 4 * 1024 * 1024
+    # SQLite file for a persistent second tier ("" = memory only).
+    response_cache_db: str = ""
+
+    # ── Dashboard sessions ───────────────────────────────────────────────────
+    # Each browser (timmy_session cookie) gets its own chat history and, on
+    # the Ollama backend, its own agent.  At most dashboard_max_sessions stay
+    # in memory (least recently used out), idle ones leave after
+    # dashboard_session_idle_seconds; histories live on in this SQLite file
+    # and are reloaded on the next visit ("" = memory only).
+    dashboard_max_sessions: int = 64
+    dashboard_session_idle_seconds: float = 1800.0
+    dashboard_sessions_db: str = "data/sessions.db"
+    # Newest messages each live session keeps in memory, and messages per
+    # page of /agents/timmy/history (older pages are lazy-loaded on scroll).
+    dashboard_history_window: int = 200
+    dashboard_history_page: int = 50
+    # Compiled-template bytecode shared across restarts ("" = memory only).
+    dashboard_template_cache: str = "data/jinja-cache"
+    # Fingerprinted + gzip/brotli copies of static/, built at startup and
+    # served with Cache-Control: immutable ("" = serve static/ as-is).
+    dashboard_static_build: str = "data/static"
+
+    # ── Health probes ────────────────────────────────────────────────────────
+    # Ollama, the swarm database, Redis and TTS are probed together every
+    # health_probe_interval seconds, each under health_probe_timeout; the
+    # health endpoints serve that shared snapshot instead of probing.
+    health_probe_interval: float = 15.0
+    health_probe_timeout: float = 2.0
+
+    # ── Ollama load balancing ────────────────────────────────────────────────
+    # Seconds a host that failed (refused / reset / timed out) sits out
+    # before it is tried again.
+    ollama_eject_seconds: float = 30.0
+
+    # ── Ollama warm-up / keep-alive ──────────────────────────────────────────
+    # Preload ollama_model when the dashboard starts, so the first chat does
+    # not pay the model load.
+    ollama_warmup: bool = True
+    # How long Ollama keeps the model resident after each warm-up/keep-alive.
+    ollama_keep_alive: str = "10m"
+    # Seconds between keep-alive pings (0 disables).  Pings are only sent
+    # while someone has chatted or spoken to Timmy within ollama_active_window.
+    ollama_keepalive_interval: float = 240.0
+    ollama_active_window: float = 900.0
+
+    @property
+    def ollama_hosts(self) -> list[str]:
+        """ollama_url split into individual base URLs."""
+        hosts = [h.strip().rstrip("/") for h in self.ollama_url.split(",")]
+        return [h for h in hosts if h]
 
     model_config = SettingsConfigDict(
         env_file=".env",
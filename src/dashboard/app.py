@@ -1,10 +1,9 @@
+import asyncio
 import logging
-from pathlib import Path
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 
 from config import settings
 from dashboard.routes.agents import router as agents_router
@@ -16,6 +15,12 @@ from dashboard.routes.voice import router as voice_router
 from dashboard.routes.voice_enhanced import router as voice_enhanced_router
 from dashboard.routes.mobile import router as mobile_router
 from dashboard.routes.swarm_ws import router as swarm_ws_router
+from dashboard.assets import StaticAssets, build as build_assets
+from dashboard.probes import health_monitor
+from dashboard.sessions import SessionMiddleware
+from dashboard.templating import precompile, templates
+from timmy.agent import _resolve_backend
+from timmy.ollama_client import ollama_client
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,19 +29,67 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-BASE_DIR = Path(__file__).parent
-PROJECT_ROOT = BASE_DIR.parent.parent
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the Ollama client, build assets, compile templates; warm and probe in the background."""
+    await ollama_client.start()
+    build_assets()
+    precompile()
+    tasks: list[asyncio.Task] = [asyncio.create_task(health_monitor.run())]
+    backend = _resolve_backend(None)
+    if backend == "ollama" or (backend == "cascade" and settings.cascade_small_tier == "ollama"):
+        if settings.ollama_warmup:
+            tasks.append(asyncio.create_task(ollama_client.warm()))
+        if settings.ollama_keepalive_interval > 0:
+            tasks.append(asyncio.create_task(ollama_client.keep_alive_loop(
+                settings.ollama_keepalive_interval, settings.ollama_active_window,
+            )))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await ollama_client.close()
+
 
 app = FastAPI(
     title="Timmy Time — Mission Control",
     version="1.0.0",
+    lifespan=lifespan,
     # Docs disabled unless DEBUG=true in env / .env
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
 )
 
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
-app.mount("/static", StaticFiles(directory=str(PROJECT_ROOT / "static")), name="static")
+app.mount("/static", StaticAssets(), name="static")
+
+
+# Routes that mean someone is talking to Timmy.  Page loads, static files
+# and /health polling (the dashboard panel, uptime monitors) are not, or
+# the model would stay pinned for as long as any tab is open.
+_ACTIVITY_PREFIXES = ("/agents/timmy/chat", "/agents/timmy/stream", "/voice")
+
+
+class ActivityMiddleware:
+    """Marks chat, stream and voice requests as user activity (keep-alive).
+
+    Plain ASGI rather than @app.middleware so SSE streams and disconnect
+    detection pass through untouched.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(_ACTIVITY_PREFIXES):
+            ollama_client.touch()
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(ActivityMiddleware)
+app.add_middleware(SessionMiddleware)
 
 app.include_router(health_router)
 app.include_router(agents_router)
@@ -0,0 +1,169 @@
+"""Fingerprinted, precompressed static assets.
+
+/static used to serve ``static/style.css`` as-is: uncompressed and with no
+caching headers, so each page view on a phone downloaded it again.  build()
+(run at app startup, or ``python -m dashboard.assets``) copies every file
+under ``static/`` to DASHBOARD_STATIC_BUILD as ``<stem>.<sha256[:12]><suffix>``,
+next to ``.gz`` and — with the ``brotli`` package installed — ``.br``
+variants of text files, and records ``manifest.json`` (logical name →
+hashed name).
+
+Templates link through the ``static_url()`` Jinja global, which returns
+the hashed URL once a build exists (the plain one before).  StaticAssets
+serves a hashed name with ``Cache-Control: immutable`` — its content can
+never change — and picks the smallest variant the client's
+Accept-Encoding allows.  Everything else falls through to plain
+StaticFiles.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+from pathlib import Path
+from typing import Optional
+
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parent.parent.parent / "static"
+MANIFEST = "manifest.json"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_COMPRESSIBLE = {".css", ".js", ".mjs", ".svg", ".html", ".json", ".txt", ".map", ".xml"}
+# Server preference when the client accepts several encodings equally.
+_ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+_manifest: Optional[dict[str, str]] = None
+
+
+def _brotli():
+    try:
+        import brotli  # type: ignore[import]
+    except ImportError:
+        return None
+    return brotli
+
+
+def _build_dir() -> Optional[Path]:
+    return Path(settings.dashboard_static_build) if settings.dashboard_static_build else None
+
+
+def _write(path: Path, data: bytes) -> None:
+    """Write once — hashed names are content-addressed, so an existing file is correct."""
+    if path.exists():
+        return
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def build(source: Path = STATIC_DIR, out: Optional[Path] = None) -> dict[str, str]:
+    """Hash, copy and compress every file under ``source``; returns the manifest."""
+    global _manifest
+    out = out or _build_dir()
+    if out is None:
+        return {}
+    out.mkdir(parents=True, exist_ok=True)
+    brotli = _brotli()
+    manifest: dict[str, str] = {}
+    for path in sorted(p for p in source.rglob("*") if p.is_file()):
+        name = path.relative_to(source).as_posix()
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        hashed = path.relative_to(source).with_name(f"{path.stem}.{digest}{path.suffix}")
+        target = out / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _write(target, data)
+        if path.suffix in _COMPRESSIBLE:
+            variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants[".br"] = brotli.compress(data, quality=11)
+            for ext, packed in variants.items():
+                if len(packed) < len(data):
+                    _write(target.with_name(target.name + ext), packed)
+        manifest[name] = hashed.as_posix()
+    (out / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    _manifest = manifest
+    logger.info("Assets: %d static files fingerprinted into %s", len(manifest), out)
+    return manifest
+
+
+def manifest() -> dict[str, str]:
+    """Logical name → hashed name, from the last build (read once from disk)."""
+    global _manifest
+    if _manifest is None:
+        out = _build_dir()
+        try:
+            _manifest = json.loads((out / MANIFEST).read_text()) if out else {}
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def static_url(name: str) -> str:
+    """URL for a file under static/ — fingerprinted when a build exists."""
+    return f"/static/{manifest().get(name, name)}"
+
+
+def negotiate(accept_encoding: str, available: list[str]) -> Optional[str]:
+    """Best of ``available`` codings (in server preference order) for a header."""
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class StaticAssets(StaticFiles):
+    """StaticFiles that serves fingerprinted names immutable and precompressed."""
+
+    def __init__(self, directory: Path = STATIC_DIR, **kwargs) -> None:
+        super().__init__(directory=str(directory), **kwargs)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        out = _build_dir()
+        name = path.replace("\\", "/")
+        if out is None or scope["method"] not in ("GET", "HEAD") \
+                or name not in manifest().values():
+            return await super().get_response(path, scope)
+
+        target = out / name
+        accept = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+        available = [c for c, ext in _ENCODINGS.items()
+                     if target.with_name(target.name + ext).exists()]
+        encoding = negotiate(accept, available) if available else None
+        headers = {"Cache-Control": IMMUTABLE, "Vary": "Accept-Encoding"}
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            target = target.with_name(target.name + _ENCODINGS[encoding])
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return FileResponse(target, media_type=media_type, headers=headers)
+
+
+if __name__ == "__main__":
+    for logical, hashed in build().items():
+        print(f"{logical} → {hashed}")
@@ -0,0 +1,81 @@
+"""Client-disconnect detection for long-running route handlers.
+
+Starlette keeps running an ``async def`` handler after the client has
+gone — a closed tab, or HTMX aborting a request it replaced — so a chat
+turn would generate a whole answer nobody reads.  until_disconnected()
+races the work against the ASGI ``http.disconnect`` message and cancels
+the work when the client leaves first.  For inference_executor.run that
+also sets the call's cancel event, which stops generation between tokens.
+ClosingStreamingResponse covers streamed replies, including a client that
+leaves before the first chunk.
+
+Usage:
+    try:
+        text = await until_disconnected(request, inference_executor.run(fn, msg, cancel=ev))
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+T = TypeVar("T")
+
+# Non-standard status (popularised by nginx) for "client closed request";
+# nobody receives it, but it marks abandoned turns in the access log.
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready."""
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # The form body has already been read, so the next message the server
+    # delivers is http.disconnect — sent when the client leaves, or once
+    # the response has been sent (by then this task is cancelled).
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def until_disconnected(request: Request, work: Awaitable[T]) -> T:
+    """Await ``work``, or cancel it and raise ClientDisconnected if the client leaves."""
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    if not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        raise ClientDisconnected()
+    return task.result()
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """StreamingResponse that calls ``on_close`` however the response ends.
+
+    The body iterator's own cleanup only runs once Starlette has started
+    iterating it.  A client that leaves while the response is still
+    starting would otherwise leave its generation running.
+    """
+
+    def __init__(self, content: Any, *, on_close: Optional[Callable[[], None]] = None,
+                 **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self._on_close is not None:
+                self._on_close()
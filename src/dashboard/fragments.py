@@ -0,0 +1,53 @@
+"""Rendered HTML for chat messages, cached on the message itself.
+
+A message never changes once appended, so its ``partials/message.html``
+fragment is rendered once — when the message enters a session's log (see
+SessionStore's ``render`` hook) — and kept on ``Message.html`` for as long
+as the message stays in the ring.  /agents/timmy/history then only
+concatenates fragments; messages paged in from SQLite are rendered on
+demand.
+
+The same immutability makes history pages cheap to validate: the ids of
+the first and last message on a page identify its content, so
+history_etag() lets the browser revalidate with If-None-Match and get a
+304 when nothing was appended.
+"""
+
+import uuid
+from typing import Iterable
+
+from markupsafe import Markup
+
+from dashboard.store import Message
+from dashboard.templating import templates
+
+# Ids restart with a memory-only store, and templates change on deploy —
+# tie every ETag to this process so a restart never revalidates stale HTML.
+_BOOT = uuid.uuid4().hex[:8]
+
+
+def render_message(message: Message) -> Markup:
+    """Render one message bubble."""
+    return Markup(templates.get_template("partials/message.html").render(msg=message))
+
+
+def fragment(message: Message) -> Markup:
+    """The message's cached fragment, rendering (and caching) it on a miss."""
+    if message.html is None:
+        message.html = render_message(message)
+    return message.html
+
+
+def history_etag(messages: list[Message], more: bool) -> str:
+    """Strong ETag for a page of history — first and last id, count, more-flag."""
+    first = messages[0].id if messages else 0
+    last = messages[-1].id if messages else 0
+    return f'"{_BOOT}.{first}.{last}.{len(messages)}.{int(more)}"'
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header."""
+    if if_none_match.strip() == "*":
+        return True
+    tags: Iterable[str] = (t.strip() for t in if_none_match.split(","))
+    return etag in (t[2:] if t.startswith("W/") else t for t in tags)
@@ -0,0 +1,180 @@
+"""Shared, cached dependency health for every health endpoint.
+
+Each open dashboard tab polls /health/status, phones poll /mobile/status
+and monitors hit /health — and each used to probe Ollama itself.  The
+HealthMonitor probes every registered dependency once per interval, all
+probes concurrently and each under its own timeout, and the endpoints
+read the latest HealthSnapshot in O(1).  N clients cost one probe.
+
+A snapshot older than twice the interval (the background loop is not
+running, or has not run yet) is refreshed on demand; concurrent callers
+share that one refresh (single flight).
+
+A probe is a callable returning True (up), False (down) or None (off —
+not configured, e.g. Redis when SwarmComms runs its in-memory fallback).
+Coroutine functions are awaited; plain functions run on a worker thread.
+An exception or timeout counts as down, with the reason in ``detail``.
+
+Usage:
+    health_monitor.register("ollama", check_ollama)
+    snapshot = await health_monitor.snapshot()
+    snapshot.status("ollama")      # "up" | "down" | "off"
+"""
+
+import asyncio
+import inspect
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProbeResult:
+    status: str                      # "up" | "down" | "off"
+    latency_ms: float = 0.0
+    detail: str = ""
+
+
+@dataclass
+class HealthSnapshot:
+    probes: dict[str, ProbeResult] = field(default_factory=dict)
+    taken_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    def status(self, name: str) -> str:
+        probe = self.probes.get(name)
+        return "down" if probe is None else probe.status
+
+    def up(self, name: str) -> bool:
+        return self.status(name) == "up"
+
+    def as_dict(self) -> dict:
+        return {
+            "age_s": round(self.age, 3),
+            "probes": {
+                name: {"status": p.status, "latency_ms": round(p.latency_ms, 1), "detail": p.detail}
+                for name, p in self.probes.items()
+            },
+        }
+
+
+class HealthMonitor:
+    """Runs registered probes on a schedule and serves the latest snapshot."""
+
+    def __init__(self, interval: float = 15.0, timeout: float = 2.0) -> None:
+        self._interval = interval
+        self._timeout = timeout
+        self._probes: dict[str, tuple[Callable[[], Any], float]] = {}
+        self._snapshot: Optional[HealthSnapshot] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self.refreshes = 0
+
+    def register(
+        self, name: str, probe: Callable[[], Any], timeout: Optional[float] = None
+    ) -> None:
+        self._probes[name] = (probe, timeout or self._timeout)
+
+    # ── reading ──────────────────────────────────────────────────────────────
+
+    async def snapshot(self) -> HealthSnapshot:
+        """The cached snapshot, refreshed first only when missing or stale."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.age <= 2 * self._interval:
+            return snapshot
+        return await self.refresh()
+
+    async def refresh(self) -> HealthSnapshot:
+        """Probe everything now; callers arriving mid-probe share the result."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._probe_all())
+        return await asyncio.shield(self._inflight)
+
+    async def run(self) -> None:
+        """Background schedule — refresh every interval until cancelled."""
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.refresh()
+            except Exception as exc:
+                logger.warning("Health: refresh failed — %s", exc)
+
+    def clear(self) -> None:
+        self._snapshot = None
+        self._inflight = None
+
+    # ── probing ──────────────────────────────────────────────────────────────
+
+    async def _probe_all(self) -> HealthSnapshot:
+        names = list(self._probes)
+        results = await asyncio.gather(*(self._probe(*self._probes[n]) for n in names))
+        snapshot = HealthSnapshot(dict(zip(names, results)))
+        self._snapshot = snapshot
+        self.refreshes += 1
+        return snapshot
+
+    async def _probe(self, probe: Callable[[], Any], timeout: float) -> ProbeResult:
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(probe):
+                call = probe()
+            else:
+                call = asyncio.to_thread(probe)
+            ok = await asyncio.wait_for(call, timeout)
+            status, detail = ("off", "") if ok is None else ("up" if ok else "down", "")
+        except asyncio.TimeoutError:
+            status, detail = "down", f"timed out after {timeout:g}s"
+        except Exception as exc:
+            status, detail = "down", str(exc) or type(exc).__name__
+        return ProbeResult(status, (time.perf_counter() - start) * 1000, detail)
+
+
+# ── dependency probes ────────────────────────────────────────────────────────
+
+def probe_swarm_db() -> bool:
+    """The swarm registry / task database exists and answers a query.
+
+    Opened read-only: a plain connect() would create a missing file and
+    report it healthy.  The query reads the schema, so a file that is not
+    a database fails too.
+    """
+    from swarm.registry import DB_PATH
+
+    uri = DB_PATH.resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, timeout=settings.health_probe_timeout)
+    try:
+        conn.execute("SELECT count(*) FROM sqlite_master").fetchone()
+    finally:
+        conn.close()
+    return True
+
+
+def probe_redis() -> Optional[bool]:
+    """SwarmComms' Redis answers PING; None when running the in-memory fallback."""
+    from swarm.coordinator import coordinator
+
+    if not coordinator.comms.connected:
+        return None
+    return coordinator.comms.ping()
+
+
+def probe_tts() -> bool:
+    """A pyttsx3 engine initialised (False on headless or audio-less hosts)."""
+    from timmy_serve.voice_tts import voice_tts
+
+    return voice_tts.available
+
+
+# Module-level singleton shared across the app
+health_monitor = HealthMonitor(
+    interval=settings.health_probe_interval,
+    timeout=settings.health_probe_timeout,
+)
@@ -1,15 +1,26 @@
+import threading
+import uuid
 from datetime import datetime
-from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional
 
-from fastapi import APIRouter, Form, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Form, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, Response
 
+from config import settings
 from timmy.agent import create_timmy
-from dashboard.store import message_log
+from timmy.inference import InferenceQueueFull, inference_executor, until_cancelled
+from timmy.response_cache import history_fingerprint, response_cache
+from dashboard.fragments import etag_matches, fragment, history_etag
+from dashboard.disconnect import (
+    CLIENT_CLOSED_REQUEST,
+    ClientDisconnected,
+    ClosingStreamingResponse,
+    until_disconnected,
+)
+from dashboard.sessions import Session, current_session, session_store
+from dashboard.templating import templates
 
 router = APIRouter(prefix="/agents", tags=["agents"])
-templates = Jinja2Templates(directory=str(Path(__file__).parent.parent / "templates"))
 
 AGENT_REGISTRY = {
     "timmy": {
@@ -22,6 +33,12 @@ AGENT_REGISTRY = {
     }
 }
 
+# Messages posted to /timmy/chat/stream, waiting for their EventSource to
+# connect.  Keyed by a one-shot stream id handed back in the partial.
+# Bounded so abandoned streams (tab closed before connecting) can't pile up.
+_pending_streams: dict[str, tuple[str, str, str]] = {}
+_MAX_PENDING_STREAMS = 64
+
 
 @router.get("")
 async def list_agents():
@@ -29,42 +46,118 @@ async def list_agents():
 
 
 @router.get("/timmy/history", response_class=HTMLResponse)
-async def get_history(request: Request):
+async def get_history(
+    request: Request,
+    before: Optional[int] = Query(None, ge=1),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+):
+    """The newest page of the conversation, or the page before message ``before``.
+
+    A page that is not the first starts with a sentinel that fetches the
+    next older page when scrolled into view.  Messages are immutable, so
+    the page is assembled from cached fragments and answered with 304 when
+    the browser's ETag still matches.
+    """
+    limit = limit or settings.dashboard_history_page
+    messages = current_session(request).log.page(before, limit + 1)
+    more = len(messages) > limit
+    messages = messages[-limit:]
+    headers = {
+        "ETag": history_etag(messages, more),
+        "Cache-Control": "private, no-cache",
+        "Vary": "Cookie",
+    }
+    if etag_matches(headers["ETag"], request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
     return templates.TemplateResponse(
         request,
         "partials/history.html",
-        {"messages": message_log.all()},
+        {
+            "fragments": [fragment(m) for m in messages],
+            "older": before is not None,
+            "next_before": messages[0].id if more else None,
+            "limit": limit,
+        },
+        headers=headers,
     )
 
 
 @router.delete("/timmy/history", response_class=HTMLResponse)
 async def clear_history(request: Request):
-    message_log.clear()
+    session_store.forget(current_session(request))
     return templates.TemplateResponse(
         request,
         "partials/history.html",
-        {"messages": []},
+        {"fragments": []},
     )
 
 
+def _ask_timmy(
+    message: str, session: Session, cancel: Optional[threading.Event] = None
+) -> str:
+    """Blocking chat turn — runs on the inference executor, never the event loop.
+
+    Streams under the hood so a disconnect (``cancel`` set) stops
+    generation between tokens instead of after the whole reply.
+    """
+    return "".join(_stream_timmy(message, session, cancel))
+
+
+def _cache_key(message: str, session: Session) -> str:
+    """Response-cache key: the reply depends on the conversation so far."""
+    return response_cache.key_for(message, history=history_fingerprint(session.log.all()))
+
+
+def _stream_timmy(
+    message: str, session: Session, cancel: Optional[threading.Event] = None
+) -> Iterator[str]:
+    """Blocking token generator — iterated on the inference executor."""
+    with session_store.agent(session, factory=create_timmy) as agent:
+        for chunk in until_cancelled(agent.run(message, stream=True), cancel):
+            text = getattr(chunk, "content", None)
+            if isinstance(text, str) and text:
+                yield text
+
+
 @router.post("/timmy/chat", response_class=HTMLResponse)
 async def chat_timmy(request: Request, message: str = Form(...)):
     timestamp = datetime.now().strftime("%H:%M:%S")
-    response_text = None
+    session = current_session(request)
+    cache_key = _cache_key(message, session)
+    response_text = response_cache.get(cache_key)
     error_text = None
 
     try:
-        agent = create_timmy()
-        run = agent.run(message, stream=False)
-        response_text = run.content if hasattr(run, "content") else str(run)
+        if response_text is None:
+            response_text = await until_disconnected(
+                request, inference_executor.run(_ask_timmy, message, session, cancel=threading.Event())
+            )
+            response_cache.put(cache_key, response_text)
+    except ClientDisconnected:
+        # Generation was stopped; nobody is left to read a reply.
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except InferenceQueueFull as exc:
+        # Not logged to history — the message was never processed.
+        return templates.TemplateResponse(
+            request,
+            "partials/chat_message.html",
+            {
+                "user_message": message,
+                "response": None,
+                "error": f"Timmy is busy — try again in {exc.retry_after}s.",
+                "timestamp": timestamp,
+            },
+            status_code=503,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
     except Exception as exc:
         error_text = f"Timmy is offline: {exc}"
 
-    message_log.append(role="user", content=message, timestamp=timestamp)
+    session.log.append(role="user", content=message, timestamp=timestamp)
     if response_text is not None:
-        message_log.append(role="agent", content=response_text, timestamp=timestamp)
+        session.log.append(role="agent", content=response_text, timestamp=timestamp)
     else:
-        message_log.append(role="error", content=error_text, timestamp=timestamp)
+        session.log.append(role="error", content=error_text, timestamp=timestamp)
 
     return templates.TemplateResponse(
         request,
@@ -76,3 +169,86 @@ async def chat_timmy(request: Request, message: str = Form(...)):
             "timestamp": timestamp,
         },
     )
+
+
+def _sse(event: str, data: str) -> str:
+    """Format one Server-Sent Event; multi-line data becomes several data: lines."""
+    lines = "".join(f"data: {line}\n" for line in data.split("\n"))
+    return f"event: {event}\n{lines}\n"
+
+
+@router.post("/timmy/chat/stream", response_class=HTMLResponse)
+async def chat_timmy_stream(request: Request, message: str = Form(...)):
+    """Render the user message plus an empty agent bubble wired to an SSE feed."""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    stream_id = uuid.uuid4().hex
+    while len(_pending_streams) >= _MAX_PENDING_STREAMS:
+        _pending_streams.pop(next(iter(_pending_streams)))
+    _pending_streams[stream_id] = (message, timestamp, request.state.session_id)
+    return templates.TemplateResponse(
+        request,
+        "partials/chat_stream.html",
+        {
+            "user_message": message,
+            "timestamp": timestamp,
+            "stream_url": f"/agents/timmy/stream/{stream_id}",
+        },
+    )
+
+
+@router.get("/timmy/stream/{stream_id}")
+async def stream_timmy(stream_id: str):
+    """Stream Timmy's reply as `token` events, then a final `done` or `error`.
+
+    Generation runs on the inference executor; a full queue answers 503
+    before the event stream opens.  A response-cache hit is sent as one
+    token without queueing.
+    """
+    pending = _pending_streams.pop(stream_id, None)
+    if pending is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired stream")
+    message, timestamp, session_id = pending
+    session = session_store.get(session_id)
+    cache_key = _cache_key(message, session)
+    cached = response_cache.get(cache_key)
+
+    async def replay() -> AsyncIterator[str]:
+        yield cached
+
+    on_close = None
+    if cached is not None:
+        chunks = replay()
+    else:
+        try:
+            chunks = inference_executor.stream(_stream_timmy, message, session)
+        except InferenceQueueFull as exc:
+            return Response(status_code=503, headers={"Retry-After": str(exc.retry_after)})
+        # Stops generation even if the client leaves before the first event.
+        on_close = chunks.cancel
+
+    async def events() -> AsyncIterator[str]:
+        pieces: list[str] = []
+        try:
+            async for text in chunks:
+                pieces.append(text)
+                yield _sse("token", text)
+        except Exception as exc:
+            error_text = f"Timmy is offline: {exc}"
+            session.log.append(role="user", content=message, timestamp=timestamp)
+            session.log.append(role="error", content=error_text, timestamp=timestamp)
+            yield _sse("error", error_text)
+            return
+
+        response_text = "".join(pieces)
+        if cached is None:
+            response_cache.put(cache_key, response_text)
+        session.log.append(role="user", content=message, timestamp=timestamp)
+        session.log.append(role="agent", content=response_text, timestamp=timestamp)
+        yield _sse("done", "")
+
+    return ClosingStreamingResponse(
+        events(),
+        on_close=on_close,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
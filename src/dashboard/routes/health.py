@@ -1,42 +1,65 @@
-import httpx
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
-from pathlib import Path
 
 from config import settings
+from dashboard.probes import health_monitor, probe_redis, probe_swarm_db, probe_tts
+from dashboard.sessions import session_store
+from dashboard.templating import templates
+from timmy.balancer import ollama_balancer
+from timmy.inference import inference_executor
+from timmy.ollama_client import ollama_client
+from timmy.response_cache import response_cache
 
 router = APIRouter(tags=["health"])
-templates = Jinja2Templates(directory=str(Path(__file__).parent.parent / "templates"))
 
 
 async def check_ollama() -> bool:
-    """Ping Ollama to verify it's running."""
-    try:
-        async with httpx.AsyncClient(timeout=2.0) as client:
-            r = await client.get(settings.ollama_url)
-            return r.status_code == 200
-    except Exception:
-        return False
+    """Ping Ollama to verify it's running (over the shared keep-alive client)."""
+    return await ollama_client.ping()
+
+
+async def _probe_ollama() -> bool:
+    return await check_ollama()
+
+
+health_monitor.register("ollama", _probe_ollama)
+health_monitor.register("swarm_db", probe_swarm_db)
+health_monitor.register("redis", probe_redis)
+health_monitor.register("tts", probe_tts)
 
 
 @router.get("/health")
 async def health():
-    ollama_ok = await check_ollama()
+    snapshot = await health_monitor.snapshot()
     return {
         "status": "ok",
-        "services": {
-            "ollama": "up" if ollama_ok else "down",
-        },
+        "services": {name: snapshot.status(name) for name in snapshot.probes},
+        "health": snapshot.as_dict(),
+        "ollama_hosts": ollama_balancer.stats(),
         "agents": ["timmy"],
+        "inference": inference_executor.stats(),
+        "ollama": ollama_client.stats(),
+        "response_cache": response_cache.stats(),
+        "sessions": session_store.stats(),
     }
 
 
 @router.get("/health/status", response_class=HTMLResponse)
 async def health_status(request: Request):
-    ollama_ok = await check_ollama()
+    snapshot = await health_monitor.snapshot()
     return templates.TemplateResponse(
         request,
         "partials/health_status.html",
-        {"ollama": ollama_ok, "model": settings.ollama_model},
+        {
+            "ollama": snapshot.up("ollama"),
+            "services": {
+                "SWARM DB": snapshot.status("swarm_db"),
+                "REDIS": snapshot.status("redis"),
+                "TTS": snapshot.status("tts"),
+            },
+            "age": snapshot.age,
+            "model": settings.ollama_model,
+            "latency": ollama_client.stats(),
+            "hosts": ollama_balancer.stats(),
+        },
     )
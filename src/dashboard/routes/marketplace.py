@@ -5,14 +5,10 @@ pricing.  Other agents (or the user) can browse available agents
 and hire them for tasks via Lightning payments.
 """
 
-from pathlib import Path
-
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 router = APIRouter(tags=["marketplace"])
-templates = Jinja2Templates(directory=str(Path(__file__).parent.parent / "templates"))
 
 # ── Agent catalog ────────────────────────────────────────────────────────────
 # These are the planned sub-agent personas from the roadmap.
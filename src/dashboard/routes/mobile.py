@@ -5,14 +5,12 @@ prioritizes the chat interface and essential status information.
 Designed for quick access from a phone's home screen.
 """
 
-from pathlib import Path
-
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+
+from dashboard.templating import templates
 
 router = APIRouter(tags=["mobile"])
-templates = Jinja2Templates(directory=str(Path(__file__).parent.parent / "templates"))
 
 
 @router.get("/mobile", response_class=HTMLResponse)
@@ -29,13 +27,14 @@ async def mobile_dashboard(request: Request):
 @router.get("/mobile/status")
 async def mobile_status():
     """Lightweight status endpoint optimized for mobile polling."""
-    from dashboard.routes.health import check_ollama
+    from dashboard.probes import health_monitor
     from config import settings
 
-    ollama_ok = await check_ollama()
+    snapshot = await health_monitor.snapshot()
     return {
-        "ollama": "up" if ollama_ok else "down",
+        "ollama": snapshot.status("ollama"),
         "model": settings.ollama_model,
         "agent": "timmy",
         "ready": True,
+        "age_s": round(snapshot.age, 3),
     }
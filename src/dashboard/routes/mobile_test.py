@@ -7,14 +7,12 @@ each one PASS / FAIL / SKIP.  Results are stored in sessionStorage so they
 survive page scrolling without hitting the server.
 """
 
-from pathlib import Path
-
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+
+from dashboard.templating import templates
 
 router = APIRouter(tags=["mobile-test"])
-templates = Jinja2Templates(directory=str(Path(__file__).parent.parent / "templates"))
 
 # ── Test scenarios ────────────────────────────────────────────────────────────
 # Each dict: id, category, title, steps (list), expected
@@ -4,18 +4,16 @@ Provides REST endpoints for managing the swarm: listing agents,
 spawning sub-agents, posting tasks, and viewing auction results.
 """
 
-from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, Form, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 from swarm.coordinator import coordinator
 from swarm.tasks import TaskStatus
+from dashboard.templating import templates
 
 router = APIRouter(prefix="/swarm", tags=["swarm"])
-templates = Jinja2Templates(directory=str(Path(__file__).parent.parent / "templates"))
 
 
 @router.get("")
@@ -28,8 +26,9 @@ async def swarm_status():
 async def swarm_live_page(request: Request):
     """Render the live swarm dashboard page."""
     return templates.TemplateResponse(
+        request,
         "swarm_live.html",
-        {"request": request, "page_title": "Swarm Live"},
+        {"page_title": "Swarm Live"},
     )
 
 
@@ -6,20 +6,42 @@ the appropriate handler, and optionally speaks the response.
 """
 
 import logging
+import threading
 from typing import Optional
 
-from fastapi import APIRouter, Form
+from fastapi import APIRouter, Form, Request
+from fastapi.responses import JSONResponse, Response
 
+from dashboard.disconnect import CLIENT_CLOSED_REQUEST, ClientDisconnected, until_disconnected
+from dashboard.sessions import session_store
 from voice.nlu import detect_intent
 from timmy.agent import create_timmy
+from timmy.inference import InferenceQueueFull, inference_executor, until_cancelled
+from timmy.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/voice/enhanced", tags=["voice-enhanced"])
 
 
+def _ask_timmy(text: str, cancel: Optional[threading.Event] = None) -> str:
+    """Blocking one-shot turn, free of any chat history — runs on the inference executor.
+
+    Streams under the hood so a disconnect (``cancel`` set) stops
+    generation between tokens.
+    """
+    pieces = []
+    with session_store.one_shot(factory=create_timmy) as agent:
+        for chunk in until_cancelled(agent.run(text, stream=True), cancel):
+            content = getattr(chunk, "content", None)
+            if isinstance(content, str):
+                pieces.append(content)
+    return "".join(pieces)
+
+
 @router.post("/process")
 async def process_voice_input(
+    request: Request,
     text: str = Form(...),
     speak_response: bool = Form(False),
 ):
@@ -56,11 +78,31 @@ async def process_voice_input(
             response_text = "Voice settings acknowledged. TTS is available for spoken responses."
 
         else:
-            # Default: chat with Timmy
-            agent = create_timmy()
-            run = agent.run(text, stream=False)
-            response_text = run.content if hasattr(run, "content") else str(run)
-
+            # Default: chat with Timmy.  Voice turns are one-shot questions
+            # answered without any chat history, so the cache key carries
+            # none and repeats hit.
+            cache_key = response_cache.key_for(text)
+            response_text = response_cache.get(cache_key)
+            if response_text is None:
+                response_text = await until_disconnected(
+                    request, inference_executor.run(_ask_timmy, text, cancel=threading.Event())
+                )
+                response_cache.put(cache_key, response_text)
+
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except InferenceQueueFull as exc:
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": str(exc.retry_after)},
+            content={
+                "intent": intent.name,
+                "confidence": intent.confidence,
+                "response": None,
+                "error": str(exc),
+                "spoken": False,
+            },
+        )
     except Exception as exc:
         error = f"Processing failed: {exc}"
         logger.error("Voice processing error: %s", exc)
@@ -0,0 +1,449 @@
+"""Per-browser chat sessions for the dashboard.
+
+One process-wide MessageLog and one pooled agent meant every visitor saw
+(and fed into the model's context) everybody else's conversation.  Each
+browser now carries a ``timmy_session`` cookie and gets its own Session:
+
+  * its own chat history, written through to SQLite as it grows;
+  * on the Ollama backend, its own agent (cheap to build — Ollama holds
+    the model) with its own context window and Agno session id;
+  * on AirLLM, where one loaded model is all RAM allows, the pooled agent
+    is re-seeded with the session's history whenever it changes hands.
+    CascadeRouter re-seeds each tier agent the same way; BatchScheduler,
+    shared by every session at once, gives each its own Conversation.
+
+An agent is re-seeded whenever it does not hold all of the session's
+turns: it last served another session, or the session gained an exchange
+it never saw (a response-cache hit, a turn answered by the other tier).
+
+At most ``max_live`` sessions stay in memory, least recently used first
+out; sessions idle for ``idle_seconds`` are dropped too.  Dropping costs
+nothing — the history is already on disk — and the next request from that
+browser rehydrates the log and, lazily, a fresh agent seeded from it.
+Eviction is lazy, on the next lookup — no background thread.
+
+Each live log holds only the newest ``window`` messages; the SQLite row id
+doubles as the message id, so SessionLog.page() serves older pages
+straight from disk when the ring runs out.
+
+Usage:
+    session = current_session(request)
+    with session_store.agent(session, factory=create_timmy) as agent:
+        ...
+    session.log.append(role="user", content=msg, timestamp=ts)
+"""
+
+import itertools
+import logging
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+
+from config import settings
+from dashboard.fragments import render_message
+from dashboard.store import Message, MessageLog
+from timmy.inference import GenerationCancelled
+
+logger = logging.getLogger(__name__)
+
+SESSION_COOKIE = "timmy_session"
+_COOKIE_MAX_AGE = 30 * 24 * 3600
+_SESSION_ID = re.compile(r"[0-9a-f]{32}")
+
+
+def exchanges(messages: list[Message]) -> list[tuple[str, str]]:
+    """(user, agent) pairs from a log — errors and unanswered turns skipped."""
+    pairs = []
+    for prev, msg in zip(messages, messages[1:]):
+        if prev.role == "user" and msg.role == "agent":
+            pairs.append((prev.content, msg.content))
+    return pairs
+
+
+def _restore(agent: Any, pairs: list[tuple[str, str]]) -> None:
+    restore = getattr(agent, "restore", None)
+    if callable(restore):
+        restore(pairs)
+
+
+@contextmanager
+def _synced(agent: Any, session: "Session") -> Iterator[Any]:
+    """Hold ``agent`` for one of ``session``'s turns, re-seeding it if it is behind.
+
+    The agent is tagged with the session and the number of turns it holds;
+    a turn that completes adds one, so it stays in step with the log as
+    long as every answer it gives is recorded there.
+    """
+    turns = session.log.turns
+    if getattr(agent, "session_id", None) != session.id or \
+            getattr(agent, "session_turns", None) != turns:
+        _restore(agent, exchanges(session.log.all()))
+        agent.session_id = session.id
+        agent.session_turns = turns
+    agent.memory_scope = session.id
+    yield agent
+    agent.session_turns = turns + 1
+
+
+@contextmanager
+def _blank(agent: Any) -> Iterator[Any]:
+    """Hold ``agent`` for a one-shot turn: empty conversation, no session's, no memory."""
+    _restore(agent, [])
+    agent.session_id = None
+    agent.session_turns = None
+    agent.memory_scope = None
+    yield agent
+
+
+@contextmanager
+def _synced_turn(agent: Any, session: "Session") -> Iterator[Any]:
+    """_synced() for a pooled agent; a shared BatchScheduler gets the session's Conversation.
+
+    Other shared agents hold no per-caller history and are used as they are.
+    """
+    if getattr(agent, "shared", False) is not True:
+        with _synced(agent, session):
+            yield agent
+    elif callable(getattr(agent, "conversation", None)):
+        with _synced(agent.conversation(session.id), session) as conversation:
+            yield conversation
+    else:
+        yield agent
+
+
+@contextmanager
+def _blank_turn(agent: Any) -> Iterator[Any]:
+    """_blank() for a pooled agent; a shared BatchScheduler gets a fresh Conversation."""
+    if getattr(agent, "shared", False) is not True:
+        with _blank(agent):
+            yield agent
+    elif callable(getattr(agent, "conversation", None)):
+        with _blank(agent.conversation(None)) as conversation:
+            yield conversation
+    else:
+        yield agent
+
+
+class SessionLog(MessageLog):
+    """A MessageLog that writes every change through to the session store."""
+
+    def __init__(
+        self,
+        store: "SessionStore",
+        session_id: str,
+        entries: list[Message],
+        max_entries: int = 200,
+        render: Optional[Callable[[Message], str]] = None,
+    ) -> None:
+        super().__init__(max_entries, render)
+        self._store = store
+        self._session_id = session_id
+        # Answered turns so far (counted from the loaded window on rehydrate).
+        self.turns = len(exchanges(entries))
+        for message in entries:
+            self._add(message)
+
+    def append(self, role: str, content: str, timestamp: str) -> Message:
+        with self._lock:
+            row_id = self._store._db_append(self._session_id, role, content, timestamp)
+            if role == "agent":
+                self.turns += 1
+            return self._add(Message(role, content, timestamp, id=row_id))
+
+    def page(self, before: Optional[int] = None, limit: int = 50) -> list[Message]:
+        """Like MessageLog.page(), reading past the ring from SQLite."""
+        messages = super().page(before, limit)
+        if len(messages) < limit:
+            oldest = messages[0].id if messages else before
+            messages = self._store._db_page(
+                self._session_id, oldest, limit - len(messages)
+            ) + messages
+        return messages
+
+    def clear(self) -> None:
+        super().clear()
+        self.turns = 0
+        self._store._db_delete(self._session_id)
+
+
+@dataclass
+class Session:
+    id: str
+    log: SessionLog
+    agent: Any = None
+    last_used: float = field(default_factory=time.monotonic)
+    # Serialises turns: one browser, two tabs, one (non-thread-safe) agent.
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SessionStore:
+    """LRU of live sessions in front of a SQLite table of their histories."""
+
+    def __init__(
+        self,
+        max_live: int = 64,
+        idle_seconds: float = 1800.0,
+        db_path: Optional[str] = None,
+        window: int = 200,
+        render: Optional[Callable[[Message], str]] = None,
+    ) -> None:
+        self._max_live = max(1, max_live)
+        self._idle_seconds = idle_seconds
+        self._window = max(1, window)
+        self._render = render
+        self._live: OrderedDict[str, Session] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_path = db_path or None
+        self._conn: Optional[sqlite3.Connection] = None
+        # Message ids without a database: store-wide, so a session evicted
+        # and recreated never reuses an id (and a stale history ETag).
+        self._ids = itertools.count(1)
+        self.created = 0
+        self.rehydrated = 0
+        self.evicted = 0
+
+    # ── lookup ───────────────────────────────────────────────────────────────
+
+    def get(self, session_id: str) -> Session:
+        """Return the live session, rehydrating or creating it on a miss."""
+        with self._lock:
+            session = self._live.get(session_id)
+            if session is None:
+                entries = self._db_load(session_id)
+                if entries:
+                    self.rehydrated += 1
+                else:
+                    self.created += 1
+                session = Session(
+                    session_id, SessionLog(self, session_id, entries, self._window, self._render)
+                )
+                self._live[session_id] = session
+            self._live.move_to_end(session_id)
+            session.last_used = time.monotonic()
+            self._evict()
+            return session
+
+    @contextmanager
+    def agent(
+        self, session: Session, factory: Optional[Callable[..., Any]] = None
+    ) -> Iterator[Any]:
+        """Hold the agent that answers for ``session`` for one turn.
+
+        Like AgentPool.lease(), an agent that raised is dropped (and rebuilt
+        on the next turn); a cancelled generation keeps it.
+        """
+        from timmy.pool import agent_pool
+
+        if agent_pool.key_for()[0] != "ollama":
+            with agent_pool.lease(factory=factory) as agent:
+                if getattr(agent, "shared", False) is True and \
+                        callable(getattr(agent, "for_session", None)):
+                    yield agent.for_session(lambda tier: _synced_turn(tier, session))
+                else:
+                    with _synced_turn(agent, session) as synced:
+                        yield synced
+            return
+
+        with session.lock:
+            if session.agent is None:
+                if factory is None:
+                    from timmy.agent import create_timmy
+                    factory = create_timmy
+                session.agent = factory(backend="ollama", session_id=session.id)
+            try:
+                with _synced(session.agent, session):
+                    yield session.agent
+            except (GeneratorExit, GenerationCancelled):
+                raise
+            except BaseException:
+                session.agent = None
+                raise
+
+    @contextmanager
+    def one_shot(self, factory: Optional[Callable[..., Any]] = None) -> Iterator[Any]:
+        """Hold a pooled agent with an empty conversation, for history-free turns.
+
+        The agent is left owned by no session, so whichever session leases
+        it next re-seeds it.  BatchScheduler answers on a fresh Conversation.
+        """
+        from timmy.pool import agent_pool
+
+        with agent_pool.lease(factory=factory) as agent:
+            if getattr(agent, "shared", False) is True and \
+                    callable(getattr(agent, "for_session", None)):
+                yield agent.for_session(_blank_turn)
+            else:
+                with _blank_turn(agent) as blank:
+                    yield blank
+
+    def forget(self, session: Session) -> None:
+        """Clear a session's history and drop its agent's context."""
+        with session.lock:
+            session.log.clear()
+            session.agent = None
+
+    # ── maintenance ──────────────────────────────────────────────────────────
+
+    def _evict(self) -> None:
+        """Drop idle sessions, then LRU ones past max_live.  Caller holds the lock.
+
+        Sessions mid-turn are skipped; their history is on disk either way.
+        """
+        cutoff = time.monotonic() - self._idle_seconds
+        over = len(self._live) - self._max_live
+        for sid, session in list(self._live.items()):
+            if session.lock.locked():
+                continue
+            if session.last_used < cutoff or over > 0:
+                del self._live[sid]
+                over -= 1
+                self.evicted += 1
+                logger.debug("Sessions: evicted %s", sid[:8])
+
+    def clear(self) -> None:
+        """Forget every session, live and persisted."""
+        with self._lock:
+            self._live.clear()
+            conn = self._db()
+            if conn is not None:
+                conn.execute("DELETE FROM session_messages")
+                conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "live": len(self._live),
+                "max_live": self._max_live,
+                "agents": sum(1 for s in self._live.values() if s.agent is not None),
+                "created": self.created,
+                "rehydrated": self.rehydrated,
+                "evicted": self.evicted,
+                "persistent": self._db_path is not None,
+            }
+
+    # ── SQLite ───────────────────────────────────────────────────────────────
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._db_path is None:
+            return None
+        if self._conn is None:
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    timestamp TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS session_messages_session "
+                "ON session_messages (session_id, id)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _db_load(self, session_id: str, before: Optional[int] = None,
+                 limit: Optional[int] = None) -> list[Message]:
+        """Up to ``limit`` (default: window) newest messages before ``before``,
+        oldest first.  Caller holds the lock."""
+        conn = self._db()
+        if conn is None:
+            return []
+        rows = conn.execute(
+            "SELECT id, role, content, timestamp FROM session_messages "
+            "WHERE session_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (session_id, 2**63 - 1 if before is None else before, limit or self._window),
+        ).fetchall()
+        return [Message(role, content, ts, id=row_id) for row_id, role, content, ts in reversed(rows)]
+
+    def _db_page(self, session_id: str, before: Optional[int], limit: int) -> list[Message]:
+        with self._lock:
+            return self._db_load(session_id, before, limit)
+
+    def _db_append(self, session_id: str, role: str, content: str, timestamp: str) -> int:
+        """Insert a message; returns its row id (the next store-wide id without a database)."""
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return next(self._ids)
+            cursor = conn.execute(
+                "INSERT INTO session_messages (session_id, role, content, timestamp) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, role, content, timestamp),
+            )
+            conn.commit()
+            return cursor.lastrowid
+
+    def _db_delete(self, session_id: str) -> None:
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return
+            conn.execute("DELETE FROM session_messages WHERE session_id = ?", (session_id,))
+            conn.commit()
+
+
+# ── cookie ───────────────────────────────────────────────────────────────────
+
+class SessionMiddleware:
+    """Gives every HTTP request a session id, issuing the cookie when missing.
+
+    Plain ASGI (like ActivityMiddleware) so SSE streams and disconnect
+    detection pass through untouched.  The id is exposed as
+    ``request.state.session_id``.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session_id = Request(scope).cookies.get(SESSION_COOKIE, "")
+        issue = _SESSION_ID.fullmatch(session_id) is None
+        if issue:
+            session_id = uuid.uuid4().hex
+        scope.setdefault("state", {})["session_id"] = session_id
+
+        async def send_with_cookie(message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{SESSION_COOKIE}={session_id}; Path=/; Max-Age={_COOKIE_MAX_AGE}; "
+                    "HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie if issue else send)
+
+
+def current_session(request: Request) -> Session:
+    """The caller's Session (requires SessionMiddleware)."""
+    return session_store.get(request.state.session_id)
+
+
+# Module-level singleton shared across the app
+session_store = SessionStore(
+    max_live=settings.dashboard_max_sessions,
+    idle_seconds=settings.dashboard_session_idle_seconds,
+    db_path=settings.dashboard_sessions_db,
+    window=settings.dashboard_history_window,
+    render=render_message,
+)
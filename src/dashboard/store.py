@@ -1,4 +1,7 @@
+import threading
+from collections import deque
 from dataclasses import dataclass, field
+from typing import Callable, Optional
 
 
 @dataclass
@@ -6,26 +9,63 @@ class Message:
     role: str       # "user" | "agent" | "error"
     content: str
     timestamp: str
+    id: int = 0     # monotonically increasing within a log; 0 = not yet stored
+    # Rendered HTML, cached once (see dashboard.fragments); never compared.
+    html: Optional[str] = field(default=None, compare=False, repr=False)
 
 
 class MessageLog:
-    """In-memory chat history for the lifetime of the server process."""
+    """Chat history (one per dashboard session, see dashboard.sessions).
 
-    def __init__(self) -> None:
-        self._entries: list[Message] = []
+    Keeps the newest ``max_entries`` messages in a ring buffer; older ones
+    fall off (SessionLog still has them on disk).  Every message gets an id
+    greater than any before it, which page() uses as a cursor.  ``render``,
+    when given, is applied to each message as it is stored and the result
+    kept on ``Message.html``.
+    """
 
-    def append(self, role: str, content: str, timestamp: str) -> None:
-        self._entries.append(Message(role=role, content=content, timestamp=timestamp))
+    def __init__(
+        self,
+        max_entries: int = 200,
+        render: Optional[Callable[[Message], str]] = None,
+    ) -> None:
+        self._entries: deque[Message] = deque(maxlen=max(1, max_entries))
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._render = render
+
+    def append(self, role: str, content: str, timestamp: str) -> Message:
+        with self._lock:
+            return self._add(Message(role, content, timestamp, id=self._last_id + 1))
+
+    def _add(self, message: Message) -> Message:
+        """Store an already-numbered message.  Caller holds the lock."""
+        self._last_id = max(self._last_id, message.id)
+        if self._render is not None and message.html is None:
+            message.html = self._render(message)
+        self._entries.append(message)
+        return message
 
     def all(self) -> list[Message]:
-        return list(self._entries)
+        """The messages still in memory, oldest first."""
+        with self._lock:
+            return list(self._entries)
+
+    def page(self, before: Optional[int] = None, limit: int = 50) -> list[Message]:
+        """Up to ``limit`` newest messages with id < ``before``, oldest first."""
+        out: list[Message] = []
+        with self._lock:
+            for message in reversed(self._entries):
+                if len(out) >= limit:
+                    break
+                if before is None or message.id < before:
+                    out.append(message)
+        out.reverse()
+        return out
 
     def clear(self) -> None:
-        self._entries.clear()
+        with self._lock:
+            self._entries.clear()
 
     def __len__(self) -> int:
         return len(self._entries)
-
-
-# Module-level singleton shared across the app
-message_log = MessageLog()
@@ -71,6 +71,15 @@ class SwarmComms:
     def connected(self) -> bool:
         return self._connected
 
+    def ping(self) -> bool:
+        """True when the Redis connection still answers (False on the fallback)."""
+        if not (self._connected and self._redis):
+            return False
+        try:
+            return bool(self._redis.ping())
+        except Exception:
+            return False
+
     def publish(self, channel: str, event: str, data: Optional[dict] = None) -> None:
         msg = SwarmMessage(
             channel=channel,
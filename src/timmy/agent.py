@@ -1,17 +1,20 @@
-from typing import TYPE_CHECKING, Union
-
-from agno.agent import Agent
-from agno.db.sqlite import SqliteDb
-from agno.models.ollama import Ollama
+import logging
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 from config import settings
 from timmy.prompts import TIMMY_SYSTEM_PROMPT
 
+logger = logging.getLogger(__name__)
+
+# Agno (and the AirLLM backend) are imported inside create_timmy(): their
+# import graph costs most of a second, which every CLI call — even
+# `timmy --help` — used to pay.
 if TYPE_CHECKING:
+    from agno.agent import Agent
     from timmy.backends import TimmyAirLLMAgent
 
 # Union type for callers that want to hint the return type.
-TimmyAgent = Union[Agent, "TimmyAirLLMAgent"]
+TimmyAgent = Union["Agent", "TimmyAirLLMAgent"]
 
 
 def _resolve_backend(requested: str | None) -> str:
@@ -39,35 +42,154 @@ def _resolve_backend(requested: str | None) -> str:
     return "ollama"
 
 
+def long_term_memory() -> Optional[Any]:
+    """The shared MemoryIndex, or None when disabled or NumPy is missing."""
+    if not settings.memory_enabled:
+        return None
+    try:
+        from timmy.memory import shared_memory
+    except ImportError:
+        logger.warning('MEMORY_ENABLED needs NumPy — pip install ".[memory]"; running without it')
+        return None
+    return shared_memory()
+
+
+def memory_scope(agent: Any) -> Optional[str]:
+    """Long-term memory scope of ``agent``'s current turn; None for no memory.
+
+    "" is the CLI's scope.  The dashboard retags a pooled agent with the
+    session it serves, or None for a history-free turn, as it leases it.
+    """
+    return getattr(agent, "memory_scope", "")
+
+
+def recall(memory: Any, message: str, scope: Optional[str], history: str, count_tokens=None) -> str:
+    """Recalled-exchanges block for a prompt; memory failures never fail the turn."""
+    if memory is None or scope is None:
+        return ""
+    try:
+        return memory.recall_block(
+            message,
+            scope=scope,
+            budget_tokens=settings.memory_budget_tokens,
+            k=settings.memory_top_k,
+            min_score=settings.memory_min_score,
+            exclude=history,
+            count_tokens=count_tokens,
+        )
+    except Exception as exc:
+        logger.warning("Memory recall failed: %s", exc)
+        return ""
+
+
+def memorize(memory: Any, message: str, response: str, scope: Optional[str]) -> None:
+    """Add an exchange to long-term memory, logging rather than raising on failure."""
+    if memory is None or scope is None:
+        return
+    try:
+        memory.add(message, response, scope=scope)
+    except Exception as exc:
+        logger.warning("Memory append failed: %s", exc)
+
+
 def create_timmy(
     db_file: str = "timmy.db",
     backend: str | None = None,
     model_size: str | None = None,
+    session_id: str | None = None,
 ) -> TimmyAgent:
     """Instantiate Timmy — Ollama or AirLLM, same public interface either way.
 
     Args:
         db_file:    SQLite file for Agno conversation memory (Ollama path only).
-        backend:    "ollama" | "airllm" | "auto" | None (reads config/env).
+        backend:    "ollama" | "airllm" | "auto" | "cascade" | None (reads config/env).
         model_size: AirLLM size — "8b" | "70b" | "405b" | None (reads config).
+        session_id: Agno session the runs are stored under (Ollama path only);
+                    the dashboard passes one per browser session.
 
     Returns an Agno Agent (Ollama) or TimmyAirLLMAgent — both expose
-    print_response(message, stream).
+    print_response(message, stream).  With AIRLLM_MAX_BATCH_SIZE > 1 the
+    AirLLM agent comes wrapped in a BatchScheduler exposing the same methods;
+    "cascade" returns a CascadeRouter that picks a tier per prompt.
     """
     resolved = _resolve_backend(backend)
     size = model_size or settings.airllm_model_size
 
+    if resolved == "cascade":
+        from timmy.cascade import create_cascade
+        return create_cascade()
+
     if resolved == "airllm":
         from timmy.backends import TimmyAirLLMAgent
-        return TimmyAirLLMAgent(model_size=size)
-
-    # Default: Ollama via Agno.
-    return Agent(
+        agent = TimmyAirLLMAgent(model_size=size)
+        if settings.airllm_max_batch_size > 1:
+            from timmy.batching import BatchScheduler
+            return BatchScheduler(
+                agent,
+                max_batch_size=settings.airllm_max_batch_size,
+                max_wait_ms=settings.airllm_batch_wait_ms,
+            )
+        return agent
+
+    from agno.agent import Agent
+    from agno.db.sqlite import SqliteDb
+    from agno.models.ollama import Ollama
+
+    from timmy.balancer import ollama_balancer
+    from timmy.context import ContextWindow, approx_tokens
+
+    # Default: Ollama via Agno.  Agno's own history replay is a fixed run
+    # count; a ContextWindow keeps prompt size within the token budget and
+    # is injected through the hooks below instead.
+    context = ContextWindow(
+        budget_tokens=settings.context_budget_tokens,
+        summary_tokens=settings.context_summary_tokens,
+    )
+    # Long-term memory (MEMORY_ENABLED) adds relevant older exchanges on top,
+    # out of a budget the window gives up.
+    memory = long_term_memory()
+    memory_budget = settings.memory_budget_tokens if memory is not None else 0
+
+    # The scope is read per turn: a pooled agent serves whichever session
+    # leased it (see memory_scope).
+    def load_context(agent: Agent, run_input) -> None:
+        message = run_input.input_content_string()
+        history = context.render(reserve=approx_tokens(message) + memory_budget)
+        recalled = recall(memory, message, memory_scope(agent), history)
+        agent.additional_context = (history + recalled) or None
+
+    def record_exchange(agent: Agent, run_output) -> None:
+        if run_output.input is not None and isinstance(run_output.content, str):
+            message = run_output.input.input_content_string()
+            context.add_exchange(message, run_output.content)
+            memorize(memory, message, run_output.content, memory_scope(agent))
+
+    agent = Agent(
         name="Timmy",
-        model=Ollama(id=settings.ollama_model),
+        # Each chat call is routed to the least-busy healthy OLLAMA_URL host.
+        model=Ollama(
+            id=settings.ollama_model,
+            client=ollama_balancer.client(),
+            async_client=ollama_balancer.async_client(),
+        ),
         db=SqliteDb(db_file=db_file),
+        session_id=session_id,
         description=TIMMY_SYSTEM_PROMPT,
-        add_history_to_context=True,
-        num_history_runs=10,
+        add_history_to_context=False,
+        pre_hooks=[load_context],
+        post_hooks=[record_exchange],
         markdown=True,
     )
+    # Same reset() / restore() as TimmyAirLLMAgent, so the REPL and batch
+    # jobs can drop the conversation without rebuilding the agent, and the
+    # dashboard can seed a fresh agent with a session's earlier turns.
+    agent.reset = context.clear
+    agent.memory_scope = session_id or ""
+
+    def restore(exchanges: list[tuple[str, str]]) -> None:
+        context.clear()
+        for message, response in exchanges:
+            context.add_exchange(message, response)
+
+    agent.restore = restore
+    return agent
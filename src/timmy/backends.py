@@ -9,12 +9,20 @@ everywhere else AutoModel (PyTorch) is used.
 No cloud.  No telemetry.  Sats are sovereignty, boss.
 """
 
+import logging
 import platform
+import queue
+import threading
 from dataclasses import dataclass
-from typing import Literal
+from typing import Any, Callable, Iterator, Literal, Optional, Union
 
+from config import settings
+from timmy.context import ContextWindow, token_counter
+from timmy.prefix_cache import PrefixCache
 from timmy.prompts import TIMMY_SYSTEM_PROMPT
 
+logger = logging.getLogger(__name__)
+
 # HuggingFace model IDs for each supported size.
 _AIRLLM_MODELS: dict[str, str] = {
     "8b":   "meta-llama/Meta-Llama-3.1-8B-Instruct",
@@ -24,6 +32,17 @@ _AIRLLM_MODELS: dict[str, str] = {
 
 ModelSize = Literal["8b", "70b", "405b"]
 
+# Sampling settings shared by the blocking and streaming generate paths.
+_GENERATE_KWARGS = {
+    "max_new_tokens": 512,
+    "use_cache": True,
+    "do_sample": True,
+    "temperature": 0.7,
+}
+
+# Lines of TimmyAirLLMAgent._history kept (user and reply lines, newest last).
+_TRANSCRIPT_LINES = 200
+
 
 @dataclass
 class RunResult:
@@ -45,84 +64,466 @@ def airllm_available() -> bool:
         return False
 
 
+def _sequences(output):
+    """Token sequences from generate(), whether it returned a dict-like or a tensor."""
+    return getattr(output, "sequences", output)
+
+
+def _token_ids(batch) -> tuple[int, ...]:
+    """First row of a token batch as a tuple of ints; empty if not introspectable."""
+    try:
+        row = batch[0]
+        ids = row.tolist() if hasattr(row, "tolist") else list(row)
+    except Exception:
+        return ()
+    if not all(isinstance(i, int) for i in ids):
+        return ()
+    return tuple(ids)
+
+
+class _Detokenizer:
+    """Turns one row's new token ids into text deltas.
+
+    Tokens are decoded cumulatively so multi-byte characters split across
+    tokens come out whole; only the newly decoded suffix is returned.
+    """
+
+    def __init__(self, tokenizer) -> None:
+        self._tokenizer = tokenizer
+        self._token_ids: list[int] = []
+        self._emitted = 0
+
+    def feed(self, ids: list[int]) -> str:
+        self._token_ids.extend(ids)
+        text = self._tokenizer.decode(self._token_ids, skip_special_tokens=True)
+        if len(text) <= self._emitted or text.endswith("\ufffd"):
+            return ""
+        delta, self._emitted = text[self._emitted:], len(text)
+        return delta
+
+
+class _TokenStreamer:
+    """Minimal HuggingFace-style streamer (put/end) that yields text deltas.
+
+    generate() calls put() with the prompt first, then once per new token.
+    """
+
+    _DONE = object()
+
+    def __init__(self, tokenizer) -> None:
+        self._detokenizer = _Detokenizer(tokenizer)
+        self._queue: queue.Queue = queue.Queue()
+        self._saw_prompt = False
+        self._ended = False
+
+    def put(self, value) -> None:
+        if not self._saw_prompt:
+            self._saw_prompt = True
+            return
+        ids = value.tolist() if hasattr(value, "tolist") else list(value)
+        while ids and isinstance(ids[0], list):
+            ids = ids[0]
+        delta = self._detokenizer.feed(ids if isinstance(ids, list) else [ids])
+        if delta:
+            self._queue.put(delta)
+
+    def end(self) -> None:
+        if not self._ended:
+            self._ended = True
+            self._queue.put(self._DONE)
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            yield item
+
+
+class _BatchStreamer:
+    """Streamer for a padded batch: each step's tokens are split by row.
+
+    generate() passes one new token per row; each streaming row's text
+    deltas go to its ``on_text`` callback, on the generating thread.  A
+    cancelled row stops receiving text.
+    """
+
+    def __init__(self, tokenizer, turns: list["BatchTurn"]) -> None:
+        self._turns = turns
+        self._rows = [_Detokenizer(tokenizer) for _ in turns]
+        self.emitted = [False] * len(turns)
+        self._saw_prompt = False
+
+    def put(self, value) -> None:
+        if not self._saw_prompt:
+            self._saw_prompt = True
+            return
+        ids = value.tolist() if hasattr(value, "tolist") else list(value)
+        for row, (turn, token) in enumerate(zip(self._turns, ids)):
+            if turn.on_text is None or turn.cancelled:
+                continue
+            delta = self._rows[row].feed(token if isinstance(token, list) else [token])
+            if delta:
+                self.emitted[row] = True
+                turn.on_text(delta)
+
+    def end(self) -> None:
+        pass
+
+
+class _StopWhenAllCancelled:
+    """generate() stopping criterion for a batch: ends once every row is cancelled."""
+
+    def __init__(self, turns: list["BatchTurn"]) -> None:
+        self._turns = turns
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return all(turn.cancelled for turn in self._turns)
+
+
+@dataclass
+class BatchTurn:
+    """One row of TimmyAirLLMAgent.run_batch().
+
+    With ``on_text``, the row streams: its decoded text deltas are handed
+    over as they arrive.  Setting ``cancel`` abandons the row — it gets no
+    more text and its exchange is not kept.  ``conversation`` is the
+    transcript the row's prompt is built from and its exchange recorded
+    into (see run()); the agent's own when None.
+    """
+    message: str
+    on_text: Optional[Callable[[str], None]] = None
+    cancel: Optional[threading.Event] = None
+    conversation: Any = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel is not None and self.cancel.is_set()
+
+
+class _StopOnEvent:
+    """generate() stopping criterion that ends generation once ``event`` is set.
+
+    Checked after every decoded token, so an abandoned stream releases the
+    model within one forward pass instead of after max_new_tokens.
+    """
+
+    def __init__(self, event: threading.Event) -> None:
+        self._event = event
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self._event.is_set()
+
+
 class TimmyAirLLMAgent:
     """Thin AirLLM wrapper compatible with both dashboard and CLI call sites.
 
     Exposes:
       run(message, stream)           → RunResult(content=...)  [dashboard]
+                                       (iterator of chunks when stream=True)
       print_response(message, stream) → None                   [CLI]
 
-    Maintains a rolling 10-turn in-memory history so Timmy remembers the
-    conversation within a session — no SQLite needed at this layer.
+    Maintains an in-memory history so Timmy remembers the conversation
+    within a session — no SQLite needed at this layer.  Prompts include as
+    much of it as fits CONTEXT_BUDGET_TOKENS; older turns are folded into
+    a rolling summary (see timmy.context).
     """
 
-    def __init__(self, model_size: str = "70b") -> None:
-        model_id = _AIRLLM_MODELS.get(model_size)
-        if model_id is None:
+    def __init__(self, model_size: str = "70b", compression: str | None = None) -> None:
+        if model_size != "auto" and model_size not in _AIRLLM_MODELS:
             raise ValueError(
                 f"Unknown model size {model_size!r}. "
                 f"Choose from: {list(_AIRLLM_MODELS)}"
             )
+        from timmy.profiles import resolve_profile
+        self.profile = resolve_profile(model_size, compression)
+        model_size = self.profile.model_size
+        model_id = _AIRLLM_MODELS[model_size]
 
+        # Prefix KV reuse relies on HF generate(past_key_values=...), which
+        # the MLX backend does not take — keep it to the PyTorch path.
+        self._prefix_cache: PrefixCache | None = None
         if is_apple_silicon():
             from airllm import AirLLMMLX  # type: ignore[import]
+            if self.profile.compression != "none":
+                logger.warning(
+                    "AirLLM MLX does not support %s compression — loading uncompressed",
+                    self.profile.compression,
+                )
             self._model = AirLLMMLX(model_id)
         else:
             from airllm import AutoModel  # type: ignore[import]
-            self._model = AutoModel.from_pretrained(model_id)
+            if self.profile.compression == "none":
+                self._model = AutoModel.from_pretrained(model_id)
+            else:
+                self._model = AutoModel.from_pretrained(
+                    model_id, compression=self.profile.compression
+                )
+            if settings.airllm_prefix_cache_entries > 0:
+                self._prefix_cache = PrefixCache(settings.airllm_prefix_cache_entries)
+
+        self._shards = self._warm_shards()
 
+        # Recent transcript only (capped at _TRANSCRIPT_LINES) — prompts are
+        # built from the context window; ``turns`` counts every exchange.
         self._history: list[str] = []
+        self.turns = 0
+        self._context = ContextWindow(
+            budget_tokens=settings.context_budget_tokens,
+            summary_tokens=settings.context_summary_tokens,
+            count_tokens=self._count_tokens,
+        )
         self._model_size = model_size
+        from timmy.agent import long_term_memory
+        self._memory = long_term_memory()
+        # Session being served and its long-term memory scope (see
+        # timmy.agent.memory_scope); the dashboard sets both.
+        self.session_id: str | None = None
+        self.memory_scope: str | None = ""
 
     # ── public interface (mirrors Agno Agent) ────────────────────────────────
 
-    def run(self, message: str, *, stream: bool = False) -> RunResult:
+    def run(
+        self, message: str, *, stream: bool = False, conversation: Any = None
+    ) -> Union[RunResult, Iterator[RunResult]]:
         """Run inference and return a structured result (matches Agno Agent.run()).
 
-        `stream` is accepted for API compatibility; AirLLM always generates
-        the full output in one pass.
+        With stream=True, returns an iterator of RunResult chunks — one per
+        decoded text delta — just like Agno's streaming run.  History is
+        updated once the stream is exhausted.
+
+        ``conversation`` swaps in another transcript for this turn: any
+        object with ``_context``, ``_remember()`` and ``session_id`` like
+        this agent's own (BatchScheduler keeps one per dashboard session).
         """
-        prompt = self._build_prompt(message)
+        if stream:
+            return self._run_stream(message, conversation)
 
-        input_tokens = self._model.tokenizer(
-            [prompt],
+        input_tokens = self._tokenize(self._build_prompt(message, conversation))
+        output = self._model.generate(**input_tokens, **self._generate_kwargs(input_tokens))
+        self._cache_prefix(output)
+        response = self._decode_new_tokens(input_tokens, output)
+        self._learn(message, response, conversation)
+        return RunResult(content=response)
+
+    def run_batch(self, turns: list[Union[str, BatchTurn]]) -> list[RunResult]:
+        """Answer several messages with one padded generate() call.
+
+        Every layer AirLLM streams from disk is then shared by the whole
+        batch.  Each row's prompt comes from its own conversation (the
+        agent's unless BatchTurn.conversation says otherwise); exchanges
+        are appended in order afterwards.  Streaming rows (BatchTurn.on_text)
+        get their text as it decodes; generation stops early once every
+        row is cancelled.  The prefix cache is bypassed — left padding
+        shifts positions per row.
+        """
+        turns = [t if isinstance(t, BatchTurn) else BatchTurn(t) for t in turns]
+        tokenizer = self._model.tokenizer
+        # Decoder-only models must be left-padded so every row's new tokens
+        # start at the same column.  Llama ships without a pad token.
+        tokenizer.padding_side = "left"
+        if getattr(tokenizer, "pad_token", None) is None:
+            tokenizer.pad_token = tokenizer.eos_token
+
+        input_tokens = tokenizer(
+            [self._build_prompt(t.message, t.conversation) for t in turns],
             return_tensors="pt",
             padding=True,
             truncation=True,
             max_length=2048,
         )
-        output = self._model.generate(
-            **input_tokens,
-            max_new_tokens=512,
-            use_cache=True,
-            do_sample=True,
-            temperature=0.7,
+        generate_kwargs = dict(_GENERATE_KWARGS)
+        streamer = None
+        if any(t.on_text is not None for t in turns):
+            streamer = _BatchStreamer(tokenizer, turns)
+            generate_kwargs["streamer"] = streamer
+        if any(t.cancel is not None for t in turns):
+            generate_kwargs["stopping_criteria"] = [_StopWhenAllCancelled(turns)]
+        output = _sequences(self._model.generate(**input_tokens, **generate_kwargs))
+        input_len = input_tokens["input_ids"].shape[1]
+        results = []
+        for row, turn in enumerate(turns):
+            response = tokenizer.decode(
+                output[row][input_len:], skip_special_tokens=True
+            ).strip()
+            if turn.cancelled:
+                results.append(RunResult(content=""))
+                continue
+            if turn.on_text is not None and response and not streamer.emitted[row]:
+                # Backend ignored the streamer — emit the whole completion at once.
+                turn.on_text(response)
+            self._learn(turn.message, response, turn.conversation)
+            results.append(RunResult(content=response))
+        return results
+
+    def print_response(self, message: str, *, stream: bool = True) -> None:
+        """Run inference and render the response to stdout (CLI interface).
+
+        Streamed chunks are collected and rendered as markdown once complete.
+        """
+        result = self.run(message, stream=stream)
+        if isinstance(result, RunResult):
+            text = result.content
+        else:
+            text = "".join(chunk.content for chunk in result)
+        self._render(text)
+
+    def reset(self) -> None:
+        """Forget the conversation; the loaded model (and prefix cache) stay warm."""
+        self._history.clear()
+        self.turns = 0
+        self._context.clear()
+
+    def restore(self, exchanges: list[tuple[str, str]]) -> None:
+        """Replace the conversation with earlier (message, response) turns."""
+        self.reset()
+        for message, response in exchanges:
+            self._remember(message, response)
+
+    @property
+    def shards(self) -> list:
+        """Layer shard files of the loaded model ([] when not on disk)."""
+        return self._shards
+
+    # ── private helpers ──────────────────────────────────────────────────────
+
+    def _warm_shards(self) -> list:
+        """Prewarm the page cache and hook next-layer prefetch (AIRLLM_PREWARM / _PREFETCH)."""
+        from timmy.shards import LayerPrefetcher, layer_shards, prewarm
+
+        shards = layer_shards(self._model)
+        if not shards:
+            return []
+        if settings.airllm_prewarm:
+            prewarm(shards)
+        if settings.airllm_prefetch:
+            LayerPrefetcher(shards).install(self._model)
+        return shards
+
+    def _run_stream(self, message: str, conversation: Any = None) -> Iterator[RunResult]:
+        """Generate on a worker thread and yield text deltas as they decode.
+
+        Closing the iterator early (the client went away) stops generate()
+        at the next token and waits for it, so the model is idle before the
+        agent is handed to anyone else.  The partial exchange is not kept.
+        """
+        input_tokens = self._tokenize(self._build_prompt(message, conversation))
+        generate_kwargs = self._generate_kwargs(input_tokens)
+        stop = threading.Event()
+        generate_kwargs["stopping_criteria"] = [_StopOnEvent(stop)]
+        streamer = _TokenStreamer(self._model.tokenizer)
+        outcome: dict = {}
+
+        def _generate() -> None:
+            try:
+                outcome["output"] = self._model.generate(
+                    **input_tokens, streamer=streamer, **generate_kwargs
+                )
+            except Exception as exc:
+                outcome["error"] = exc
+            finally:
+                streamer.end()
+
+        worker = threading.Thread(target=_generate, daemon=True)
+        worker.start()
+        pieces: list[str] = []
+        try:
+            for text in streamer:
+                pieces.append(text)
+                yield RunResult(content=text)
+        finally:
+            stop.set()  # no-op when generation already finished
+            worker.join()
+
+        if "error" in outcome:
+            raise outcome["error"]
+        self._cache_prefix(outcome["output"])
+        if pieces:
+            response = "".join(pieces).strip()
+        else:
+            # Backend ignored the streamer — emit the whole completion at once.
+            response = self._decode_new_tokens(input_tokens, outcome["output"])
+            if response:
+                yield RunResult(content=response)
+        self._learn(message, response, conversation)
+
+    def _tokenize(self, prompt: str):
+        return self._model.tokenizer(
+            [prompt],
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=2048,
         )
 
-        # Decode only the newly generated tokens, not the prompt.
+    def _generate_kwargs(self, input_tokens) -> dict:
+        """Sampling kwargs, plus a reusable prefix KV cache when one matches."""
+        kwargs = dict(_GENERATE_KWARGS)
+        if self._prefix_cache is None:
+            return kwargs
+        # Ask generate() for its cache so the next turn can reuse it.
+        kwargs["return_dict_in_generate"] = True
+        prompt_ids = _token_ids(input_tokens["input_ids"])
+        if prompt_ids:
+            reused, past_key_values = self._prefix_cache.lookup(prompt_ids)
+            if past_key_values is not None:
+                kwargs["past_key_values"] = past_key_values
+                logger.debug(
+                    "Prefix cache hit: %d/%d prompt tokens reused", reused, len(prompt_ids)
+                )
+        return kwargs
+
+    def _cache_prefix(self, output) -> None:
+        """Store the cache generate() returned, keyed by the sequence it covers."""
+        if self._prefix_cache is None:
+            return
+        past_key_values = getattr(output, "past_key_values", None)
+        if past_key_values is not None:
+            self._prefix_cache.store(_token_ids(_sequences(output)), past_key_values)
+
+    def _decode_new_tokens(self, input_tokens, output) -> str:
+        """Decode only the newly generated tokens, not the prompt."""
         input_len = input_tokens["input_ids"].shape[1]
-        response = self._model.tokenizer.decode(
-            output[0][input_len:], skip_special_tokens=True
+        return self._model.tokenizer.decode(
+            _sequences(output)[0][input_len:], skip_special_tokens=True
         ).strip()
 
+    def _learn(self, message: str, response: str, conversation: Any = None) -> None:
+        """Record a fresh exchange in the conversation and in long-term memory."""
+        from timmy.agent import memorize, memory_scope
+        if conversation is None:
+            conversation = self
+        conversation._remember(message, response)
+        memorize(self._memory, message, response, memory_scope(conversation))
+
+    def _remember(self, message: str, response: str) -> None:
         self._history.append(f"User: {message}")
         self._history.append(f"Timmy: {response}")
+        del self._history[:-_TRANSCRIPT_LINES]
+        self.turns += 1
+        self._context.add_exchange(message, response)
 
-        return RunResult(content=response)
+    def _count_tokens(self, text: str) -> int:
+        # Resolved per call — the tokenizer belongs to whichever model is loaded.
+        return token_counter(getattr(self._model, "tokenizer", None))(text)
 
-    def print_response(self, message: str, *, stream: bool = True) -> None:
-        """Run inference and render the response to stdout (CLI interface)."""
-        result = self.run(message, stream=stream)
-        self._render(result.content)
-
-    # ── private helpers ──────────────────────────────────────────────────────
+    def _build_prompt(self, message: str, conversation: Any = None) -> str:
+        from timmy.agent import memory_scope, recall
 
-    def _build_prompt(self, message: str) -> str:
-        context = TIMMY_SYSTEM_PROMPT + "\n\n"
-        # Include the last 10 turns (5 exchanges) for continuity.
-        if self._history:
-            context += "\n".join(self._history[-10:]) + "\n\n"
-        return context + f"User: {message}\nTimmy:"
+        if conversation is None:
+            conversation = self
+        turn = f"User: {message}\nTimmy:"
+        # Reserve room for the new message (and recalled memories) so
+        # history, not the newest input, gives way as the conversation grows.
+        reserve = self._count_tokens(turn)
+        if self._memory is not None:
+            reserve += settings.memory_budget_tokens
+        history = conversation._context.render(reserve=reserve)
+        recalled = recall(self._memory, message, memory_scope(conversation), history,
+                          count_tokens=self._count_tokens)
+        # Recalled exchanges go after the history so the prompt prefix the
+        # prefix cache matches on stays the same from turn to turn.
+        return TIMMY_SYSTEM_PROMPT + "\n\n" + history + recalled + turn
 
     @staticmethod
     def _render(text: str) -> None:
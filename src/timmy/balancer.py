@@ -0,0 +1,231 @@
+"""Least-outstanding-requests balancer across several Ollama hosts.
+
+OLLAMA_URL may list several hosts ("http://gpu-a:11434,http://gpu-b:11434").
+Every chat call Agno makes goes through a BalancedOllamaClient, which
+leases the healthy host with the fewest requests in flight, forwards
+the call to a per-host ``ollama.Client`` and releases the host when the
+response (or stream) finishes.
+
+A host that fails at the transport level (refused, reset, timed out) is
+ejected for ``cooldown`` seconds, and a non-streaming call is retried on
+the next host.  Ejected hosts become eligible again once the cooldown
+expires, or earlier if a health probe reaches them (see
+timmy.ollama_client).  If every host is ejected the balancer fails open
+and picks the one whose cooldown ends first — one host that might work
+beats a guaranteed error.
+
+Usage:
+    from timmy.balancer import ollama_balancer
+
+    Ollama(id=model, client=ollama_balancer.client(),
+           async_client=ollama_balancer.async_client())
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors that say "this host is unreachable", as opposed to a bad request.
+_HOST_ERRORS = (ConnectionError, TimeoutError, httpx.TransportError)
+
+
+@dataclass
+class _Host:
+    url: str
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    ejected_until: float = 0.0
+    last_error: Optional[str] = None
+
+    def healthy(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+
+class OllamaBalancer:
+    """Tracks in-flight requests and health for a fixed set of hosts."""
+
+    def __init__(self, hosts: list[str], cooldown: float = 30.0) -> None:
+        if not hosts:
+            raise ValueError("OllamaBalancer needs at least one host")
+        self._hosts = {url: _Host(url) for url in hosts}
+        self._cooldown = cooldown
+        self._lock = threading.Lock()
+
+    @property
+    def hosts(self) -> list[str]:
+        return list(self._hosts)
+
+    # ── selection ───────────────────────────────────────────────────────────
+
+    def _choose(self, exclude: frozenset[str] = frozenset()) -> _Host:
+        """Healthy host with the fewest in-flight (then total) requests.  Caller holds the lock."""
+        now = time.monotonic()
+        candidates = [h for h in self._hosts.values() if h.url not in exclude] \
+            or list(self._hosts.values())
+        healthy = [h for h in candidates if h.healthy(now)]
+        if healthy:
+            return min(healthy, key=lambda h: (h.outstanding, h.requests))
+        # Everything ejected — fail open on the host that recovers soonest.
+        return min(candidates, key=lambda h: h.ejected_until)
+
+    def pick(self) -> str:
+        """Return the host a new request would go to, without leasing it."""
+        with self._lock:
+            return self._choose().url
+
+    def acquire(self, exclude: frozenset[str] = frozenset()) -> str:
+        with self._lock:
+            host = self._choose(exclude)
+            host.outstanding += 1
+            host.requests += 1
+            return host.url
+
+    def release(self, url: str, error: Optional[BaseException] = None) -> None:
+        """Finish a request; transport-level errors eject the host."""
+        with self._lock:
+            host = self._hosts[url]
+            host.outstanding = max(0, host.outstanding - 1)
+        if error is None:
+            self.mark_up(url)
+        elif isinstance(error, _HOST_ERRORS):
+            self.mark_down(url, error)
+
+    @contextmanager
+    def lease(self, exclude: frozenset[str] = frozenset()) -> Iterator[str]:
+        url = self.acquire(exclude)
+        try:
+            yield url
+        except BaseException as exc:
+            self.release(url, exc)
+            raise
+        else:
+            self.release(url)
+
+    # ── health ──────────────────────────────────────────────────────────────
+
+    def mark_down(self, url: str, error: Any = None) -> None:
+        with self._lock:
+            host = self._hosts.get(url)
+            if host is None:
+                return
+            host.failures += 1
+            host.last_error = str(error) if error is not None else "unreachable"
+            was_healthy = host.healthy(time.monotonic())
+            host.ejected_until = time.monotonic() + self._cooldown
+        if was_healthy:
+            logger.warning("Ollama host %s ejected for %.0fs — %s", url, self._cooldown, error)
+
+    def mark_up(self, url: str) -> None:
+        with self._lock:
+            host = self._hosts.get(url)
+            if host is None or (host.ejected_until == 0.0 and host.last_error is None):
+                return
+            host.ejected_until = 0.0
+            host.last_error = None
+        logger.info("Ollama host %s back in rotation", url)
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": h.url,
+                    "status": "up" if h.healthy(now) else "ejected",
+                    "outstanding": h.outstanding,
+                    "requests": h.requests,
+                    "failures": h.failures,
+                    "retry_in_s": round(max(0.0, h.ejected_until - now), 1),
+                    "last_error": h.last_error,
+                }
+                for h in self._hosts.values()
+            ]
+
+    # ── Agno integration ────────────────────────────────────────────────────
+
+    def client(self, factory: Optional[Callable[[str], Any]] = None) -> "BalancedOllamaClient":
+        return BalancedOllamaClient(self, factory)
+
+    def async_client(self, factory: Optional[Callable[[str], Any]] = None) -> "BalancedAsyncOllamaClient":
+        return BalancedAsyncOllamaClient(self, factory)
+
+
+class BalancedOllamaClient:
+    """Drop-in for ``ollama.Client`` (the chat() call Agno uses), one host per call."""
+
+    def __init__(self, balancer: OllamaBalancer, factory: Optional[Callable[[str], Any]] = None) -> None:
+        self._balancer = balancer
+        self._factory = factory or _ollama_client
+        self._clients: dict[str, Any] = {}
+
+    def _client_for(self, url: str) -> Any:
+        if url not in self._clients:
+            self._clients[url] = self._factory(url)
+        return self._clients[url]
+
+    def chat(self, *args, stream: bool = False, **kwargs) -> Any:
+        if stream:
+            return self._stream(args, kwargs)
+        tried: set[str] = set()
+        while True:
+            try:
+                with self._balancer.lease(frozenset(tried)) as url:
+                    return self._client_for(url).chat(*args, stream=False, **kwargs)
+            except _HOST_ERRORS:
+                tried.add(url)
+                if len(tried) >= len(self._balancer.hosts):
+                    raise
+                logger.info("Ollama host %s failed — retrying on another host", url)
+
+    def _stream(self, args: tuple, kwargs: dict) -> Iterator[Any]:
+        # The lease spans the whole stream: the host is busy until it ends.
+        with self._balancer.lease() as url:
+            yield from self._client_for(url).chat(*args, stream=True, **kwargs)
+
+
+class BalancedAsyncOllamaClient:
+    """Async twin of BalancedOllamaClient for Agno's arun()."""
+
+    def __init__(self, balancer: OllamaBalancer, factory: Optional[Callable[[str], Any]] = None) -> None:
+        self._balancer = balancer
+        self._factory = factory or _ollama_async_client
+        self._clients: dict[str, Any] = {}
+
+    def _client_for(self, url: str) -> Any:
+        if url not in self._clients:
+            self._clients[url] = self._factory(url)
+        return self._clients[url]
+
+    async def chat(self, *args, stream: bool = False, **kwargs) -> Any:
+        if stream:
+            return self._stream(args, kwargs)
+        with self._balancer.lease() as url:
+            return await self._client_for(url).chat(*args, stream=False, **kwargs)
+
+    async def _stream(self, args: tuple, kwargs: dict) -> AsyncIterator[Any]:
+        with self._balancer.lease() as url:
+            async for chunk in await self._client_for(url).chat(*args, stream=True, **kwargs):
+                yield chunk
+
+
+def _ollama_client(url: str) -> Any:
+    from ollama import Client  # installed alongside agno's Ollama model
+    return Client(host=url)
+
+
+def _ollama_async_client(url: str) -> Any:
+    from ollama import AsyncClient
+    return AsyncClient(host=url)
+
+
+# Module-level singleton shared across the app
+ollama_balancer = OllamaBalancer(settings.ollama_hosts, cooldown=settings.ollama_eject_seconds)
@@ -0,0 +1,227 @@
+"""Offline prompt batches behind `timmy batch`.
+
+Nightly jobs used to loop `timmy chat` in shell, paying process startup
+and agent creation per prompt.  run_batch() streams a JSONL file of
+prompts through a bounded set of worker threads sharing one agent pool,
+and appends one JSONL result per prompt as soon as it finishes.
+
+Input, one object per line (``id`` defaults to the 1-based line number):
+
+    {"id": "q1", "prompt": "What is sovereignty?"}
+
+Output, in completion order:
+
+    {"id": "q1", "response": "...", "latency_ms": 812.4}
+    {"id": "q2", "response": null, "latency_ms": 3.1, "error": "..."}
+
+Re-running with the same output file skips every id that already has a
+successful row, so an interrupted job resumes where it stopped; failed
+rows are retried (the last row for an id wins).  Only ``2 × concurrency``
+prompts are read ahead of the workers and results go straight to disk,
+so memory stays flat however large the input is.
+"""
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+# A worker waits this long for a free agent before giving up on a prompt.
+# AirLLM keys hold a single agent, so with --concurrency > 1 workers queue
+# behind one another for whole generations.
+_CHECKOUT_TIMEOUT_S = 24 * 3600.0
+
+Ask = Callable[[str], str]
+
+
+@dataclass
+class Job:
+    id: object
+    prompt: Optional[str]
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchStats:
+    total: int = 0
+    skipped: int = 0
+    ok: int = 0
+    failed: int = 0
+    wall_s: float = 0.0
+
+    @property
+    def per_sec(self) -> float:
+        done = self.ok + self.failed
+        return done / self.wall_s if self.wall_s > 0 else 0.0
+
+
+def _key(job_id: object) -> str:
+    """Normalise ids so 7 and "7" resume as the same prompt."""
+    return str(job_id)
+
+
+def completed_ids(output: Path) -> set[str]:
+    """Ids with a successful row in ``output`` (a missing file means none).
+
+    A torn last line from a killed run is ignored, so that prompt reruns.
+    """
+    done: set[str] = set()
+    if not output.exists():
+        return done
+    with output.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(row, dict) and "id" in row and not row.get("error"):
+                done.add(_key(row["id"]))
+    return done
+
+
+def read_jobs(source: Path, skip: frozenset[str] | set[str] = frozenset()) -> Iterator[Job]:
+    """Yield pending jobs from a JSONL file, one line at a time.
+
+    Malformed lines become jobs that already carry an error, so they show
+    up in the output instead of silently vanishing.
+    """
+    with source.open(encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                job = Job(lineno, None, f"invalid JSON on line {lineno}: {exc.msg}")
+            else:
+                if not isinstance(row, dict):
+                    row = {"prompt": row}
+                prompt = row.get("prompt", row.get("message"))
+                job = Job(row.get("id", lineno), prompt if isinstance(prompt, str) else None)
+                if job.prompt is None:
+                    job.error = f"line {lineno} has no 'prompt' string"
+            if _key(job.id) not in skip:
+                yield job
+
+
+def _execute(ask: Ask, job: Job) -> dict:
+    start = time.perf_counter()
+    row: dict = {"id": job.id, "response": None}
+    if job.error is not None:
+        row["error"] = job.error
+    else:
+        try:
+            row["response"] = ask(job.prompt)
+        except Exception as exc:
+            row["error"] = str(exc) or type(exc).__name__
+    row["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return row
+
+
+def run_batch(
+    source: Path,
+    output: Path,
+    ask: Ask,
+    concurrency: int = 1,
+    on_result: Optional[Callable[[dict], None]] = None,
+) -> BatchStats:
+    """Answer every pending prompt in ``source``, appending rows to ``output``.
+
+    ``ask`` maps a prompt to the reply text and is called from up to
+    ``concurrency`` threads at once.  ``on_result`` sees each row after it
+    has been written (the CLI advances its progress bar there).
+    """
+    concurrency = max(1, concurrency)
+    skip = completed_ids(output)
+    stats = BatchStats(skipped=len(skip))
+    start = time.perf_counter()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+        # Start on a fresh line if a killed run left a torn one behind.
+        if out.tell() > 0:
+            with output.open("rb") as tail:
+                tail.seek(-1, 2)
+                if tail.read(1) != b"\n":
+                    out.write("\n")
+
+        def write(future: Future) -> None:
+            row = future.result()
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            if row.get("error"):
+                stats.failed += 1
+            else:
+                stats.ok += 1
+            if on_result is not None:
+                on_result(row)
+
+        in_flight: set[Future] = set()
+        for job in read_jobs(source, skip):
+            stats.total += 1
+            in_flight.add(pool.submit(_execute, ask, job))
+            if len(in_flight) >= 2 * concurrency:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    write(future)
+        for future in as_completed(in_flight):
+            write(future)
+
+    stats.wall_s = time.perf_counter() - start
+    return stats
+
+
+def count_pending(source: Path, output: Path) -> int:
+    """Number of prompts run_batch() would run (one streaming pass)."""
+    skip = completed_ids(output)
+    return sum(1 for _ in read_jobs(source, skip))
+
+
+def agent_asker(
+    backend: Optional[str] = None,
+    model_size: Optional[str] = None,
+    concurrency: int = 1,
+    factory: Optional[Callable] = None,
+) -> Ask:
+    """Return an Ask that leases agents from a pool sized for ``concurrency``.
+
+    Batch prompts are independent, so each one runs without history (see
+    _history_free).
+    """
+    from timmy.pool import AgentPool
+
+    pool = AgentPool(max_size=concurrency, checkout_timeout=_CHECKOUT_TIMEOUT_S)
+
+    def ask(prompt: str) -> str:
+        with pool.lease(backend=backend, model_size=model_size, factory=factory) as agent, \
+                _history_free(agent) as fresh:
+            result = fresh.run(prompt, stream=False)
+        content = getattr(result, "content", result)
+        return content if isinstance(content, str) else str(content)
+
+    return ask
+
+
+@contextmanager
+def _history_free(agent: Any) -> Iterator[Any]:
+    """Hold ``agent`` for one prompt that must not see any earlier one.
+
+    An exclusively leased agent is reset.  A BatchScheduler is shared with
+    the other workers, so the prompt goes through a fresh Conversation on
+    it; a CascadeRouter applies the same to whichever tier answers.
+    """
+    if getattr(agent, "shared", False) is not True:
+        reset = getattr(agent, "reset", None)
+        if callable(reset):
+            reset()
+        yield agent
+    elif callable(getattr(agent, "conversation", None)):
+        yield agent.conversation(None)
+    elif callable(getattr(agent, "for_session", None)):
+        yield agent.for_session(_history_free)
+    else:
+        yield agent
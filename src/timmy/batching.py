@@ -0,0 +1,277 @@
+"""Micro-batching scheduler in front of TimmyAirLLMAgent.
+
+AirLLM streams every layer from disk on each forward pass, so two users
+asking at once each pay the full I/O bill.  BatchScheduler collects
+requests that arrive within ``max_wait_ms`` of each other (up to
+``max_batch_size``), answers them with one padded generate() call via
+TimmyAirLLMAgent.run_batch(), and hands each caller its own slice of the
+output.  A lone request falls through to the agent's normal run() so it
+keeps the prefix KV cache.
+
+Streaming requests — the dashboard's SSE chat and the daemon stream every
+turn — batch like the rest: each streaming row gets its text deltas as
+they decode, and a caller that stops reading drops out of the batch (the
+batch ends early once nobody is left).
+
+The scheduler is a drop-in for the agent (run / print_response), safe to
+share between threads, and marked ``shared`` so the agent pool hands the
+same instance to every concurrent caller instead of serialising them.
+
+Callers that share it yet must not share a history — dashboard sessions,
+nightly batch prompts — each talk through a Conversation
+(``scheduler.conversation(session_id)``): its own transcript, context
+window and memory scope, which its rows are built from and recorded
+into, whoever they are batched with.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional, Union
+
+from config import settings
+from timmy.backends import _TRANSCRIPT_LINES, BatchTurn, RunResult, TimmyAirLLMAgent
+from timmy.context import ContextWindow
+from timmy.inference import GenerationCancelled, until_cancelled
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+# Session conversations kept per scheduler, least recently used out first.
+# One that falls out is simply rebuilt (and re-seeded by the dashboard).
+_MAX_CONVERSATIONS = 64
+
+
+@dataclass
+class _Job:
+    message: str
+    stream: bool = False
+    future: Future = field(default_factory=Future)
+    chunks: Optional[queue.Queue] = None
+    # Set when a streaming caller stops reading; the scheduler then skips
+    # or stops the job instead of generating for nobody.
+    cancel: threading.Event = field(default_factory=threading.Event)
+    # The caller's Conversation; None runs on the agent's own.
+    conversation: Optional["Conversation"] = None
+
+
+class Conversation:
+    """One caller's conversation on a shared BatchScheduler.
+
+    Has the agent interface the dashboard syncs sessions through — run(),
+    reset(), restore(), ``session_id`` / ``session_turns`` — and the
+    transcript TimmyAirLLMAgent builds this caller's prompts from and
+    records its exchanges into.  A session's conversation recalls from and
+    adds to that session's long-term memory; a blank one uses none.
+    """
+
+    def __init__(self, scheduler: "BatchScheduler", session_id: Optional[str] = None) -> None:
+        self.scheduler = scheduler
+        self.session_id = session_id
+        self.session_turns: Optional[int] = None
+        self.memory_scope = session_id
+        self._history: list[str] = []
+        self.turns = 0
+        self._context = ContextWindow(
+            budget_tokens=settings.context_budget_tokens,
+            summary_tokens=settings.context_summary_tokens,
+            count_tokens=scheduler.agent._count_tokens,
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        # stats(), profile and the rest come from the scheduler and agent.
+        if name == "scheduler":
+            raise AttributeError(name)
+        return getattr(self.scheduler, name)
+
+    def run(self, message: str, *, stream: bool = False) -> Union[RunResult, Iterator[RunResult]]:
+        return self.scheduler.run(message, stream=stream, conversation=self)
+
+    def print_response(self, message: str, *, stream: bool = True) -> None:
+        result = self.run(message, stream=False)
+        self.scheduler.agent._render(result.content)
+
+    def reset(self) -> None:
+        self._history.clear()
+        self.turns = 0
+        self._context.clear()
+
+    def restore(self, exchanges: list[tuple[str, str]]) -> None:
+        self.reset()
+        for message, response in exchanges:
+            self._remember(message, response)
+
+    def _remember(self, message: str, response: str) -> None:
+        self._history.append(f"User: {message}")
+        self._history.append(f"Timmy: {response}")
+        del self._history[:-_TRANSCRIPT_LINES]
+        self.turns += 1
+        self._context.add_exchange(message, response)
+
+
+class BatchScheduler:
+    """Collects concurrent run() calls into shared generate() batches."""
+
+    # Tells AgentPool this object may be handed to several callers at once.
+    shared = True
+
+    def __init__(self, agent: TimmyAirLLMAgent, max_batch_size: int = 4, max_wait_ms: float = 25.0) -> None:
+        self.agent = agent
+        self._max_batch = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000
+        self._pending: deque[_Job] = deque()
+        self._cond = threading.Condition()
+        self._batches = 0
+        self._batched_requests = 0
+        self._largest_batch = 0
+        self._conversations: OrderedDict[str, Conversation] = OrderedDict()
+        self._worker = threading.Thread(target=self._loop, name="airllm-batcher", daemon=True)
+        self._worker.start()
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (history, model, render helpers) lives on the agent.
+        if name == "agent":
+            raise AttributeError(name)
+        return getattr(self.agent, name)
+
+    # ── public interface (mirrors TimmyAirLLMAgent) ─────────────────────────
+
+    def run(
+        self, message: str, *, stream: bool = False, conversation: Optional[Conversation] = None
+    ) -> Union[RunResult, Iterator[RunResult]]:
+        if stream:
+            job = _Job(message, stream=True, chunks=queue.Queue(), conversation=conversation)
+            self._enqueue(job)
+            return self._drain(job)
+        job = _Job(message, conversation=conversation)
+        self._enqueue(job)
+        return job.future.result()
+
+    def conversation(self, session_id: Optional[str]) -> Conversation:
+        """The Conversation for ``session_id``; a new, empty one for None."""
+        if session_id is None:
+            return Conversation(self)
+        with self._cond:
+            found = self._conversations.pop(session_id, None)
+            if found is None:
+                found = Conversation(self, session_id)
+            self._conversations[session_id] = found
+            while len(self._conversations) > _MAX_CONVERSATIONS:
+                self._conversations.popitem(last=False)
+            return found
+
+    def print_response(self, message: str, *, stream: bool = True) -> None:
+        """Run through the scheduler and render like the wrapped agent."""
+        result = self.run(message, stream=False)
+        self.agent._render(result.content)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "batches": self._batches,
+                "batched_requests": self._batched_requests,
+                "largest_batch": self._largest_batch,
+            }
+
+    # ── scheduling ──────────────────────────────────────────────────────────
+
+    def _enqueue(self, job: _Job) -> None:
+        with self._cond:
+            self._pending.append(job)
+            self._cond.notify()
+
+    @staticmethod
+    def _drain(job: _Job) -> Iterator[RunResult]:
+        try:
+            while True:
+                item = job.chunks.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            job.cancel.set()
+
+    def _next_batch(self) -> list[_Job]:
+        """Block for the first job, then gather more until the window closes."""
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            batch = [self._pending.popleft()]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch:
+                while self._pending and len(batch) < self._max_batch:
+                    batch.append(self._pending.popleft())
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self._max_batch or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return batch
+
+    def _loop(self) -> None:
+        while True:
+            # Streams whose consumer already left are dropped unrun.
+            batch = [job for job in self._next_batch() if not job.cancel.is_set()]
+            if len(batch) > 1:
+                self._run_batch(batch)
+            elif batch and batch[0].stream:
+                self._run_stream(batch[0])
+            elif batch:
+                self._run_single(batch[0])
+
+    def _run_single(self, job: _Job) -> None:
+        try:
+            job.future.set_result(self.agent.run(job.message, conversation=job.conversation))
+        except Exception as exc:
+            job.future.set_exception(exc)
+
+    def _run_stream(self, job: _Job) -> None:
+        if job.cancel.is_set():
+            return
+        try:
+            chunks = self.agent.run(job.message, stream=True, conversation=job.conversation)
+            for chunk in until_cancelled(chunks, job.cancel):
+                job.chunks.put(chunk)
+            job.chunks.put(_END)
+        except GenerationCancelled:
+            logger.info("BatchScheduler: stream abandoned — generation stopped")
+        except Exception as exc:
+            job.chunks.put(exc)
+
+    def _run_batch(self, batch: list[_Job]) -> None:
+        with self._cond:
+            self._batches += 1
+            self._batched_requests += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+        logger.info("BatchScheduler: generating %d requests in one pass", len(batch))
+        turns = [
+            BatchTurn(job.message, on_text=self._forward(job), cancel=job.cancel,
+                      conversation=job.conversation)
+            if job.stream else BatchTurn(job.message, conversation=job.conversation)
+            for job in batch
+        ]
+        try:
+            results = self.agent.run_batch(turns)
+        except Exception as exc:
+            for job in batch:
+                if job.stream:
+                    job.chunks.put(exc)
+                else:
+                    job.future.set_exception(exc)
+            return
+        for job, result in zip(batch, results):
+            if job.stream:
+                job.chunks.put(_END)
+            else:
+                job.future.set_result(result)
+
+    @staticmethod
+    def _forward(job: _Job):
+        return lambda text: job.chunks.put(RunResult(content=text))
@@ -0,0 +1,437 @@
+"""Latency / throughput harness behind `timmy bench`.
+
+Runs a fixed prompt set against a target at a given concurrency and
+reports, per request, time to first token (TTFT), end-to-end latency and
+decode rate, plus p50/p95/p99 summaries, aggregate throughput and the
+process's peak RSS.  Results serialise to JSON so runs on different
+boxes, backends or settings can be diffed.
+
+Targets are callables that take a prompt and yield streamed text chunks
+(one chunk ≈ one token for both Ollama and the AirLLM streamer):
+
+  * AgentTarget — whatever create_timmy() builds, leased from the agent
+    pool, so the numbers include Agno / AirLLM overhead;
+  * HttpTarget  — Ollama's /api/chat over HTTP, no Agno in the way.  Used
+    with timmy.fake_ollama to check the harness itself offline.
+"""
+
+import json
+import math
+import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional
+
+import httpx
+
+# Fixed prompt set — short and long asks, so TTFT and decode rate both show.
+BENCH_PROMPTS: list[str] = [
+    "Reply with one word: ready?",
+    "What is sovereignty, in one sentence?",
+    "List three benefits of running AI models locally.",
+    "Explain how a Bitcoin hardware wallet protects private keys.",
+    "Summarise the trade-offs between a 8B and a 70B model on a laptop.",
+    "Write a short haiku about a lighthouse.",
+    "Describe, step by step, how to back up a seed phrase safely.",
+    "What does the Lightning Network add on top of Bitcoin? Answer in a paragraph.",
+]
+
+Target = Callable[[str], Iterator[str]]
+
+
+@dataclass
+class Sample:
+    """One measured request."""
+    prompt: str
+    latency_ms: float
+    ttft_ms: Optional[float] = None
+    tokens: int = 0
+    error: Optional[str] = None
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        """Decode rate: tokens after the first, over the time after the first."""
+        if self.ttft_ms is None or self.tokens < 2:
+            return None
+        decode_s = (self.latency_ms - self.ttft_ms) / 1000
+        return (self.tokens - 1) / decode_s if decode_s > 0 else None
+
+
+@dataclass
+class BenchReport:
+    config: dict
+    samples: list[Sample] = field(default_factory=list)
+    wall_s: float = 0.0
+    warmup_ms: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+
+    def summary(self) -> dict:
+        ok = [s for s in self.samples if s.error is None]
+        ttft = [s.ttft_ms for s in ok if s.ttft_ms is not None]
+        rates = [r for r in (s.tokens_per_sec for s in ok) if r is not None]
+        tokens = sum(s.tokens for s in ok)
+        return {
+            "requests": len(self.samples),
+            "errors": len(self.samples) - len(ok),
+            "ttft_ms": _percentiles(ttft),
+            "latency_ms": _percentiles([s.latency_ms for s in ok]),
+            "tokens_per_sec": round(sum(rates) / len(rates), 1) if rates else None,
+            "throughput_tokens_per_sec": round(tokens / self.wall_s, 1) if self.wall_s else None,
+            "tokens": tokens,
+            "wall_s": round(self.wall_s, 3),
+            "warmup_ms": None if self.warmup_ms is None else round(self.warmup_ms, 1),
+            "peak_rss_mb": self.peak_rss_mb,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "config": self.config,
+            "summary": self.summary(),
+            "samples": [asdict(s) | {"tokens_per_sec": s.tokens_per_sec} for s in self.samples],
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * pct / 100))
+    return ordered[rank - 1]
+
+
+def _percentiles(values: list[float]) -> dict:
+    return {
+        f"p{p}": None if (v := percentile(values, p)) is None else round(v, 1)
+        for p in (50, 95, 99)
+    }
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    divisor = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+# ── Targets ──────────────────────────────────────────────────────────────────
+
+class AgentTarget:
+    """Streams from a pooled create_timmy() agent.
+
+    Each prompt is timed on its own: an exclusively leased agent is reset
+    first, so earlier prompts never pad its context (a shared one, like
+    BatchScheduler, keeps its history — as in batch jobs).
+    """
+
+    def __init__(self, backend: Optional[str] = None, model_size: Optional[str] = None,
+                 factory: Optional[Callable] = None) -> None:
+        self.backend = backend
+        self.model_size = model_size
+        self._factory = factory
+
+    def __call__(self, prompt: str) -> Iterator[str]:
+        from timmy.pool import agent_pool
+        with agent_pool.lease(backend=self.backend, model_size=self.model_size,
+                              factory=self._factory) as agent:
+            reset = getattr(agent, "reset", None)
+            if callable(reset) and getattr(agent, "shared", False) is not True:
+                reset()
+            for chunk in agent.run(prompt, stream=True):
+                text = getattr(chunk, "content", None)
+                if isinstance(text, str) and text:
+                    yield text
+
+    def close(self) -> None:
+        pass
+
+
+class HttpTarget:
+    """Streams from Ollama's /api/chat over one pooled HTTP client."""
+
+    def __init__(self, base_url: str, model: str, timeout: float = 300.0) -> None:
+        self.model = model
+        self._client = httpx.Client(base_url=base_url, timeout=timeout)
+
+    def __call__(self, prompt: str) -> Iterator[str]:
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+        }
+        with self._client.stream("POST", "/api/chat", json=payload) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if "error" in data:
+                    raise RuntimeError(data["error"])
+                text = (data.get("message") or {}).get("content")
+                if text:
+                    yield text
+                if data.get("done"):
+                    return
+
+    def close(self) -> None:
+        self._client.close()
+
+
+# ── Runner ───────────────────────────────────────────────────────────────────
+
+def measure(target: Target, prompt: str) -> Sample:
+    """Run one prompt to completion, timing the first chunk and the whole."""
+    start = time.perf_counter()
+    ttft_ms = None
+    tokens = 0
+    try:
+        for _ in target(prompt):
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - start) * 1000
+            tokens += 1
+    except Exception as exc:
+        return Sample(prompt, (time.perf_counter() - start) * 1000, ttft_ms, tokens,
+                      error=str(exc) or type(exc).__name__)
+    return Sample(prompt, (time.perf_counter() - start) * 1000, ttft_ms, tokens)
+
+
+def run_bench(
+    target: Target,
+    prompts: Optional[list[str]] = None,
+    concurrency: int = 1,
+    rounds: int = 1,
+    warmup: bool = True,
+    config: Optional[dict] = None,
+) -> BenchReport:
+    """Run every prompt ``rounds`` times with ``concurrency`` requests in flight.
+
+    With ``warmup`` one unmeasured request goes first, so a model load
+    shows up as ``warmup_ms`` instead of skewing the percentiles.
+    """
+    prompts = list(prompts or BENCH_PROMPTS)
+    concurrency = max(1, concurrency)
+    report = BenchReport(config={
+        **(config or {}),
+        "concurrency": concurrency,
+        "rounds": rounds,
+        "prompts": len(prompts),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "platform": f"{platform.system()} {platform.machine()}",
+        "python": platform.python_version(),
+    })
+
+    if warmup:
+        report.warmup_ms = measure(target, prompts[0]).latency_ms
+
+    jobs = prompts * max(1, rounds)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        report.samples = list(pool.map(lambda p: measure(target, p), jobs))
+    report.wall_s = time.perf_counter() - start
+    report.peak_rss_mb = peak_rss_mb()
+    return report
+
+
+def format_report(report: BenchReport) -> str:
+    """Human-readable summary for the CLI."""
+    s = report.summary()
+
+    def row(label: str, stats: dict) -> str:
+        cells = "  ".join(
+            f"{k} {'—' if v is None else f'{v:.1f}'}".ljust(14) for k, v in stats.items()
+        )
+        return f"  {label:<12}{cells}"
+
+    def num(value, unit: str) -> str:
+        return "—" if value is None else f"{value} {unit}"
+
+    lines = [
+        f"Requests: {s['requests']} ({s['errors']} failed), "
+        f"concurrency {report.config['concurrency']}, wall {s['wall_s']} s",
+        row("TTFT ms", s["ttft_ms"]),
+        row("latency ms", s["latency_ms"]),
+        f"  {'decode':<12}{num(s['tokens_per_sec'], 'tok/s per request')}",
+        f"  {'throughput':<12}{num(s['throughput_tokens_per_sec'], 'tok/s overall')}",
+        f"  {'warm-up':<12}{num(s['warmup_ms'], 'ms')}",
+        f"  {'peak RSS':<12}{num(s['peak_rss_mb'], 'MiB (this process)')}",
+    ]
+    errors = [x.error for x in report.samples if x.error]
+    if errors:
+        lines.append(f"  first error: {errors[0]}")
+    return "\n".join(lines)
+
+
+# ── Cold vs warm page cache (AirLLM) ─────────────────────────────────────────
+
+@dataclass
+class ColdWarmReport:
+    """First-token latency with the layer shards evicted, then prewarmed."""
+    shards: int
+    shard_bytes: int
+    cold: Sample
+    warm: Sample
+    prewarm_ms: float
+    evicted: bool
+
+    def to_dict(self) -> dict:
+        return {
+            "shards": self.shards,
+            "shard_bytes": self.shard_bytes,
+            "evicted": self.evicted,
+            "prewarm_ms": round(self.prewarm_ms, 1),
+            "cold": asdict(self.cold),
+            "warm": asdict(self.warm),
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+
+def run_cold_warm(target: Target, shards: list, prompt: Optional[str] = None) -> ColdWarmReport:
+    """Measure one prompt from a cold page cache, then after prewarm().
+
+    Both runs start by evicting the shards, so the warm number shows what
+    prewarming buys rather than what the cold run left cached.
+    """
+    from timmy.shards import evict, prewarm
+
+    prompt = prompt or BENCH_PROMPTS[0]
+    evicted = bool(shards) and evict(shards) == len(shards)
+    cold = measure(target, prompt)
+    evict(shards)
+    warm_stats = prewarm(shards)
+    warm = measure(target, prompt)
+    return ColdWarmReport(
+        shards=len(shards),
+        shard_bytes=sum(p.stat().st_size for p in shards),
+        cold=cold,
+        warm=warm,
+        prewarm_ms=warm_stats.seconds * 1000,
+        evicted=evicted,
+    )
+
+
+def format_cold_warm(report: ColdWarmReport) -> str:
+    """Human-readable cold/warm comparison for the CLI."""
+    def ttft(sample: Sample) -> str:
+        if sample.error:
+            return f"failed ({sample.error})"
+        return "—" if sample.ttft_ms is None else f"{sample.ttft_ms:.0f} ms"
+
+    lines = [
+        f"Layer shards: {report.shards} ({report.shard_bytes / 2**30:.1f} GiB)",
+        f"  {'cold TTFT':<12}{ttft(report.cold)}",
+        f"  {'warm TTFT':<12}{ttft(report.warm)}  (after {report.prewarm_ms:.0f} ms prewarm)",
+    ]
+    if not report.evicted:
+        lines.append("  note: could not drop the page cache here — the cold run may be warm")
+    return "\n".join(lines)
+
+
+# ── dashboard startup ────────────────────────────────────────────────────────
+
+# Runs in a fresh interpreter: no module or template is cached in memory.
+_STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from dashboard.app import app
+imported = time.perf_counter()
+from dashboard.templating import precompile
+count = precompile()
+compiled = time.perf_counter()
+from fastapi.testclient import TestClient
+status = TestClient(app).get("/").status_code
+served = time.perf_counter()
+print(json.dumps({
+    "templates": count,
+    "import_ms": (imported - start) * 1000,
+    "precompile_ms": (compiled - imported) * 1000,
+    "first_request_ms": (served - compiled) * 1000,
+    "status": status,
+}))
+"""
+
+
+@dataclass
+class StartupSample:
+    import_ms: float
+    precompile_ms: float
+    first_request_ms: float
+    status: int
+
+
+@dataclass
+class StartupReport:
+    """Dashboard cold start with an empty, then a populated, bytecode cache."""
+    templates: int
+    cold: StartupSample
+    warm: StartupSample
+
+    def to_dict(self) -> dict:
+        return {"templates": self.templates, "cold": asdict(self.cold), "warm": asdict(self.warm)}
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+
+def _startup_sample(cache_dir: str) -> tuple[int, StartupSample]:
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    src = str(Path(__file__).resolve().parent.parent)
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [src, os.environ.get("PYTHONPATH")])),
+        "DASHBOARD_TEMPLATE_CACHE": cache_dir,
+    }
+    proc = subprocess.run(
+        [sys.executable, "-c", _STARTUP_SCRIPT],
+        capture_output=True, text=True, env=env, timeout=120, check=True,
+    )
+    data = json.loads(proc.stdout.strip().splitlines()[-1])
+    return data.pop("templates"), StartupSample(**data)
+
+
+def run_startup() -> StartupReport:
+    """Time import, template precompile and first page in two fresh processes.
+
+    The first starts from an empty bytecode cache and fills it; the second
+    loads every template from it — what each dashboard restart costs.
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix="timmy-jinja-") as cache_dir:
+        templates, cold = _startup_sample(cache_dir)
+        _, warm = _startup_sample(cache_dir)
+    return StartupReport(templates=templates, cold=cold, warm=warm)
+
+
+def format_startup(report: StartupReport) -> str:
+    """Human-readable cold/warm startup comparison for the CLI."""
+    lines = [f"Dashboard startup ({report.templates} templates)"]
+    lines.append(f"  {'':<14}{'import':>10}{'precompile':>12}{'first GET /':>13}")
+    for label, s in (("cold cache", report.cold), ("warm cache", report.warm)):
+        lines.append(
+            f"  {label:<14}{s.import_ms:>8.0f}ms{s.precompile_ms:>10.0f}ms"
+            f"{s.first_request_ms:>11.0f}ms"
+            + ("" if s.status == 200 else f"  (HTTP {s.status})")
+        )
+    return "\n".join(lines)
@@ -0,0 +1,269 @@
+"""Small-model / large-model cascade behind TIMMY_MODEL_BACKEND=cascade.
+
+A single AIRLLM_MODEL_SIZE sends every prompt — "hi", "status?" — through
+a 70B or 405B model streamed layer by layer from disk.  The cascade scores
+each prompt with cheap local signals and answers the easy ones on the
+small tier (Ollama, or AirLLM 8B) and only the hard ones on the large
+AirLLM model:
+
+  * NLU intent (voice.nlu.detect_intent) — status / help / swarm / task /
+    voice commands are always easy;
+  * length — long prompts lean hard, and past cascade_max_easy_words
+    they are hard outright;
+  * keywords — "explain", "compare", "step by step", code, several
+    questions… push the score up; greetings and thanks pull it down.
+
+A score at or above cascade_threshold goes to the large tier.  Every
+decision is logged with its score and reasons, and each answer with its
+tier and latency, so the thresholds can be tuned from the logs (or from
+CascadeRouter.stats()).
+
+Tier agents are leased from the agent pool, so the router itself holds no
+conversation state and is safe to share; each tier keeps its own history.
+for_session() binds the router to one conversation: the dashboard uses it
+to re-seed each tier agent with that session's turns before it answers,
+so pooled tiers never carry one browser's context into another's.
+"""
+
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Iterator, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SMALL, LARGE = "small", "large"
+
+# Wraps one tier agent's turn — e.g. re-seeding it with a session's history.
+Sync = Callable[[Any], ContextManager[Any]]
+
+# Intents the NLU recognises as commands rather than open questions.
+_EASY_INTENTS = {"status", "help", "swarm", "task", "voice"}
+
+_HARD_PATTERNS: list[tuple[str, re.Pattern, float]] = [
+    ("reasoning", re.compile(
+        r"\b(why|explain|analy[sz]e|compare|contrast|evaluate|prove|derive|reason)\b",
+        re.IGNORECASE), 0.3),
+    ("long-form", re.compile(
+        r"\b(step[- ]by[- ]step|in detail|essay|report|summari[sz]e|trade-?offs?|pros and cons)\b",
+        re.IGNORECASE), 0.3),
+    ("code", re.compile(
+        r"```|\b(code|function|implement|refactor|debug|algorithm|regex|sql)\b",
+        re.IGNORECASE), 0.45),
+    ("planning", re.compile(r"\b(plan|design|architect|strategy|roadmap)\b", re.IGNORECASE), 0.2),
+]
+
+_EASY_PATTERN = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|ok(ay)?|yes|no|good (morning|night|evening))\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class Decision:
+    tier: str
+    score: float
+    reasons: list[str] = field(default_factory=list)
+
+
+def classify(
+    prompt: str,
+    threshold: float = 0.5,
+    max_easy_words: int = 40,
+) -> Decision:
+    """Score a prompt in [0, 1] and pick the tier that should answer it."""
+    from voice.nlu import detect_intent
+
+    intent = detect_intent(prompt)
+    if intent.name in _EASY_INTENTS:
+        return Decision(SMALL, 0.0, [f"intent={intent.name}"])
+
+    words = len(prompt.split())
+    if words > max_easy_words:
+        return Decision(LARGE, 1.0, [f"words={words}>{max_easy_words}"])
+
+    score = 0.5 * words / max(1, max_easy_words)
+    reasons = [f"words={words}"]
+    for name, pattern, weight in _HARD_PATTERNS:
+        if pattern.search(prompt):
+            score += weight
+            reasons.append(name)
+    if prompt.count("?") > 1:
+        score += 0.15
+        reasons.append("multi-question")
+    if _EASY_PATTERN.match(prompt):
+        score -= 0.3
+        reasons.append("small-talk")
+
+    score = min(1.0, max(0.0, score))
+    return Decision(LARGE if score >= threshold else SMALL, round(score, 2), reasons)
+
+
+@dataclass
+class _TierStats:
+    requests: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        ok = self.requests - self.errors
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / ok, 1) if ok else None,
+        }
+
+
+class CascadeRouter:
+    """Routes each prompt to the small or large tier; drop-in for an agent."""
+
+    # Safe to hand to concurrent callers: tier agents are leased per call.
+    shared = True
+
+    def __init__(
+        self,
+        small: tuple[str, Optional[str]] = ("ollama", None),
+        large: tuple[str, Optional[str]] = ("airllm", "70b"),
+        threshold: float = 0.5,
+        max_easy_words: int = 40,
+        factory: Optional[Callable[..., Any]] = None,
+        pool: Any = None,
+    ) -> None:
+        self.tiers = {SMALL: small, LARGE: large}
+        self.threshold = threshold
+        self.max_easy_words = max_easy_words
+        self._factory = factory
+        self._pool = pool
+        self._stats = {SMALL: _TierStats(), LARGE: _TierStats()}
+        self._used: set[str] = set()
+        self._lock = threading.Lock()
+
+    # ── public interface (mirrors Agno Agent) ────────────────────────────────
+
+    def route(self, message: str) -> Decision:
+        decision = classify(message, self.threshold, self.max_easy_words)
+        backend, size = self.tiers[decision.tier]
+        logger.info(
+            "Cascade: %s tier (%s%s) score=%.2f [%s]",
+            decision.tier, backend, f" {size}" if size else "",
+            decision.score, ", ".join(decision.reasons),
+        )
+        return decision
+
+    def run(self, message: str, *, stream: bool = False, sync: Optional[Sync] = None) -> Any:
+        tier = self.route(message).tier
+        if stream:
+            return self._run_stream(tier, message, sync)
+        start = time.perf_counter()
+        try:
+            with self._lease(tier, sync) as agent:
+                result = agent.run(message, stream=False)
+        except Exception:
+            self._record(tier, start, error=True)
+            raise
+        self._record(tier, start)
+        return result
+
+    def print_response(self, message: str, *, stream: bool = True) -> None:
+        tier = self.route(message).tier
+        start = time.perf_counter()
+        try:
+            with self._lease(tier) as agent:
+                agent.print_response(message, stream=stream)
+        except Exception:
+            self._record(tier, start, error=True)
+            raise
+        self._record(tier, start)
+
+    def for_session(self, sync: Sync) -> "SessionCascade":
+        """This router for one conversation; ``sync(agent)`` wraps each tier's turn."""
+        return SessionCascade(self, sync)
+
+    def reset(self) -> None:
+        """Forget the conversation on every tier used so far (never loads one)."""
+        for tier in sorted(self._used):
+            with self._lease(tier) as agent:
+                reset = getattr(agent, "reset", None)
+                if callable(reset):
+                    reset()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "threshold": self.threshold,
+                "max_easy_words": self.max_easy_words,
+                **{tier: {"backend": self.tiers[tier][0], "model_size": self.tiers[tier][1],
+                          **s.to_dict()} for tier, s in self._stats.items()},
+            }
+
+    # ── private helpers ──────────────────────────────────────────────────────
+
+    @contextmanager
+    def _lease(self, tier: str, sync: Optional[Sync] = None) -> Iterator[Any]:
+        pool = self._pool
+        if pool is None:
+            from timmy.pool import agent_pool as pool
+        self._used.add(tier)
+        backend, size = self.tiers[tier]
+        with pool.lease(backend=backend, model_size=size, factory=self._factory) as agent:
+            if sync is None:
+                yield agent
+            else:
+                # sync may hand back a stand-in (a scheduler's Conversation).
+                with sync(agent) as synced:
+                    yield synced
+
+    def _run_stream(self, tier: str, message: str, sync: Optional[Sync] = None) -> Iterator[Any]:
+        start = time.perf_counter()
+        try:
+            with self._lease(tier, sync) as agent:
+                yield from agent.run(message, stream=True)
+        except Exception:
+            self._record(tier, start, error=True)
+            raise
+        self._record(tier, start)
+
+    def _record(self, tier: str, start: float, error: bool = False) -> None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            stats = self._stats[tier]
+            stats.requests += 1
+            if error:
+                stats.errors += 1
+            else:
+                stats.total_ms += elapsed_ms
+        logger.info("Cascade: %s tier %s in %.0f ms", tier, "failed" if error else "answered",
+                    elapsed_ms)
+
+
+class SessionCascade:
+    """A CascadeRouter bound to one conversation (see CascadeRouter.for_session)."""
+
+    shared = True
+
+    def __init__(self, router: CascadeRouter, sync: Sync) -> None:
+        self.router = router
+        self._sync = sync
+
+    def run(self, message: str, *, stream: bool = False) -> Any:
+        return self.router.run(message, stream=stream, sync=self._sync)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.router, name)
+
+
+def create_cascade(factory: Optional[Callable[..., Any]] = None) -> CascadeRouter:
+    """Build the router from settings (cascade_* and airllm_model_size)."""
+    small = ("ollama", None) if settings.cascade_small_tier == "ollama" else ("airllm", "8b")
+    return CascadeRouter(
+        small=small,
+        large=("airllm", settings.airllm_model_size),
+        threshold=settings.cascade_threshold,
+        max_easy_words=settings.cascade_max_easy_words,
+        factory=factory,
+    )
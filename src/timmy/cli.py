@@ -2,9 +2,12 @@ from typing import Optional
 
 import typer
 
-from timmy.agent import create_timmy
 from timmy.prompts import TIMMY_STATUS_PROMPT
 
+# Keep module scope light: config (pydantic-settings), timmy.agent (Agno),
+# httpx and the backends are imported inside the commands that need them,
+# so `timmy --help` stays fast.  tests/test_cli_startup.py holds the budget.
+
 app = typer.Typer(help="Timmy — sovereign AI agent")
 
 # Shared option definitions (reused across commands for consistency).
@@ -12,14 +15,52 @@ _BACKEND_OPTION = typer.Option(
     None,
     "--backend",
     "-b",
-    help="Inference backend: 'ollama' (default) | 'airllm' | 'auto'",
+    help="Inference backend: 'ollama' (default) | 'airllm' | 'auto' | 'cascade'",
 )
 _MODEL_SIZE_OPTION = typer.Option(
     None,
     "--model-size",
     "-s",
-    help="AirLLM model size when --backend airllm: '8b' | '70b' | '405b'",
+    help="AirLLM model size when --backend airllm: '8b' | '70b' | '405b' | 'auto'",
 )
+_QUANTIZATIONS = ("none", "8bit", "4bit", "auto")
+
+
+@app.callback()
+def _main(
+    quantization: Optional[str] = typer.Option(
+        None,
+        "--quantization",
+        "-q",
+        help="AirLLM weight compression: 'none' | '8bit' | '4bit' | 'auto' "
+             "(default: AIRLLM_QUANTIZATION)",
+    ),
+):
+    """Timmy — sovereign AI agent"""
+    if quantization is None:
+        return
+    if quantization not in _QUANTIZATIONS:
+        raise typer.BadParameter(
+            f"{quantization!r} is not one of {', '.join(_QUANTIZATIONS)}",
+            param_hint="--quantization",
+        )
+    from config import settings
+    settings.airllm_quantization = quantization
+
+
+def _get_timmy(backend: Optional[str], model_size: Optional[str]):
+    """Return a `timmy daemon` client if one serves the requested model, else a local agent."""
+    from timmy.agent import _resolve_backend, create_timmy
+
+    if _resolve_backend(backend) == "airllm":
+        from config import settings
+        from timmy.daemon import connect_daemon
+        client = connect_daemon()
+        if client is not None \
+                and client.model_size == (model_size or settings.airllm_model_size) \
+                and client.info.get("quantization", "none") == settings.airllm_quantization:
+            return client
+    return create_timmy(backend=backend, model_size=model_size)
 
 
 @app.command()
@@ -29,7 +70,7 @@ def think(
     model_size: Optional[str] = _MODEL_SIZE_OPTION,
 ):
     """Ask Timmy to think carefully about a topic."""
-    timmy = create_timmy(backend=backend, model_size=model_size)
+    timmy = _get_timmy(backend, model_size)
     timmy.print_response(f"Think carefully about: {topic}", stream=True)
 
 
@@ -40,7 +81,7 @@ def chat(
     model_size: Optional[str] = _MODEL_SIZE_OPTION,
 ):
     """Send a message to Timmy."""
-    timmy = create_timmy(backend=backend, model_size=model_size)
+    timmy = _get_timmy(backend, model_size)
     timmy.print_response(message, stream=True)
 
 
@@ -48,11 +89,213 @@ def chat(
 def status(
     backend: Optional[str] = _BACKEND_OPTION,
     model_size: Optional[str] = _MODEL_SIZE_OPTION,
+    measure: bool = typer.Option(
+        False, "--measure", help="Measure disk read speed for the AirLLM cost estimate"
+    ),
 ):
     """Print Timmy's operational status."""
-    timmy = create_timmy(backend=backend, model_size=model_size)
+    from timmy.agent import _resolve_backend
+
+    if _resolve_backend(backend) in ("airllm", "cascade"):
+        from timmy.profiles import describe, detect_hardware, resolve_profile
+
+        # Only an "auto" profile needs the disk test to be picked.
+        profile = resolve_profile(model_size)
+        hardware = detect_hardware(measure=measure)
+        typer.echo(describe(profile, hardware))
+    timmy = _get_timmy(backend, model_size)
     timmy.print_response(TIMMY_STATUS_PROMPT, stream=False)
 
 
+@app.command()
+def repl(
+    backend: Optional[str] = _BACKEND_OPTION,
+    model_size: Optional[str] = _MODEL_SIZE_OPTION,
+):
+    """Chat with Timmy interactively, keeping one agent loaded across turns."""
+    from timmy.repl import Repl
+
+    Repl(backend, model_size, loader=_get_timmy).run()
+
+
+@app.command()
+def daemon(
+    model_size: Optional[str] = _MODEL_SIZE_OPTION,
+    socket: Optional[str] = typer.Option(
+        None, "--socket", help="Unix socket path (default: TIMMY_DAEMON_SOCKET)"
+    ),
+):
+    """Load the AirLLM model once and serve other timmy commands over a socket."""
+    import logging
+
+    from config import settings
+    from timmy.agent import create_timmy
+    from timmy.daemon import TimmyDaemon
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s — %(message)s")
+    size = model_size or settings.airllm_model_size
+    typer.echo(f"Loading AirLLM {size} — this happens once per daemon...")
+    agent = create_timmy(backend="airllm", model_size=size)
+    server = TimmyDaemon(agent, model_size=size, path=socket)
+    typer.echo(f"Timmy daemon listening on {server.path} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        typer.echo("Timmy daemon stopped.")
+
+
+@app.command()
+def bench(
+    backend: Optional[str] = _BACKEND_OPTION,
+    model_size: Optional[str] = _MODEL_SIZE_OPTION,
+    concurrency: int = typer.Option(1, "--concurrency", "-c", help="Requests in flight at once"),
+    rounds: int = typer.Option(1, "--rounds", "-n", help="Times to run the prompt set"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Write JSON results here"),
+    ollama_url: Optional[str] = typer.Option(
+        None, "--ollama-url", help="Bench Ollama's HTTP API at this URL directly (no Agno)"
+    ),
+    fake: bool = typer.Option(
+        False, "--fake", help="Bench the bundled fake Ollama server (offline harness check)"
+    ),
+    cold_warm: bool = typer.Option(
+        False, "--cold-warm", help="AirLLM: first-token latency from a cold vs prewarmed page cache"
+    ),
+    startup: bool = typer.Option(
+        False, "--startup", help="Dashboard: import, template compile and first-page time"
+    ),
+):
+    """Measure TTFT, tokens/sec, latency percentiles and peak RSS."""
+    from config import settings
+    from timmy.agent import _resolve_backend, create_timmy
+    from timmy.bench import AgentTarget, HttpTarget, format_report, run_bench
+
+    if cold_warm:
+        _bench_cold_warm(backend, model_size, output)
+        return
+    if startup:
+        from timmy.bench import format_startup, run_startup
+
+        typer.echo("Starting the dashboard twice (empty, then warm template cache)...")
+        startup_report = run_startup()
+        typer.echo(format_startup(startup_report))
+        if output:
+            startup_report.write_json(output)
+            typer.echo(f"Results written to {output}")
+        return
+
+    fake_server = None
+    if fake:
+        from timmy.fake_ollama import FakeOllama
+        fake_server = FakeOllama(model=settings.ollama_model).start()
+        ollama_url = fake_server.url
+
+    if ollama_url:
+        target = HttpTarget(ollama_url, settings.ollama_model)
+        config = {"target": "ollama-http", "url": ollama_url,
+                  "model": settings.ollama_model, "fake": fake}
+    else:
+        resolved = _resolve_backend(backend)
+        target = AgentTarget(backend=resolved, model_size=model_size, factory=create_timmy)
+        config = {"target": "agent", "backend": resolved,
+                  "model": settings.ollama_model if resolved == "ollama"
+                  else model_size or settings.airllm_model_size}
+
+    typer.echo(f"Benchmarking {config['target']} ({config['model']})...")
+    try:
+        report = run_bench(target, concurrency=concurrency, rounds=rounds, config=config)
+    finally:
+        target.close()
+        if fake_server is not None:
+            fake_server.stop()
+
+    typer.echo(format_report(report))
+    if output:
+        report.write_json(output)
+        typer.echo(f"Results written to {output}")
+
+
+def _bench_cold_warm(backend: Optional[str], model_size: Optional[str],
+                     output: Optional[str]) -> None:
+    from timmy.agent import _resolve_backend, create_timmy
+    from timmy.bench import AgentTarget, format_cold_warm, run_cold_warm
+    from timmy.pool import agent_pool
+
+    resolved = _resolve_backend(backend or "airllm")
+    if resolved != "airllm":
+        typer.echo("--cold-warm measures AirLLM layer shards; use --backend airllm.")
+        raise typer.Exit(1)
+    typer.echo("Loading AirLLM...")
+    with agent_pool.lease(backend=resolved, model_size=model_size, factory=create_timmy) as agent:
+        shards = agent.shards
+    if not shards:
+        typer.echo("No layer shards found on disk for this model.")
+        raise typer.Exit(1)
+
+    target = AgentTarget(backend=resolved, model_size=model_size, factory=create_timmy)
+    report = run_cold_warm(target, shards)
+    typer.echo(format_cold_warm(report))
+    if output:
+        report.write_json(output)
+        typer.echo(f"Results written to {output}")
+
+
+@app.command()
+def batch(
+    source: str = typer.Argument(..., help="JSONL file of {\"id\", \"prompt\"} objects"),
+    out: str = typer.Option(..., "--out", "-o", help="JSONL results file (appended; resumable)"),
+    concurrency: int = typer.Option(1, "--concurrency", "-c", help="Prompts in flight at once"),
+    backend: Optional[str] = _BACKEND_OPTION,
+    model_size: Optional[str] = _MODEL_SIZE_OPTION,
+):
+    """Answer every prompt in a JSONL file with one pool of agents."""
+    import time
+    from pathlib import Path
+
+    from rich.progress import (
+        BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn,
+        TimeRemainingColumn,
+    )
+
+    from timmy.agent import create_timmy
+    from timmy.batch import agent_asker, count_pending, run_batch
+
+    source_path, out_path = Path(source), Path(out)
+    if not source_path.is_file():
+        typer.echo(f"No such file: {source}", err=True)
+        raise typer.Exit(1)
+
+    pending = count_pending(source_path, out_path)
+    if pending == 0:
+        typer.echo(f"Nothing to do — every prompt already has a result in {out}.")
+        return
+
+    ask = agent_asker(backend, model_size, concurrency, factory=create_timmy)
+    progress = Progress(
+        TextColumn("[bold]batch"), BarColumn(), MofNCompleteColumn(),
+        TextColumn("{task.fields[rate]:.2f} prompts/s"), TextColumn("{task.fields[failed]} failed"),
+        TimeElapsedColumn(), TimeRemainingColumn(),
+    )
+    with progress:
+        task = progress.add_task("batch", total=pending, rate=0.0, failed=0)
+        started = time.perf_counter()
+        done = failed = 0
+
+        def advance(row: dict) -> None:
+            nonlocal done, failed
+            done += 1
+            failed += bool(row.get("error"))
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            progress.update(task, advance=1, rate=rate, failed=failed)
+
+        stats = run_batch(source_path, out_path, ask, concurrency=concurrency, on_result=advance)
+
+    typer.echo(
+        f"{stats.ok} answered, {stats.failed} failed, {stats.skipped} already done "
+        f"in {stats.wall_s:.1f}s ({stats.per_sec:.2f} prompts/s) → {out}"
+    )
+    if stats.failed:
+        raise typer.Exit(1)
+
+
 def main():
     app()
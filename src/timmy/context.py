@@ -0,0 +1,196 @@
+"""Token-budgeted conversation context shared by both Timmy backends.
+
+The AirLLM agent used to paste the last 10 history lines into every prompt
+whatever their length, and the tokenizer's ``max_length`` then silently
+cut the *newest* message off the end.  The Ollama agent replayed a fixed
+10 runs from SQLite.  Either way prompt size — and prefill latency —
+grew with the session.
+
+ContextWindow keeps the conversation as lines ("User: …" / "Timmy: …")
+and renders the newest lines that fit a token budget.  Lines that no
+longer fit are folded, oldest first, into a rolling summary that is
+computed once per fold and cached.  Folding overshoots to ``fold_ratio``
+of the budget, so the rendered prefix stays byte-identical for several
+turns in a row and the AirLLM prefix KV cache keeps hitting.
+
+Usage:
+    window = ContextWindow(budget_tokens=1024, count_tokens=token_counter(tok))
+    window.add_exchange("hello", "Sir, affirmative.")
+    prompt = TIMMY_SYSTEM_PROMPT + window.render(reserve=len(message_tokens))
+"""
+
+import logging
+import re
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+# (previous summary, newly folded lines, token limit, counter) → new summary
+Summarizer = Callable[[str, list[str], int, TokenCounter], str]
+
+# Rough English average; used when no tokenizer is available.
+_CHARS_PER_TOKEN = 4
+# Per folded line, the summary keeps at most this many characters.
+_SUMMARY_LINE_CHARS = 160
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def token_counter(tokenizer=None) -> TokenCounter:
+    """Counter backed by ``tokenizer.encode`` with an approx_tokens fallback.
+
+    Falls back per call when encode() fails or does not return a list of
+    IDs, so a half-loaded (or mocked) tokenizer never breaks prompting.
+    """
+    encode = getattr(tokenizer, "encode", None)
+    if encode is None:
+        return approx_tokens
+
+    def count(text: str) -> int:
+        try:
+            ids = encode(text, add_special_tokens=False)
+        except Exception:
+            return approx_tokens(text)
+        if isinstance(ids, (list, tuple)):
+            return len(ids)
+        return approx_tokens(text)
+
+    return count
+
+
+def extractive_summary(
+    previous: str, lines: list[str], limit: int, count: TokenCounter
+) -> str:
+    """Default summarizer: first sentence of each folded line, newest kept.
+
+    No model call — folding happens on the request path and must stay
+    cheap.  When the summary outgrows ``limit`` tokens its oldest lines
+    are dropped.
+    """
+    kept = previous.splitlines() if previous else []
+    for line in lines:
+        first = _SENTENCE_END.split(line.strip(), maxsplit=1)[0]
+        if len(first) > _SUMMARY_LINE_CHARS:
+            first = first[: _SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+        if first:
+            kept.append(first)
+    while kept and count("\n".join(kept)) > limit:
+        kept.pop(0)
+    return "\n".join(kept)
+
+
+class ContextWindow:
+    """Conversation lines rendered newest-first into a fixed token budget."""
+
+    def __init__(
+        self,
+        budget_tokens: int = 1024,
+        summary_tokens: int = 256,
+        count_tokens: Optional[TokenCounter] = None,
+        summarize: Optional[Summarizer] = None,
+        fold_ratio: float = 0.5,
+    ) -> None:
+        self.budget_tokens = max(0, budget_tokens)
+        self.summary_tokens = max(0, min(summary_tokens, self.budget_tokens))
+        self._count = count_tokens or approx_tokens
+        self._summarize = summarize or extractive_summary
+        self._fold_ratio = min(max(fold_ratio, 0.0), 1.0)
+        # Unfolded lines with their cached token counts.
+        self._lines: list[tuple[str, int]] = []
+        self._summary = ""
+        self._summary_cost = 0
+        self._lock = threading.Lock()
+        self.folds = 0
+
+    # ── recording ───────────────────────────────────────────────────────────
+
+    def add(self, line: str) -> None:
+        with self._lock:
+            self._lines.append((line, self._count(line)))
+
+    def add_exchange(self, message: str, response: str) -> None:
+        self.add(f"User: {message}")
+        self.add(f"Timmy: {response}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lines.clear()
+            self._summary = ""
+            self._summary_cost = 0
+
+    # ── rendering ───────────────────────────────────────────────────────────
+
+    def render(self, reserve: int = 0) -> str:
+        """Return summary + recent lines fitting ``budget_tokens - reserve``.
+
+        ``reserve`` is what the caller still has to add (typically the new
+        user message), so the newest input is never what gets cut.  Returns
+        "" when there is no history, else a block ending in a blank line.
+        """
+        available = max(0, self.budget_tokens - reserve)
+        with self._lock:
+            if self._cost() > available:
+                self._fold(int(available * self._fold_ratio))
+            parts = []
+            if self._summary:
+                parts.append(f"Earlier in this conversation:\n{self._summary}")
+            if self._lines:
+                parts.append("\n".join(line for line, _ in self._lines))
+        return "\n\n".join(parts) + "\n\n" if parts else ""
+
+    def _cost(self) -> int:
+        return self._summary_cost + sum(n for _, n in self._lines)
+
+    def _fold(self, target: int) -> None:
+        """Move the oldest lines into the summary until the cost fits target.
+
+        Caller holds the lock.  Lines are never unfolded, so the rendered
+        prefix only changes when this runs.
+        """
+        folded: list[str] = []
+        recent = sum(n for _, n in self._lines)
+        while self._lines and self._summary_tokens_for(target) + recent > target:
+            line, n = self._lines.pop(0)
+            folded.append(line)
+            recent -= n
+        if not folded:
+            return
+        limit = self._summary_tokens_for(target)
+        self._summary = (
+            self._summarize(self._summary, folded, limit, self._count) if limit else ""
+        )
+        self._summary_cost = self._count(self._summary) if self._summary else 0
+        self.folds += 1
+        logger.debug(
+            "ContextWindow: folded %d line(s); %d kept, summary %d tokens",
+            len(folded), len(self._lines), self._summary_cost,
+        )
+
+    def _summary_tokens_for(self, target: int) -> int:
+        return min(self.summary_tokens, target)
+
+    # ── introspection ───────────────────────────────────────────────────────
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "lines": len(self._lines),
+                "tokens": self._cost(),
+                "summary_tokens": self._summary_cost,
+                "budget_tokens": self.budget_tokens,
+                "folds": self.folds,
+            }
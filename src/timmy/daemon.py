@@ -0,0 +1,218 @@
+"""Persistent model daemon — load AirLLM once, serve every CLI invocation.
+
+Each `timmy chat` process used to build a TimmyAirLLMAgent and pay
+AutoModel.from_pretrained from scratch, which dwarfs generation time for
+short prompts.  `timmy daemon` keeps one agent loaded and listens on a
+local Unix socket; the other CLI commands detect it and become thin
+clients.  Because the agent lives in the daemon, its rolling history
+spans invocations too.
+
+Wire protocol: one JSON object per line in each direction.
+
+    → {"op": "ping"}
+    ← {"ok": true, "backend": "airllm", "model_size": "70b", "turns": 4}
+
+    → {"op": "run", "message": "...", "stream": true}
+    ← {"chunk": "Sir"} … {"chunk": ", affirmative."}
+    ← {"done": true, "content": "Sir, affirmative."}
+    ← {"error": "..."}                      (instead of done, on failure)
+
+    → {"op": "reset"}
+    ← {"ok": true}                          (conversation history cleared)
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from config import settings
+from timmy.backends import RunResult, TimmyAirLLMAgent
+
+logger = logging.getLogger(__name__)
+
+# Connect timeout for auto-detection — a missing daemon must not slow the CLI.
+_PROBE_TIMEOUT = 0.5
+
+
+def socket_path(path: Optional[str] = None) -> Path:
+    """Resolve the daemon socket path (argument → TIMMY_DAEMON_SOCKET → default)."""
+    return Path(path or settings.timmy_daemon_socket).expanduser()
+
+
+# ── Server ───────────────────────────────────────────────────────────────────
+
+class _Handler(socketserver.StreamRequestHandler):
+    """One connection: read a request line, write response lines."""
+
+    server: "_DaemonServer"
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            self._send({"error": "invalid JSON request"})
+            return
+
+        op = request.get("op")
+        if op == "ping":
+            self._send(self.server.daemon.describe())
+        elif op == "run":
+            self._run(str(request.get("message", "")), bool(request.get("stream")))
+        elif op == "reset":
+            with self.server.daemon.lock:
+                self.server.daemon.agent.reset()
+            self._send({"ok": True})
+        else:
+            self._send({"error": f"unknown op {op!r}"})
+
+    def _run(self, message: str, stream: bool) -> None:
+        daemon = self.server.daemon
+        # One model, one forward pass at a time; concurrent clients queue here
+        # (or are batched together when the agent is a BatchScheduler).
+        with daemon.lock:
+            try:
+                pieces: list[str] = []
+                for chunk in daemon.agent.run(message, stream=True):
+                    pieces.append(chunk.content)
+                    if stream:
+                        self._send({"chunk": chunk.content})
+                self._send({"done": True, "content": "".join(pieces).strip()})
+            except (BrokenPipeError, ConnectionResetError):
+                logger.info("Daemon: client went away mid-response")
+            except Exception as exc:
+                logger.error("Daemon: run failed — %s", exc)
+                self._send({"error": str(exc)})
+
+    def _send(self, payload: dict) -> None:
+        self.wfile.write((json.dumps(payload) + "\n").encode())
+        self.wfile.flush()
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, daemon: "TimmyDaemon") -> None:
+        self.daemon = daemon
+        super().__init__(path, _Handler)
+
+
+class TimmyDaemon:
+    """Owns the loaded agent and the Unix socket server."""
+
+    def __init__(self, agent: TimmyAirLLMAgent, model_size: str, path: Optional[str] = None) -> None:
+        self.agent = agent
+        self.model_size = model_size
+        shared = getattr(agent, "shared", False) is True
+        self.lock = nullcontext() if shared else threading.Lock()
+        self.path = socket_path(path)
+        self._server: Optional[_DaemonServer] = None
+
+    def describe(self) -> dict:
+        return {
+            "ok": True,
+            "backend": "airllm",
+            "model_size": self.model_size,
+            "quantization": settings.airllm_quantization,
+            "turns": getattr(self.agent, "turns", 0),
+            "pid": os.getpid(),
+        }
+
+    def serve_forever(self) -> None:
+        """Bind the socket and serve until interrupted; always removes the socket."""
+        if self.path.exists():
+            if connect_daemon(str(self.path)) is not None:
+                raise RuntimeError(f"A Timmy daemon is already listening on {self.path}")
+            self.path.unlink()  # stale socket from a crashed daemon
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._server = _DaemonServer(str(self.path), self)
+        os.chmod(self.path, 0o600)  # local user only
+        logger.info("Daemon: serving %s on %s", self.model_size, self.path)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.path.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        """Stop serve_forever() from another thread."""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+# ── Client ───────────────────────────────────────────────────────────────────
+
+class DaemonClient:
+    """Thin client with the same run / print_response interface as the agents."""
+
+    def __init__(self, path: str, info: dict) -> None:
+        self._path = path
+        self.model_size: str = info.get("model_size", "")
+        self.info = info
+
+    def _request(self, payload: dict, timeout: Optional[float] = None) -> Iterator[dict]:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(self._path)
+            sock.sendall((json.dumps(payload) + "\n").encode())
+            with sock.makefile("r", encoding="utf-8") as lines:
+                for line in lines:
+                    yield json.loads(line)
+
+    def run(self, message: str, *, stream: bool = False) -> Union[RunResult, Iterator[RunResult]]:
+        if stream:
+            return self._run_stream(message)
+        for reply in self._request({"op": "run", "message": message, "stream": False}):
+            if "error" in reply:
+                raise RuntimeError(f"Timmy daemon: {reply['error']}")
+            if reply.get("done"):
+                return RunResult(content=reply["content"])
+        raise RuntimeError("Timmy daemon closed the connection without a reply")
+
+    def _run_stream(self, message: str) -> Iterator[RunResult]:
+        for reply in self._request({"op": "run", "message": message, "stream": True}):
+            if "error" in reply:
+                raise RuntimeError(f"Timmy daemon: {reply['error']}")
+            if "chunk" in reply:
+                yield RunResult(content=reply["chunk"])
+            elif reply.get("done"):
+                return
+        raise RuntimeError("Timmy daemon closed the connection mid-stream")
+
+    def reset(self) -> None:
+        """Clear the daemon agent's conversation history."""
+        for reply in self._request({"op": "reset"}):
+            if "error" in reply:
+                raise RuntimeError(f"Timmy daemon: {reply['error']}")
+            return
+
+    def print_response(self, message: str, *, stream: bool = True) -> None:
+        """Run inference in the daemon and render the response locally."""
+        result = self.run(message, stream=False)
+        TimmyAirLLMAgent._render(result.content)
+
+
+def connect_daemon(path: Optional[str] = None) -> Optional[DaemonClient]:
+    """Return a client if a daemon answers on the socket, else None."""
+    resolved = socket_path(path)
+    if not resolved.exists():
+        return None
+    replies = DaemonClient(str(resolved), {})._request({"op": "ping"}, timeout=_PROBE_TIMEOUT)
+    try:
+        info = next(replies)
+    except (OSError, ValueError, StopIteration):
+        return None
+    finally:
+        replies.close()
+    if not info.get("ok"):
+        return None
+    return DaemonClient(str(resolved), info)
@@ -0,0 +1,193 @@
+"""Tiny stand-in for the Ollama HTTP API, for offline benchmarking and tests.
+
+Speaks just enough of the protocol for `timmy bench` and the dashboard's
+Ollama client:
+
+    GET  /               → "Ollama is running"
+    GET  /api/tags       → the one fake model
+    POST /api/generate   → empty prompt = load/keep-alive (instant);
+                           otherwise streams the canned reply
+    POST /api/chat       → streams the canned reply as NDJSON chunks
+
+Replies are streamed word by word with a configurable per-token delay and
+an optional one-off load delay on the first request, so TTFT and
+tokens/sec come out non-trivial and deterministic.
+
+Usage:
+    with FakeOllama(token_delay=0.01) as fake:
+        httpx.post(f"{fake.url}/api/chat", json={...})
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_REPLY = "Sir, affirmative. Local keys, local node, local models — no permission needed."
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_FakeServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass  # keep benchmark and test output clean
+
+    def do_GET(self) -> None:
+        if self.path == "/":
+            self._send(200, b"Ollama is running", "text/plain")
+        elif self.path == "/api/tags":
+            body = {"models": [{"name": self.server.fake.model, "model": self.server.fake.model}]}
+            self._send(200, json.dumps(body).encode(), "application/json")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send(400, b'{"error": "invalid JSON"}', "application/json")
+            return
+
+        fake = self.server.fake
+        fake.record(self.path, request)
+        if self.path == "/api/generate" and not request.get("prompt"):
+            fake.load()
+            self._send(200, json.dumps(self._final(request, 0, 0)).encode(), "application/json")
+        elif self.path in ("/api/chat", "/api/generate"):
+            self._stream(request, chat=self.path == "/api/chat")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _stream(self, request: dict, chat: bool) -> None:
+        fake = self.server.fake
+        fake.load()
+        words = fake.reply.split(" ")
+        tokens = [w if i == 0 else " " + w for i, w in enumerate(words)]
+        streaming = request.get("stream", True)
+        started = time.perf_counter()
+
+        if not streaming:
+            time.sleep(fake.token_delay * len(tokens))
+            body = self._chunk(request, fake.reply, chat)
+            body.update(self._final(request, len(tokens), time.perf_counter() - started))
+            self._send(200, json.dumps(body).encode(), "application/json")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens:
+            time.sleep(fake.token_delay)
+            self._write_chunk(self._chunk(request, token, chat))
+        final = self._chunk(request, "", chat)
+        final.update(self._final(request, len(tokens), time.perf_counter() - started))
+        self._write_chunk(final)
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _chunk(self, request: dict, text: str, chat: bool) -> dict:
+        chunk = {
+            "model": request.get("model", self.server.fake.model),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "done": False,
+        }
+        if chat:
+            chunk["message"] = {"role": "assistant", "content": text}
+        else:
+            chunk["response"] = text
+        return chunk
+
+    @staticmethod
+    def _final(request: dict, tokens: int, seconds: float) -> dict:
+        return {
+            "model": request.get("model", ""),
+            "done": True,
+            "done_reason": "stop",
+            "eval_count": tokens,
+            "eval_duration": int(seconds * 1e9),
+        }
+
+    def _write_chunk(self, payload: dict) -> None:
+        data = json.dumps(payload).encode() + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], fake: "FakeOllama") -> None:
+        self.fake = fake
+        super().__init__(address, _Handler)
+
+
+class FakeOllama:
+    """Threaded fake Ollama server on localhost; use as a context manager."""
+
+    def __init__(
+        self,
+        port: int = 0,
+        model: str = "llama3.2",
+        reply: str = DEFAULT_REPLY,
+        token_delay: float = 0.005,
+        load_delay: float = 0.0,
+    ) -> None:
+        self.model = model
+        self.reply = reply
+        self.token_delay = token_delay
+        self.load_delay = load_delay
+        self.requests: list[tuple[str, dict]] = []
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._server = _FakeServer(("127.0.0.1", port), self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, path: str, request: dict) -> None:
+        with self._lock:
+            self.requests.append((path, request))
+
+    def load(self) -> None:
+        """Simulate the one-off model load on the first request."""
+        with self._lock:
+            if self._loaded:
+                return
+            time.sleep(self.load_delay)
+            self._loaded = True
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+            name="fake-ollama", daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread = None
+
+    def __enter__(self) -> "FakeOllama":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,281 @@
+"""Bounded thread-pool executor for blocking LLM calls.
+
+agent.run() is synchronous and can take tens of seconds.  Calling it from
+an ``async def`` route freezes the whole uvicorn worker — /health, the
+swarm WebSocket feed and every other request stall behind one completion.
+Every LLM call site in the dashboard goes through this executor instead:
+
+  * ``workers`` threads run inference concurrently;
+  * up to ``queue_size`` more calls wait for a free thread;
+  * anything beyond that fails fast with InferenceQueueFull, which routes
+    turn into ``503 Service Unavailable`` + ``Retry-After``.
+
+Queue depth and wait times are tracked for the /health endpoint.
+
+Abandoned calls are cancelled rather than run to completion.  When the
+awaiting task is cancelled (the route saw the client disconnect) or a
+stream's consumer goes away, a call still waiting for a worker is dropped
+straight away, freeing its queue slot; a running one is stopped between
+chunks.  Stopping means closing the generator that produces the tokens:
+Agno's Ollama stream then drops its HTTP response, and Ollama aborts the
+generation.  TimmyAirLLMAgent ends generate() before the next token.
+
+Usage:
+    from timmy.inference import inference_executor
+
+    text = await inference_executor.run(blocking_fn, message, cancel=event)
+    async for chunk in inference_executor.stream(blocking_generator, message):
+        ...
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional, TypeVar
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+T = TypeVar("T")
+
+
+class InferenceQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Inference queue is full — try again shortly")
+        self.retry_after = retry_after
+
+
+class GenerationCancelled(Exception):
+    """The caller went away, so generation was stopped early."""
+
+
+def until_cancelled(chunks: Iterable[T], cancel: Optional[threading.Event]) -> Iterator[T]:
+    """Yield from ``chunks`` until ``cancel`` is set, then close the source.
+
+    Raises GenerationCancelled on cancellation so partial output is never
+    mistaken for a full reply.  The source generator is closed on every
+    exit, which is what actually stops the backend.
+    """
+    try:
+        for chunk in chunks:
+            if cancel is not None and cancel.is_set():
+                raise GenerationCancelled()
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+class InferenceStream:
+    """Async iterator over an InferenceExecutor.stream() call.
+
+    A plain async generator's ``finally`` only runs once iteration has
+    begun, so a consumer that goes away before the first item could not
+    stop the worker.  cancel() can: it sets the call's cancel event and
+    drops the job if it is still queued, whether or not iteration started.
+    """
+
+    def __init__(self, executor: "InferenceExecutor", items: asyncio.Queue,
+                 cancel: threading.Event, future) -> None:
+        self._executor = executor
+        self._items = items
+        self._cancel = cancel
+        self._future = future
+        self._done = False
+        self._iterator = self._drain()
+
+    def __aiter__(self) -> "InferenceStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        return await self._iterator.__anext__()
+
+    async def aclose(self) -> None:
+        self.cancel()
+        await self._iterator.aclose()
+
+    def cancel(self) -> None:
+        """Stop the generation (or drop it while queued); idempotent."""
+        if self._done:
+            return
+        self._done = True
+        self._cancel.set()
+        if self._future.cancel():
+            self._executor._abandoned()
+
+    async def _drain(self) -> AsyncIterator[Any]:
+        try:
+            while True:
+                item = await self._items.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Runs on normal exit too, when the worker is already done.
+            self.cancel()
+
+
+class InferenceExecutor:
+    """Thread pool with a bounded wait queue and fast-fail admission."""
+
+    def __init__(self, workers: int = 2, queue_size: int = 8, retry_after: int = 5) -> None:
+        self._workers = max(1, workers)
+        self._queue_size = max(0, queue_size)
+        self._retry_after = retry_after
+        self._pool = ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="inference"
+        )
+        self._lock = threading.Lock()
+        self._admitted = 0      # running + waiting
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._waits_ms: deque[float] = deque(maxlen=200)
+
+    # ── admission ────────────────────────────────────────────────────────────
+
+    def _admit(self) -> float:
+        with self._lock:
+            if self._admitted >= self._workers + self._queue_size:
+                self._rejected += 1
+                logger.warning(
+                    "Inference queue full (%d running, %d waiting) — rejecting",
+                    self._running, self._admitted - self._running,
+                )
+                raise InferenceQueueFull(self._retry_after)
+            self._admitted += 1
+        return time.monotonic()
+
+    def _started(self, enqueued_at: float) -> None:
+        with self._lock:
+            self._running += 1
+            self._waits_ms.append((time.monotonic() - enqueued_at) * 1000)
+
+    def _finished(self) -> None:
+        with self._lock:
+            self._running -= 1
+            self._admitted -= 1
+            self._completed += 1
+
+    def _abandoned(self) -> None:
+        """A waiting call was cancelled before it reached a worker."""
+        with self._lock:
+            self._admitted -= 1
+            self._cancelled += 1
+
+    # ── public API ───────────────────────────────────────────────────────────
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        cancel: Optional[threading.Event] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run a blocking callable on the pool and await its result.
+
+        Raises InferenceQueueFull immediately when the queue is full.  With
+        ``cancel``, fn is called with ``cancel=`` too, and the event is set
+        if the awaiting task is cancelled.  fn should check it between
+        tokens (see until_cancelled).  A call still waiting for a worker is
+        dropped either way.
+        """
+        enqueued_at = self._admit()
+        if cancel is not None:
+            kwargs["cancel"] = cancel
+
+        def job() -> Any:
+            if cancel is not None and cancel.is_set():
+                self._abandoned()
+                raise GenerationCancelled()
+            self._started(enqueued_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._finished()
+
+        future = self._pool.submit(job)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if cancel is not None:
+                cancel.set()
+            if future.cancel():
+                self._abandoned()
+            raise
+
+    def stream(self, fn: Callable[..., Iterable[Any]], *args: Any, **kwargs: Any) -> "InferenceStream":
+        """Iterate a blocking generator on the pool, yielding items asynchronously.
+
+        Must be called from the event loop.  Admission happens eagerly —
+        InferenceQueueFull is raised here, before the caller has started a
+        response — and the worker starts producing straight away, handing
+        items over through an asyncio queue.  If the stream is closed or
+        cancelled early, the generator is closed before its next item, or
+        never started if it was still queued.  InferenceStream.cancel()
+        does the same for a stream nobody has started iterating.
+        """
+        enqueued_at = self._admit()
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        cancel = threading.Event()
+
+        def produce() -> None:
+            if cancel.is_set():
+                self._abandoned()
+                return
+            self._started(enqueued_at)
+            try:
+                for item in until_cancelled(fn(*args, **kwargs), cancel):
+                    loop.call_soon_threadsafe(items.put_nowait, item)
+                loop.call_soon_threadsafe(items.put_nowait, _END)
+            except GenerationCancelled:
+                logger.info("Inference stream abandoned by its consumer — generation stopped")
+            except BaseException as exc:
+                loop.call_soon_threadsafe(items.put_nowait, exc)
+            finally:
+                self._finished()
+
+        future = self._pool.submit(produce)
+        return InferenceStream(self, items, cancel, future)
+
+    @property
+    def retry_after(self) -> int:
+        return self._retry_after
+
+    def stats(self) -> dict:
+        """Queue depth, concurrency and wait-time metrics."""
+        with self._lock:
+            waits = list(self._waits_ms)
+            return {
+                "workers": self._workers,
+                "queue_size": self._queue_size,
+                "running": self._running,
+                "queue_depth": self._admitted - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "cancelled": self._cancelled,
+                "wait_ms_last": round(waits[-1], 2) if waits else 0.0,
+                "wait_ms_avg": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                "wait_ms_max": round(max(waits), 2) if waits else 0.0,
+            }
+
+
+# Module-level singleton shared across the app
+inference_executor = InferenceExecutor(
+    workers=settings.inference_workers,
+    queue_size=settings.inference_queue_size,
+    retry_after=settings.inference_retry_after,
+)
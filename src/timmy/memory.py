@@ -0,0 +1,362 @@
+"""Long-term memory: past exchanges recalled by embedding similarity.
+
+The ContextWindow keeps recent turns verbatim and folds older ones into
+a lossy extractive summary, so a detail from last week is gone.  With
+MEMORY_ENABLED every answered exchange is also embedded and appended to a
+MemoryIndex, and each new prompt pulls in the ``memory_top_k`` most
+similar past exchanges (cosine similarity, one matrix-vector product over
+the whole index) — relevant turns come back however old they are, and
+irrelevant ones cost nothing.
+
+Embedders:
+  * HashingEmbedder — signed feature hashing of words and bigrams; pure
+    NumPy, no model, no network.  Matches wording, not meaning.
+  * OllamaEmbedder  — Ollama's /api/embed (e.g. nomic-embed-text) through
+    the host balancer.  Matches meaning; one extra call per turn.
+
+Storage is a float32 matrix memory-mapped from ``<path>.f32`` (rows are
+unit vectors, so similarity is a dot product) plus ``<path>.jsonl`` with
+the exchange text, appended one line per entry.  The index is a ring of
+``max_entries`` rows: once full, each new exchange overwrites the oldest.
+Entries carry a scope (the dashboard session id, "" for the CLI) and are
+only recalled within it.
+
+Requires NumPy: pip install ".[memory]"
+
+Usage:
+    from timmy.memory import shared_memory
+
+    memory = shared_memory()          # None when MEMORY_ENABLED is off
+    memory.add("What is my node alias?", "Sir, it is 'satoshi-basement'.")
+    block = memory.recall_block("node alias?", budget_tokens=256)
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Protocol
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by do for from has have how i in is it its me my no "
+    "not of on or so that the this to was we what when where which who why will "
+    "with you your".split()
+)
+_HASHING_DIM = 512
+# Rewrite the JSONL once it holds this many times more lines than live rows.
+_COMPACT_RATIO = 2
+
+
+class Embedder(Protocol):
+    name: str
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Return one L2-normalised float32 row per text."""
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class HashingEmbedder:
+    """Signed hashing of words and word bigrams into ``dim`` buckets."""
+
+    def __init__(self, dim: int = _HASHING_DIM) -> None:
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            if not features:
+                continue
+            hashes = np.frombuffer(
+                b"".join(hashlib.blake2b(f.encode(), digest_size=8).digest() for f in features),
+                dtype="<u8",
+            )
+            signs = np.where(hashes >> np.uint64(63), -1.0, 1.0).astype(np.float32)
+            np.add.at(out[row], (hashes % np.uint64(self.dim)).astype(np.intp), signs)
+        # Sublinear term frequency, so one repeated word cannot dominate.
+        out = np.sign(out) * np.log1p(np.abs(out))
+        return _normalize(out)
+
+
+class OllamaEmbedder:
+    """Embeddings from Ollama's /api/embed on the least-busy healthy host."""
+
+    def __init__(self, model: str = "nomic-embed-text", timeout: float = 30.0) -> None:
+        self.model = model
+        self.name = f"ollama-{model}"
+        self._timeout = timeout
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        import httpx
+
+        from timmy.balancer import ollama_balancer
+
+        with ollama_balancer.lease() as url:
+            response = httpx.post(
+                f"{url}/api/embed",
+                json={"model": self.model, "input": texts},
+                timeout=self._timeout,
+            )
+            response.raise_for_status()
+        return _normalize(np.asarray(response.json()["embeddings"], dtype=np.float32))
+
+
+@dataclass
+class Recall:
+    score: float
+    message: str
+    response: str
+
+
+class MemoryIndex:
+    """Ring buffer of embedded exchanges with vectorised top-k retrieval."""
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        path: Optional[str] = None,
+        max_entries: int = 10_000,
+    ) -> None:
+        self._embedder = embedder or HashingEmbedder()
+        self._path = Path(path) if path else None
+        self._capacity = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None   # (capacity, dim), rows unit length
+        self._entries: list[Optional[dict]] = [None] * self._capacity
+        self._scopes = np.full(self._capacity, -1, dtype=np.int32)
+        self._scope_ids: dict[str, int] = {}
+        self._seq = 0          # entries ever added; the next goes to seq % capacity
+        self._log_lines = 0
+        self.searches = 0
+        if self._path is not None:
+            self._load()
+
+    # ── public API ───────────────────────────────────────────────────────────
+
+    def add(self, message: str, response: str, scope: str = "") -> None:
+        """Embed an exchange and append it, overwriting the oldest when full."""
+        vector = self._embedder.embed([f"{message}\n{response}"])[0]
+        with self._lock:
+            self._ensure_matrix(len(vector))
+            slot = self._seq % self._capacity
+            entry = {"seq": self._seq, "scope": scope, "message": message,
+                     "response": response, "time": time.time()}
+            self._matrix[slot] = vector
+            self._entries[slot] = entry
+            self._scopes[slot] = self._scope_id(scope)
+            self._seq += 1
+            self._persist(slot, entry)
+
+    def search(
+        self, query: str, k: int = 3, scope: str = "", min_score: float = 0.0
+    ) -> list[Recall]:
+        """The ``k`` most similar exchanges in ``scope``, best first."""
+        with self._lock:
+            if self._matrix is None or self._seq == 0 or scope not in self._scope_ids:
+                return []
+        vector = self._embedder.embed([query])[0]
+        with self._lock:
+            self.searches += 1
+            live = min(self._seq, self._capacity)
+            scores = self._matrix[:live] @ vector
+            scores[self._scopes[:live] != self._scope_ids[scope]] = -np.inf
+            k = min(k, live)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                Recall(float(scores[i]), self._entries[i]["message"], self._entries[i]["response"])
+                for i in top
+                if scores[i] >= min_score
+            ]
+
+    def recall_block(
+        self,
+        query: str,
+        scope: str = "",
+        budget_tokens: int = 256,
+        k: int = 3,
+        min_score: float = 0.0,
+        exclude: str = "",
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> str:
+        """Prompt block of recalled exchanges within ``budget_tokens``.
+
+        Exchanges already present in ``exclude`` (the verbatim history about
+        to be sent) are skipped.  Returns "" or a block ending in a blank line.
+        """
+        from timmy.context import approx_tokens
+
+        count = count_tokens or approx_tokens
+        lines: list[str] = []
+        used = 0
+        for hit in self.search(query, k, scope, min_score):
+            user = f"User: {hit.message}"
+            if user in exclude:
+                continue
+            text = f"{user}\nTimmy: {hit.response}"
+            cost = count(text)
+            if used + cost > budget_tokens:
+                continue
+            lines.append(text)
+            used += cost
+        if not lines:
+            return ""
+        return "Relevant earlier exchanges:\n" + "\n".join(lines) + "\n\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = [None] * self._capacity
+            self._scopes[:] = -1
+            self._scope_ids.clear()
+            self._seq = 0
+            self._log_lines = 0
+            if self._path is not None:
+                self._log_path.write_text("")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "embedder": self._embedder.name,
+                "entries": min(self._seq, self._capacity),
+                "max_entries": self._capacity,
+                "dim": None if self._matrix is None else self._matrix.shape[1],
+                "searches": self.searches,
+                "persistent": self._path is not None,
+            }
+
+    def __len__(self) -> int:
+        return min(self._seq, self._capacity)
+
+    # ── storage (caller holds the lock) ─────────────────────────────────────
+
+    @property
+    def _matrix_path(self) -> Path:
+        return self._path.with_suffix(".f32")
+
+    @property
+    def _log_path(self) -> Path:
+        return self._path.with_suffix(".jsonl")
+
+    @property
+    def _header_path(self) -> Path:
+        return self._path.with_suffix(".json")
+
+    def _scope_id(self, scope: str) -> int:
+        return self._scope_ids.setdefault(scope, len(self._scope_ids))
+
+    def _ensure_matrix(self, dim: int) -> None:
+        if self._matrix is not None:
+            if self._matrix.shape[1] != dim:
+                raise ValueError(f"Embedding dim changed ({self._matrix.shape[1]} → {dim})")
+            return
+        shape = (self._capacity, dim)
+        if self._path is None:
+            self._matrix = np.zeros(shape, dtype=np.float32)
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # A sparse file: untouched rows take no disk until written.
+        self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="w+", shape=shape)
+        self._header_path.write_text(json.dumps(
+            {"embedder": self._embedder.name, "dim": dim, "max_entries": self._capacity}
+        ))
+
+    def _persist(self, slot: int, entry: dict) -> None:
+        if self._path is None:
+            return
+        self._matrix.flush()
+        with self._log_path.open("a", encoding="utf-8") as log:
+            log.write(json.dumps(entry) + "\n")
+        self._log_lines += 1
+        if self._log_lines > _COMPACT_RATIO * self._capacity:
+            self._compact()
+
+    def _compact(self) -> None:
+        live = sorted((e for e in self._entries if e is not None), key=lambda e: e["seq"])
+        tmp = self._log_path.with_suffix(".jsonl.tmp")
+        tmp.write_text("".join(json.dumps(e) + "\n" for e in live), encoding="utf-8")
+        tmp.replace(self._log_path)
+        self._log_lines = len(live)
+
+    def _load(self) -> None:
+        try:
+            header = json.loads(self._header_path.read_text())
+        except (OSError, ValueError):
+            return
+        if header.get("embedder") != self._embedder.name or \
+                header.get("max_entries") != self._capacity:
+            logger.warning(
+                "Memory: %s was built with %s / %s entries — starting a fresh index",
+                self._path, header.get("embedder"), header.get("max_entries"),
+            )
+            return
+        shape = (self._capacity, header["dim"])
+        try:
+            # r+ would silently zero-extend a truncated file.
+            if self._matrix_path.stat().st_size < 4 * shape[0] * shape[1]:
+                raise ValueError("file is truncated")
+            self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=shape)
+        except (OSError, ValueError) as exc:
+            # The log's rows would point at missing vectors, so it goes too.
+            logger.warning("Memory: cannot open %s (%s) — starting a fresh index",
+                           self._matrix_path, exc)
+            self._log_path.unlink(missing_ok=True)
+            return
+        try:
+            lines = self._log_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            lines = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+            slot = entry["seq"] % self._capacity
+            self._entries[slot] = entry
+            self._scopes[slot] = self._scope_id(entry["scope"])
+            self._seq = max(self._seq, entry["seq"] + 1)
+        self._log_lines = len(lines)
+        logger.info("Memory: loaded %d exchanges from %s", len(self), self._path)
+
+
+# ── process-wide index ───────────────────────────────────────────────────────
+
+_shared: Optional[MemoryIndex] = None
+_shared_lock = threading.Lock()
+
+
+def shared_memory() -> Optional[MemoryIndex]:
+    """The index configured by MEMORY_* settings, or None when disabled."""
+    global _shared
+    if not settings.memory_enabled:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            embedder: Embedder = (
+                OllamaEmbedder(settings.memory_embed_model)
+                if settings.memory_embedder == "ollama" else HashingEmbedder()
+            )
+            _shared = MemoryIndex(
+                embedder,
+                path=settings.memory_path or None,
+                max_entries=settings.memory_max_entries,
+            )
+        return _shared
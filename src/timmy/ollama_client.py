@@ -0,0 +1,190 @@
+"""App-lifetime Ollama HTTP client with model warm-up and keep-alive.
+
+health.check_ollama used to open a fresh httpx.AsyncClient (new TCP
+connection) on every poll, and nothing ever asked Ollama to load
+``settings.ollama_model`` — so the first chat after startup or idle paid
+the model load, often seconds to tens of seconds.
+
+OllamaClient owns one pooled AsyncClient for the dashboard's lifespan:
+
+  * ``warm()`` sends an empty /api/generate request to every host, which
+    makes Ollama load the model and hold it for ``keep_alive``.  The first warm-up is
+    recorded as the cold latency, later ones as the warm latency.
+  * ``keep_alive_loop()`` repeats the warm-up every ``interval`` seconds,
+    but only while the dashboard has seen a request (``touch()``) within
+    ``active_window`` — an unattended dashboard lets Ollama unload.
+
+Usage (see dashboard.app lifespan):
+    await ollama_client.start()
+    ...
+    await ollama_client.close()
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional, Union
+
+import httpx
+
+from config import settings
+from timmy.balancer import OllamaBalancer, ollama_balancer
+
+logger = logging.getLogger(__name__)
+
+# Warm-up waits for the model load; health pings must answer fast.
+_WARMUP_TIMEOUT = 120.0
+_PING_TIMEOUT = 2.0
+
+
+class OllamaClient:
+    """Pooled keep-alive client for the configured Ollama host(s) and model.
+
+    With several hosts, warm-up loads the model on every host and health
+    probes report each host to the balancer, so an ejected host rejoins
+    as soon as it answers again.
+    """
+
+    def __init__(
+        self,
+        hosts: Union[str, list[str]],
+        model: str,
+        keep_alive: str = "10m",
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        balancer: Optional[OllamaBalancer] = None,
+    ) -> None:
+        if isinstance(hosts, str):
+            hosts = [h.strip().rstrip("/") for h in hosts.split(",") if h.strip()]
+        self.hosts = hosts
+        self.model = model
+        self.keep_alive = keep_alive
+        self._transport = transport
+        self._balancer = balancer
+        self._client: Optional[httpx.AsyncClient] = None
+        self._last_active = 0.0
+        self.cold_ms: Optional[float] = None
+        self.warm_ms: Optional[float] = None
+        self.warmups = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    # ── lifecycle ───────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=_PING_TIMEOUT,
+                limits=httpx.Limits(max_keepalive_connections=4 * len(self.hosts),
+                                    keepalive_expiry=60.0),
+                transport=self._transport,
+            )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if self._client is not None:
+            return await self._client.request(method, url, **kwargs)
+        # Outside the app lifespan (scripts, bare tests) fall back to a
+        # one-shot client rather than one bound to a dead event loop.
+        async with httpx.AsyncClient(transport=self._transport) as client:
+            return await client.request(method, url, **kwargs)
+
+    # ── calls ───────────────────────────────────────────────────────────────
+
+    async def ping_hosts(self) -> dict[str, bool]:
+        """Probe every host's root endpoint; feeds results to the balancer."""
+        results = await asyncio.gather(*(self._ping_host(url) for url in self.hosts))
+        return dict(zip(self.hosts, results))
+
+    async def _ping_host(self, url: str) -> bool:
+        try:
+            r = await self._request("GET", url + "/", timeout=_PING_TIMEOUT)
+            ok = r.status_code == 200
+            error = None if ok else f"HTTP {r.status_code}"
+        except Exception as exc:
+            ok, error = False, str(exc) or type(exc).__name__
+        if self._balancer is not None:
+            if ok:
+                self._balancer.mark_up(url)
+            else:
+                self._balancer.mark_down(url, error)
+        return ok
+
+    async def ping(self) -> bool:
+        """True when at least one Ollama host answers."""
+        return any((await self.ping_hosts()).values())
+
+    async def warm(self) -> Optional[float]:
+        """Load the model (or refresh its keep-alive) on every host.
+
+        Returns the slowest successful host's latency in ms — the time
+        until the whole fleet is warm — or None if no host answered.
+        """
+        results = await asyncio.gather(*(self._warm_host(url) for url in self.hosts))
+        latencies = [ms for ms in results if ms is not None]
+        if not latencies:
+            return None
+        elapsed_ms = max(latencies)
+        if self.cold_ms is None:
+            self.cold_ms = elapsed_ms
+            logger.info("Ollama: %s loaded in %.0f ms", self.model, elapsed_ms)
+        else:
+            self.warm_ms = elapsed_ms
+        self.warmups += 1
+        return elapsed_ms
+
+    async def _warm_host(self, url: str) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            r = await self._request(
+                "POST",
+                url + "/api/generate",
+                json={"model": self.model, "keep_alive": self.keep_alive},
+                timeout=_WARMUP_TIMEOUT,
+            )
+            r.raise_for_status()
+        except Exception as exc:
+            self.failures += 1
+            self.last_error = str(exc) or type(exc).__name__
+            logger.warning("Ollama warm-up of %s on %s failed — %s", self.model, url, self.last_error)
+            return None
+        self.last_error = None
+        return (time.perf_counter() - start) * 1000
+
+    # ── keep-alive ──────────────────────────────────────────────────────────
+
+    def touch(self) -> None:
+        """Record dashboard activity; keeps the keep-alive loop pinging."""
+        self._last_active = time.monotonic()
+
+    def is_active(self, window: float) -> bool:
+        return self._last_active > 0 and time.monotonic() - self._last_active <= window
+
+    async def keep_alive_loop(self, interval: float, active_window: float) -> None:
+        """Re-warm every ``interval`` seconds while users are active.  Runs until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            if self.is_active(active_window):
+                await self.warm()
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "cold_ms": None if self.cold_ms is None else round(self.cold_ms, 1),
+            "warm_ms": None if self.warm_ms is None else round(self.warm_ms, 1),
+            "warmups": self.warmups,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+# Module-level singleton shared across the app
+ollama_client = OllamaClient(
+    hosts=settings.ollama_hosts,
+    model=settings.ollama_model,
+    keep_alive=settings.ollama_keep_alive,
+    balancer=ollama_balancer,
+)
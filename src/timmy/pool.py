@@ -0,0 +1,236 @@
+"""Process-wide pool of warm Timmy agents.
+
+create_timmy() builds a fresh Agno Agent (new Ollama model object, new
+SqliteDb handle) or — worse — reloads an AirLLM model from disk on every
+call.  The pool keeps built agents warm and hands them out with
+checkout / release semantics so request handlers pay that cost once.
+
+Agents are keyed by (backend, model, model_size, db_file).  Each key holds
+at most ``max_size`` live agents (idle + checked out); AirLLM keys are
+capped at one because a second copy of a 70B model would double RAM.
+Idle agents older than ``idle_timeout`` seconds are dropped lazily on the
+next checkout or release — no background thread.
+
+Usage:
+    from timmy.pool import agent_pool
+
+    with agent_pool.lease() as agent:
+        run = agent.run("hello", stream=False)
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from config import settings
+from timmy.inference import GenerationCancelled
+
+logger = logging.getLogger(__name__)
+
+# (backend, model, model_size, db_file)
+PoolKey = tuple[str, str, str, str]
+
+# AirLLM holds the whole model in one process — never build a second copy.
+_AIRLLM_MAX_SIZE = 1
+
+
+@dataclass
+class _Slot:
+    """Per-key bookkeeping: idle agents (LIFO) and the live instance count.
+
+    Agents marked ``shared = True`` (e.g. BatchScheduler) are thread-safe;
+    the one instance is handed to every caller and never leased.
+    """
+    idle: list[tuple[Any, float]] = field(default_factory=list)
+    live: int = 0
+    shared: Any = None
+
+
+class AgentPool:
+    """Bounded, keyed pool of reusable agents with idle eviction."""
+
+    def __init__(
+        self,
+        max_size: int = 4,
+        idle_timeout: float = 600.0,
+        checkout_timeout: float = 30.0,
+    ) -> None:
+        self._max_size = max(1, max_size)
+        self._idle_timeout = idle_timeout
+        self._checkout_timeout = checkout_timeout
+        self._slots: dict[PoolKey, _Slot] = {}
+        self._leased: dict[int, PoolKey] = {}
+        self._cond = threading.Condition()
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+
+    # ── keys ────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def key_for(
+        db_file: str = "timmy.db",
+        backend: Optional[str] = None,
+        model_size: Optional[str] = None,
+    ) -> PoolKey:
+        """Resolve config defaults so equivalent requests share one key."""
+        from timmy.agent import _resolve_backend
+        resolved = _resolve_backend(backend)
+        size = model_size or settings.airllm_model_size
+        model = settings.ollama_model if resolved == "ollama" else ""
+        return (resolved, model, size, db_file)
+
+    def _limit(self, key: PoolKey) -> int:
+        return _AIRLLM_MAX_SIZE if key[0] == "airllm" else self._max_size
+
+    # ── checkout / release ──────────────────────────────────────────────────
+
+    def checkout(
+        self,
+        db_file: str = "timmy.db",
+        backend: Optional[str] = None,
+        model_size: Optional[str] = None,
+        factory: Optional[Callable[..., Any]] = None,
+    ) -> Any:
+        """Return a warm agent for the key, building one if none is idle.
+
+        Blocks up to ``checkout_timeout`` seconds when the key is at its
+        live limit; raises TimeoutError if no agent is returned in time.
+        ``factory`` defaults to timmy.agent.create_timmy.
+        """
+        key = self.key_for(db_file, backend, model_size)
+        deadline = time.monotonic() + self._checkout_timeout
+
+        with self._cond:
+            self._evict_idle()
+            slot = self._slots.setdefault(key, _Slot())
+            while slot.shared is None and not slot.idle and slot.live >= self._limit(key):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No agent available for {key} (pool exhausted)")
+                self._cond.wait(remaining)
+                self._evict_idle()
+
+            if slot.shared is not None:
+                self._hits += 1
+                return slot.shared
+
+            if slot.idle:
+                agent, _ = slot.idle.pop()
+                self._hits += 1
+                self._leased[id(agent)] = key
+                return agent
+
+            # Reserve the slot before building so concurrent callers respect
+            # the limit while the (possibly slow) factory runs unlocked.
+            slot.live += 1
+            self._misses += 1
+
+        if factory is None:
+            from timmy.agent import create_timmy
+            factory = create_timmy
+        try:
+            agent = factory(db_file=db_file, backend=key[0], model_size=model_size)
+        except Exception:
+            with self._cond:
+                slot.live -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            if getattr(agent, "shared", False) is True:
+                slot.shared = agent
+                self._cond.notify_all()
+            else:
+                self._leased[id(agent)] = key
+        logger.info("AgentPool: built agent for %s (%d live)", key, slot.live)
+        return agent
+
+    def release(self, agent: Any) -> None:
+        """Return a checked-out agent to the idle set for reuse."""
+        with self._cond:
+            key = self._leased.pop(id(agent), None)
+            if key is None:
+                return
+            self._slots[key].idle.append((agent, time.monotonic()))
+            self._evict_idle()
+            self._cond.notify()
+
+    def discard(self, agent: Any) -> None:
+        """Drop a checked-out agent instead of returning it (e.g. after an error)."""
+        with self._cond:
+            key = self._leased.pop(id(agent), None)
+            if key is None:
+                return
+            self._slots[key].live -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(
+        self,
+        db_file: str = "timmy.db",
+        backend: Optional[str] = None,
+        model_size: Optional[str] = None,
+        factory: Optional[Callable[..., Any]] = None,
+    ) -> Iterator[Any]:
+        """Check out an agent for the duration of a with-block.
+
+        The agent is released on normal exit and discarded if the block
+        raises, so a wedged agent is never handed to the next caller.  A
+        generation cancelled by its caller (or a stream closed early) is
+        not the agent's fault, so the agent goes back to the pool.
+        """
+        agent = self.checkout(db_file, backend, model_size, factory)
+        try:
+            yield agent
+        except (GeneratorExit, GenerationCancelled):
+            self.release(agent)
+            raise
+        except BaseException:
+            self.discard(agent)
+            raise
+        else:
+            self.release(agent)
+
+    # ── maintenance ─────────────────────────────────────────────────────────
+
+    def _evict_idle(self) -> None:
+        """Drop idle agents older than idle_timeout.  Caller holds the lock."""
+        cutoff = time.monotonic() - self._idle_timeout
+        for key, slot in self._slots.items():
+            fresh = [(a, t) for a, t in slot.idle if t >= cutoff]
+            dropped = len(slot.idle) - len(fresh)
+            if dropped:
+                slot.idle = fresh
+                slot.live -= dropped
+                self._evicted += dropped
+                logger.info("AgentPool: evicted %d idle agent(s) for %s", dropped, key)
+
+    def clear(self) -> None:
+        """Drop every idle agent and forget outstanding leases."""
+        with self._cond:
+            self._slots.clear()
+            self._leased.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Return pool counters for health / debugging endpoints."""
+        with self._cond:
+            return {
+                "keys": len(self._slots),
+                "idle": sum(len(s.idle) for s in self._slots.values()),
+                "leased": len(self._leased),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evicted": self._evicted,
+            }
+
+
+# Module-level singleton shared across the app
+agent_pool = AgentPool(
+    max_size=settings.agent_pool_max_size,
+    idle_timeout=settings.agent_pool_idle_seconds,
+)
@@ -0,0 +1,119 @@
+"""Prefix KV-cache reuse for TimmyAirLLMAgent.
+
+Every AirLLM turn re-sends TIMMY_SYSTEM_PROMPT plus the rolling history,
+and with layer-by-layer loading each prefix token costs a full pass over
+the weights on disk.  Consecutive prompts share almost all of that
+prefix, so this cache keeps the ``past_key_values`` produced by the last
+few generate() calls, keyed by the token IDs they cover.  A new prompt
+reuses the entry with the longest common token prefix, cropped to that
+length, and generate() only computes attention for the new tokens.
+
+Matching by longest common prefix (rather than exact key prefix) matters
+because re-tokenizing "Timmy: <reply>" from history rarely reproduces the
+exact IDs the model generated; the shared system prompt and older turns
+still line up.
+
+Works with both HuggingFace cache objects (``crop`` / ``get_seq_length``)
+and the legacy tuple-of-(key, value) tensors.
+"""
+
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _common_prefix_len(a: tuple[int, ...], b: tuple[int, ...]) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def crop_past_key_values(past_key_values: Any, length: int) -> Any:
+    """Return a copy of past_key_values truncated to the first `length` positions."""
+    if hasattr(past_key_values, "crop"):
+        cropped = copy.deepcopy(past_key_values)
+        cropped.crop(length)
+        return cropped
+    return tuple(
+        tuple(t[..., :length, :] for t in layer) for layer in past_key_values
+    )
+
+
+def past_key_values_length(past_key_values: Any) -> int:
+    """Number of positions covered by a cache object or legacy tuple."""
+    if hasattr(past_key_values, "get_seq_length"):
+        return int(past_key_values.get_seq_length())
+    return int(past_key_values[0][0].shape[-2])
+
+
+class PrefixCache:
+    """Small LRU of past_key_values keyed by the token IDs they cover."""
+
+    def __init__(self, max_entries: int = 2, min_reuse_tokens: int = 16) -> None:
+        self._entries: OrderedDict[tuple[int, ...], Any] = OrderedDict()
+        self._max_entries = max(1, max_entries)
+        self._min_reuse = min_reuse_tokens
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reused_tokens = 0
+
+    def lookup(self, token_ids: tuple[int, ...]) -> tuple[int, Optional[Any]]:
+        """Return (reused_length, cropped past_key_values) for a new prompt.
+
+        At least the final prompt token is always left uncached so the
+        model has something to compute logits from.  Returns (0, None)
+        when no entry shares at least ``min_reuse_tokens`` tokens.
+        """
+        limit = len(token_ids) - 1
+        best_key, best_len = None, 0
+        with self._lock:
+            for key in self._entries:
+                n = min(_common_prefix_len(key, token_ids), limit)
+                if n > best_len:
+                    best_key, best_len = key, n
+            if best_key is None or best_len < self._min_reuse:
+                self.misses += 1
+                return 0, None
+            self._entries.move_to_end(best_key)
+            source = self._entries[best_key]
+            self.hits += 1
+            self.reused_tokens += best_len
+        return best_len, crop_past_key_values(source, best_len)
+
+    def store(self, token_ids: tuple[int, ...], past_key_values: Any) -> None:
+        """Remember the cache for a full sequence (prompt + generated tokens)."""
+        if past_key_values is None or not token_ids:
+            return
+        try:
+            covered = past_key_values_length(past_key_values)
+        except Exception as exc:
+            logger.debug("PrefixCache: unrecognised cache object — %s", exc)
+            return
+        key = tuple(token_ids[:covered])
+        with self._lock:
+            self._entries[key] = past_key_values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reused_tokens": self.reused_tokens,
+        }
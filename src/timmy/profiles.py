@@ -0,0 +1,215 @@
+"""AirLLM size / compression profiles and their expected per-token cost.
+
+AirLLM streams every layer from disk once per generated token unless the
+whole model fits in the page cache.  Its block-wise compression
+(``compression="8bit"`` / ``"4bit"``) stores weights in one byte or half
+a byte per parameter instead of two, so each token reads 2× or 4× fewer
+bytes — at some cost in answer quality.
+
+A profile is a (model size, compression) pair.  Either half can be set to
+"auto" (AIRLLM_MODEL_SIZE / AIRLLM_QUANTIZATION or the CLI), and the
+largest, least compressed profile whose estimated cost fits
+AIRLLM_AUTO_TOKEN_SECONDS on this machine is chosen.  The estimate is:
+
+    weights / memory bandwidth          (compute over every layer)
+  + weights / disk throughput           (only if weights > half of RAM)
+
+RAM comes from the OS.  Disk throughput is AIRLLM_DISK_MBPS, or a
+one-off sequential read of a scratch file next to the HuggingFace cache,
+remembered in ~/.timmy/hardware.json.  Writing that file costs a few
+hundred MB of I/O, so it only happens when an "auto" profile is being
+picked or on `timmy status --measure`, and never on a nearly full disk.
+Rough numbers — good enough to tell "fits in RAM" from "a minute per
+token".
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+from timmy.shards import physical_memory
+
+logger = logging.getLogger(__name__)
+
+SIZES = ("8b", "70b", "405b")
+COMPRESSIONS = ("none", "8bit", "4bit")
+
+_PARAMS = {"8b": 8.0e9, "70b": 70.6e9, "405b": 405.9e9}
+_BYTES_PER_PARAM = {"none": 2.0, "8bit": 1.0, "4bit": 0.5}
+# Rough rate at which cached layers stream through compute (CPU / unified memory).
+_MEMORY_BPS = 20e9
+_SAMPLE_BYTES = 256 * 1024 * 1024
+# Free space the volume must have before the sample is written.
+_MIN_FREE_BYTES = 4 * _SAMPLE_BYTES
+_HARDWARE_FILE = Path("~/.timmy/hardware.json")
+
+
+@dataclass
+class Hardware:
+    ram_bytes: Optional[int]
+    disk_bps: Optional[float]
+    disk_note: str = ""   # why disk_bps is unknown, for `timmy status`
+
+
+@dataclass
+class Cost:
+    weights_bytes: float
+    disk_bytes_per_token: float
+    seconds_per_token: Optional[float]   # None when disk speed is unknown
+
+    @property
+    def cached(self) -> bool:
+        return self.disk_bytes_per_token == 0
+
+
+@dataclass
+class Profile:
+    model_size: str
+    compression: str
+    reason: str = "configured"
+
+    @property
+    def label(self) -> str:
+        return self.model_size if self.compression == "none" else f"{self.model_size}-{self.compression}"
+
+    def cost(self, hardware: Hardware) -> Cost:
+        return estimate(self.model_size, self.compression, hardware)
+
+
+def estimate(model_size: str, compression: str, hardware: Hardware) -> Cost:
+    """Expected bytes read and seconds per generated token."""
+    weights = _PARAMS[model_size] * _BYTES_PER_PARAM[compression]
+    fits = hardware.ram_bytes is not None and weights <= hardware.ram_bytes / 2
+    disk = 0.0 if fits else weights
+    seconds: Optional[float] = weights / _MEMORY_BPS
+    if disk:
+        seconds = seconds + disk / hardware.disk_bps if hardware.disk_bps else None
+    return Cost(weights, disk, seconds)
+
+
+# ── hardware detection ───────────────────────────────────────────────────────
+
+def _hf_cache_dir() -> Path:
+    return Path(os.environ.get("HF_HOME", "~/.cache/huggingface")).expanduser()
+
+
+def measure_disk_throughput(directory: Path, sample_bytes: int = _SAMPLE_BYTES) -> Optional[float]:
+    """Sequential read speed (bytes/s) of a scratch file dropped from the page cache.
+
+    Returns None where the cache cannot be dropped (no posix_fadvise) —
+    a cached read would measure RAM, not the disk.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return None
+    directory.mkdir(parents=True, exist_ok=True)
+    chunk = b"\xa5" * (1 << 20)
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=".timmy-disk-") as f:
+        for _ in range(sample_bytes // len(chunk)):
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        f.seek(0)
+        start = time.perf_counter()
+        read = 0
+        while block := f.read(len(chunk)):
+            read += len(block)
+        elapsed = time.perf_counter() - start
+    return read / elapsed if elapsed > 0 else None
+
+
+def _disk_bps(measure: bool = True) -> tuple[Optional[float], str]:
+    """Disk throughput in bytes/s (configured, remembered or measured), and why not."""
+    if settings.airllm_disk_mbps > 0:
+        return settings.airllm_disk_mbps * 1e6, ""
+    directory = _hf_cache_dir()
+    record = _HARDWARE_FILE.expanduser()
+    try:
+        cached = json.loads(record.read_text())
+        if cached.get("directory") == str(directory):
+            return cached.get("disk_bps"), ""
+    except (OSError, ValueError):
+        pass
+    if not measure:
+        return None, "not measured — run `timmy status --measure` or set AIRLLM_DISK_MBPS"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        free = shutil.disk_usage(directory).free
+        if free < _MIN_FREE_BYTES:
+            logger.warning("Skipping the disk throughput test: only %d MiB free in %s",
+                           free >> 20, directory)
+            return None, f"not measured — only {free >> 20} MiB free in {directory}"
+        measured = measure_disk_throughput(directory)
+    except OSError as exc:
+        logger.warning("Could not measure disk throughput in %s: %s", directory, exc)
+        return None, f"not measured — {exc}"
+    try:
+        record.parent.mkdir(parents=True, exist_ok=True)
+        record.write_text(json.dumps({"directory": str(directory), "disk_bps": measured}))
+    except OSError:
+        pass
+    return measured, ""
+
+
+def detect_hardware(measure: bool = True) -> Hardware:
+    """RAM and disk speed; ``measure=False`` never runs the disk test."""
+    disk_bps, note = _disk_bps(measure)
+    return Hardware(ram_bytes=physical_memory(), disk_bps=disk_bps, disk_note=note)
+
+
+# ── selection ────────────────────────────────────────────────────────────────
+
+def resolve_profile(
+    model_size: Optional[str] = None,
+    compression: Optional[str] = None,
+    hardware: Optional[Hardware] = None,
+) -> Profile:
+    """Turn configured / requested size and compression into a concrete profile."""
+    size = model_size or settings.airllm_model_size
+    comp = compression or settings.airllm_quantization
+    if size != "auto" and comp != "auto":
+        return Profile(size, comp)
+
+    hardware = hardware or detect_hardware()
+    budget = settings.airllm_auto_token_seconds
+    # Best quality first: bigger model, then less compression.
+    candidates = [
+        (s, c)
+        for s in reversed(SIZES) if size in ("auto", s)
+        for c in COMPRESSIONS if comp in ("auto", c)
+    ]
+    for s, c in candidates:
+        seconds = estimate(s, c, hardware).seconds_per_token
+        if seconds is not None and seconds <= budget:
+            profile = Profile(s, c, f"auto: ≈{seconds:.1f}s/token within {budget:g}s")
+            break
+    else:
+        s, c = candidates[-1]
+        profile = Profile(s, c, f"auto: nothing fits {budget:g}s/token — cheapest profile")
+    logger.info("AirLLM profile %s (%s)", profile.label, profile.reason)
+    return profile
+
+
+def describe(profile: Profile, hardware: Hardware) -> str:
+    """One-paragraph cost summary for `timmy status`."""
+    cost = profile.cost(hardware)
+    gib = 2**30
+    ram = "unknown RAM" if hardware.ram_bytes is None else f"{hardware.ram_bytes / gib:.0f} GiB RAM"
+    if hardware.disk_bps:
+        disk = f"{hardware.disk_bps / 1e6:.0f} MB/s disk"
+    else:
+        disk = f"unknown disk ({hardware.disk_note})" if hardware.disk_note else "unknown disk"
+    where = "fits in the page cache" if cost.cached else f"reads {cost.disk_bytes_per_token / gib:.1f} GiB from disk"
+    per_token = "unknown" if cost.seconds_per_token is None else f"≈{cost.seconds_per_token:.1f} s"
+    return (
+        f"AirLLM profile {profile.label} ({profile.reason})\n"
+        f"  weights {cost.weights_bytes / gib:.1f} GiB — {where} per token\n"
+        f"  expected per-token cost: {per_token}  [{ram}, {disk}]"
+    )
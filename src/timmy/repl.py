@@ -0,0 +1,168 @@
+"""Interactive `timmy repl` — one loaded agent, many turns.
+
+Every `timmy chat "..."` is a fresh process that rebuilds the agent and
+reopens timmy.db (or reloads AirLLM), so a back-and-forth conversation
+paid full startup per message.  The REPL builds the agent once, streams
+each reply token by token into a live-updating rich Markdown view, and
+records per-turn timing.
+
+Meta-commands:
+    /reset            forget the conversation (the model stays loaded)
+    /backend [name]   show the backend, or switch to ollama | airllm | auto | cascade
+    /stats            per-turn latency, TTFT and token counts
+    /help             list commands
+    /exit             leave (Ctrl-D works too)
+"""
+
+import time
+from typing import Callable, Optional
+
+from rich.console import Console
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.table import Table
+
+from timmy.bench import Sample
+
+_HELP = """\
+/reset            forget the conversation (the model stays loaded)
+/backend [name]   show the backend, or switch to ollama | airllm | auto | cascade
+/stats            per-turn latency, TTFT and token counts
+/help             this list
+/exit             leave (Ctrl-D works too)"""
+
+_BACKENDS = ("ollama", "airllm", "auto", "cascade")
+
+# Re-rendering Markdown on every token is wasteful on long replies; rich
+# coalesces updates to this rate.
+_REFRESH_PER_SECOND = 12
+
+
+class Repl:
+    """Read-eval-print loop around a single long-lived agent."""
+
+    def __init__(
+        self,
+        backend: Optional[str],
+        model_size: Optional[str],
+        loader: Callable[[Optional[str], Optional[str]], object],
+        console: Optional[Console] = None,
+    ) -> None:
+        self.backend = backend
+        self.model_size = model_size
+        self._loader = loader
+        self.console = console or Console()
+        self.turns: list[Sample] = []
+        self.agent = loader(backend, model_size)
+
+    # ── loop ────────────────────────────────────────────────────────────────
+
+    def run(self) -> None:
+        self.console.print("[bold]Timmy REPL[/bold] — /help for commands, /exit to leave.")
+        while True:
+            try:
+                line = self.console.input("[bold cyan]you ›[/bold cyan] ").strip()
+            except (EOFError, KeyboardInterrupt):
+                self.console.print()
+                return
+            if not line:
+                continue
+            if line.startswith("/"):
+                if not self.command(line):
+                    return
+            else:
+                self.ask(line)
+
+    def command(self, line: str) -> bool:
+        """Handle a meta-command; return False to leave the REPL."""
+        name, _, arg = line.partition(" ")
+        arg = arg.strip()
+        if name in ("/exit", "/quit"):
+            return False
+        if name == "/reset":
+            self.reset()
+        elif name == "/backend":
+            self.switch_backend(arg or None)
+        elif name == "/stats":
+            self.console.print(self.stats_table())
+        elif name == "/help":
+            self.console.print(_HELP, markup=False)
+        else:
+            self.console.print(f"Unknown command {name} — /help lists them.", markup=False)
+        return True
+
+    # ── turns ───────────────────────────────────────────────────────────────
+
+    def ask(self, message: str) -> Sample:
+        """Stream one reply into a live Markdown view and record its timing."""
+        text = ""
+        start = time.perf_counter()
+        ttft_ms = None
+        tokens = 0
+        error = None
+        with Live(Markdown(""), console=self.console, refresh_per_second=_REFRESH_PER_SECOND,
+                  vertical_overflow="visible") as live:
+            try:
+                for chunk in self.agent.run(message, stream=True):
+                    piece = getattr(chunk, "content", None)
+                    if not isinstance(piece, str) or not piece:
+                        continue
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - start) * 1000
+                    tokens += 1
+                    text += piece
+                    live.update(Markdown(text))
+            except Exception as exc:
+                error = str(exc) or type(exc).__name__
+        if error is not None:
+            self.console.print(f"[red]Timmy is offline:[/red] {error}")
+        sample = Sample(message, (time.perf_counter() - start) * 1000, ttft_ms, tokens, error)
+        self.turns.append(sample)
+        return sample
+
+    # ── meta-commands ───────────────────────────────────────────────────────
+
+    def reset(self) -> None:
+        """Forget the conversation without reloading a model when avoidable."""
+        reset = getattr(self.agent, "reset", None)
+        if callable(reset):
+            reset()  # keeps the model (and daemon weights) loaded
+        else:
+            self.agent = self._loader(self.backend, self.model_size)
+        self.turns.clear()
+        self.console.print("Conversation reset.")
+
+    def switch_backend(self, backend: Optional[str]) -> None:
+        if backend is None:
+            self.console.print(f"Backend: {self.backend or 'default (TIMMY_MODEL_BACKEND)'}")
+            return
+        if backend not in _BACKENDS:
+            self.console.print(f"Unknown backend {backend!r} — choose from {', '.join(_BACKENDS)}.")
+            return
+        self.console.print(f"Loading {backend}...")
+        self.agent = self._loader(backend, self.model_size)
+        self.backend = backend
+        self.turns.clear()
+        self.console.print(f"Backend: {backend}")
+
+    def stats_table(self) -> Table:
+        table = Table(title="Turns", show_footer=len(self.turns) > 1)
+        table.add_column("#", justify="right", footer="all")
+        table.add_column("latency ms", justify="right")
+        table.add_column("TTFT ms", justify="right")
+        table.add_column("tokens", justify="right")
+        table.add_column("tok/s", justify="right")
+
+        def fmt(value: Optional[float]) -> str:
+            return "—" if value is None else f"{value:.0f}"
+
+        for i, turn in enumerate(self.turns, 1):
+            rate = turn.tokens_per_sec
+            table.add_row(str(i), fmt(turn.latency_ms), fmt(turn.ttft_ms),
+                          str(turn.tokens) if turn.error is None else "error",
+                          "—" if rate is None else f"{rate:.1f}")
+        if len(self.turns) > 1:
+            total_ms = sum(t.latency_ms for t in self.turns)
+            table.columns[1].footer = fmt(total_ms)
+            table.columns[3].footer = str(sum(t.tokens for t in self.turns))
+        return table
@@ -0,0 +1,247 @@
+"""Opt-in cache of Timmy's replies to repeated prompts.
+
+Voice and Siri users ask the same few things over and over ("status",
+"what can you do"), and each one used to cost a full model run.  With
+RESPONSE_CACHE_ENABLED=true the routes look a reply up here first; a hit
+is returned straight away, without touching the inference queue or the
+agent pool.
+
+Entries are keyed by the normalised prompt (case, whitespace and trailing
+punctuation folded), the backend, the model and a fingerprint of the
+conversation history the reply was generated against — the same question
+asked mid-conversation is a different entry.  The in-memory tier is an
+LRU bounded by total bytes, and every entry expires after a TTL.  With
+RESPONSE_CACHE_DB set, entries are also written through to SQLite so
+they survive restarts; a memory miss falls back to that tier and
+promotes what it finds.
+
+Usage:
+    from timmy.response_cache import response_cache
+
+    key = response_cache.key_for(message)
+    reply = response_cache.get(key)
+    if reply is None:
+        reply = ask_timmy(message)
+        response_cache.put(key, reply)
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCT = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, runs of whitespace and trailing punctuation."""
+    return _TRAILING_PUNCT.sub("", _WHITESPACE.sub(" ", prompt.strip().lower()))
+
+
+def history_fingerprint(turns: Iterable) -> str:
+    """Short digest of a conversation, from objects with ``role`` and ``content``."""
+    digest = hashlib.sha256()
+    for turn in turns:
+        digest.update(f"{turn.role}\x1f{turn.content}\x1e".encode())
+    return digest.hexdigest()[:16]
+
+
+class ResponseCache:
+    """Byte-bounded LRU with TTL, optionally backed by a SQLite table."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        ttl: float = 3600.0,
+        max_bytes: int = 4 * 1024 * 1024,
+        db_path: Optional[str] = None,
+    ) -> None:
+        self.enabled = enabled
+        self._ttl = ttl
+        self._max_bytes = max(0, max_bytes)
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db_path = db_path or None
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ── keys ────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def key(prompt: str, model: str, backend: str, history: str = "") -> str:
+        raw = "\x1f".join((normalize_prompt(prompt), model, backend, history))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def key_for(self, prompt: str, history: str = "", backend: Optional[str] = None) -> str:
+        """Key for a prompt answered by the configured backend and model."""
+        from timmy.agent import _resolve_backend
+        resolved = _resolve_backend(backend)
+        if resolved == "ollama":
+            model = settings.ollama_model
+        else:
+            # Compressed weights answer differently — keep their replies apart.
+            model = settings.airllm_model_size
+            if settings.airllm_quantization != "none":
+                model += f"-{settings.airllm_quantization}"
+        return self.key(prompt, model, resolved, history)
+
+    # ── lookup / store ──────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached reply, or None on a miss (or when disabled)."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] > self._ttl:
+                self._drop(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            entry = self._db_get(key, now)
+            if entry is not None:
+                self._store(key, *entry)
+                self.hits += 1
+                self.disk_hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str) -> None:
+        """Store a reply; blank ones (a cut-off or failed turn) are never cached."""
+        if not self.enabled or not response.strip():
+            return
+        created = time.time()
+        with self._lock:
+            self._store(key, response, created)
+            self._db_put(key, response, created)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            conn = self._db()
+            if conn is not None:
+                conn.execute("DELETE FROM response_cache")
+                conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "persistent": self._db_path is not None,
+            }
+
+    # ── memory tier (caller holds the lock) ─────────────────────────────────
+
+    @staticmethod
+    def _size(key: str, response: str) -> int:
+        return len(key) + len(response.encode())
+
+    def _store(self, key: str, response: str, created: float) -> None:
+        size = self._size(key, response)
+        if key in self._entries:
+            self._drop(key)
+        if size > self._max_bytes:
+            return  # would evict everything else; keep it on disk only
+        self._entries[key] = (response, created)
+        self._bytes += size
+        while self._bytes > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        response, _ = self._entries.pop(key)
+        self._bytes -= self._size(key, response)
+
+    # ── SQLite tier (caller holds the lock) ─────────────────────────────────
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._db_path is None:
+            return None
+        if self._conn is None:
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "DELETE FROM response_cache WHERE created < ?", (time.time() - self._ttl,)
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _db_get(self, key: str, now: float) -> Optional[tuple[str, float]]:
+        conn = self._db()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT response, created FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("ResponseCache: SQLite read failed: %s", exc)
+            return None
+        if row is None:
+            return None
+        if now - row[1] > self._ttl:
+            conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        return row[0], row[1]
+
+    def _db_put(self, key: str, response: str, created: float) -> None:
+        conn = self._db()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, response, created) VALUES (?, ?, ?)",
+                (key, response, created),
+            )
+            conn.commit()
+        except sqlite3.Error as exc:
+            logger.warning("ResponseCache: SQLite write failed: %s", exc)
+
+
+# Module-level singleton shared across the app
+response_cache = ResponseCache(
+    enabled=settings.response_cache_enabled,
+    ttl=settings.response_cache_ttl_seconds,
+    max_bytes=settings.response_cache_max_bytes,
+    db_path=settings.response_cache_db,
+)
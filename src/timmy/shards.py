@@ -0,0 +1,176 @@
+"""Page-cache pre-warming and readahead for AirLLM layer shards.
+
+AirLLM splits a model into one safetensors file per layer and reads them
+in order on every forward pass, so a cold page cache makes each token
+wait on disk.  This module keeps the kernel ahead of the model:
+
+  * prewarm()       — at agent construction, ask the kernel to read every
+    shard into the page cache (posix_fadvise WILLNEED, mmap + madvise
+    where fadvise is missing, plain reads as a last resort), stopping at
+    a byte budget so late shards do not evict early ones;
+  * LayerPrefetcher — during generation, whenever AirLLM starts loading
+    layer N, a background thread issues readahead for layer N+1, so its
+    I/O overlaps layer N's compute;
+  * evict()         — drop the shards from the cache (fadvise DONTNEED) so
+    `timmy bench --cold-warm` can measure a cold first token without root.
+
+All of it is advisory: on platforms or AirLLM builds where a hook is
+unavailable it logs and does nothing.
+"""
+
+import logging
+import mmap
+import os
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_READ_CHUNK = 1 << 20
+
+
+def _natural_key(path: Path) -> list:
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path.name)]
+
+
+def layer_shards(model: Any) -> list[Path]:
+    """The model's per-layer shard files, in the order AirLLM reads them."""
+    root = getattr(model, "checkpoint_path", None)
+    if not isinstance(root, (str, Path)) or not Path(root).is_dir():
+        return []
+    root = Path(root)
+    names = getattr(model, "layer_names", None)
+    if isinstance(names, (list, tuple)) and names:
+        paths = [root / f"{name}.safetensors" for name in names]
+        return [p for p in paths if p.exists()]
+    return sorted(root.glob("*.safetensors"), key=_natural_key)
+
+
+def physical_memory() -> Optional[int]:
+    """Installed RAM in bytes (None where the platform does not say)."""
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_budget() -> Optional[int]:
+    """Half of physical RAM — warming more would evict what was just read."""
+    ram = physical_memory()
+    return None if ram is None else ram // 2
+
+
+def readahead(path: Path) -> int:
+    """Ask the kernel to cache ``path``; returns its size in bytes."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        elif hasattr(mmap, "MADV_WILLNEED"):
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                mapped.madvise(mmap.MADV_WILLNEED)
+        else:
+            while f.read(_READ_CHUNK):
+                pass
+    return size
+
+
+def evict(paths: list[Path]) -> int:
+    """Drop the files' clean pages from the page cache; returns files evicted."""
+    if not hasattr(os, "posix_fadvise"):
+        return 0
+    evicted = 0
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            evicted += 1
+        except OSError as exc:
+            logger.debug("Shards: could not evict %s — %s", path, exc)
+    return evicted
+
+
+@dataclass
+class PrewarmStats:
+    files: int = 0
+    bytes: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+
+def prewarm(paths: list[Path], budget_bytes: Optional[int] = None) -> PrewarmStats:
+    """Read ahead ``paths`` in order until ``budget_bytes`` would be exceeded."""
+    budget = default_budget() if budget_bytes is None else budget_bytes
+    stats = PrewarmStats()
+    start = time.perf_counter()
+    for path in paths:
+        try:
+            size = path.stat().st_size
+            if budget is not None and stats.bytes + size > budget:
+                stats.skipped = len(paths) - stats.files
+                break
+            readahead(path)
+        except OSError as exc:
+            logger.debug("Shards: could not prewarm %s — %s", path, exc)
+            continue
+        stats.files += 1
+        stats.bytes += size
+    stats.seconds = time.perf_counter() - start
+    logger.info(
+        "Shards: prewarmed %d/%d layer files (%.1f GiB) in %.2fs",
+        stats.files, len(paths), stats.bytes / 2**30, stats.seconds,
+    )
+    return stats
+
+
+class LayerPrefetcher:
+    """Reads layer N+1 ahead on a daemon thread while layer N computes.
+
+    install() wraps the model's ``load_layer_to_cpu(layer_name)`` — the
+    method AirLLM calls once per layer per forward pass.  Builds without
+    it are left untouched.
+    """
+
+    def __init__(self, paths: list[Path]) -> None:
+        self._paths = paths
+        self._index = {p.name[: -len(".safetensors")]: i for i, p in enumerate(paths)}
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.prefetched = 0
+
+    def install(self, model: Any) -> bool:
+        load = getattr(model, "load_layer_to_cpu", None)
+        if not self._paths or not callable(load):
+            logger.debug("Shards: no per-layer load hook — next-layer prefetch off")
+            return False
+
+        def load_layer_to_cpu(layer_name, *args, **kwargs):
+            self.ahead(layer_name)
+            return load(layer_name, *args, **kwargs)
+
+        model.load_layer_to_cpu = load_layer_to_cpu
+        self._thread = threading.Thread(target=self._run, name="layer-prefetch", daemon=True)
+        self._thread.start()
+        return True
+
+    def ahead(self, layer_name: str) -> None:
+        """Queue readahead for the layer after ``layer_name`` (wrapping to the first)."""
+        index = self._index.get(layer_name)
+        if index is not None:
+            self._queue.put(self._paths[(index + 1) % len(self._paths)])
+
+    def _run(self) -> None:
+        while True:
+            path = self._queue.get()
+            try:
+                readahead(path)
+                self.prefetched += 1
+            except OSError as exc:
+                logger.debug("Shards: prefetch of %s failed — %s", path, exc)
@@ -1,6 +1,6 @@
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -21,13 +21,47 @@ for _mod in [
     sys.modules.setdefault(_mod, MagicMock())
 
 
+@pytest.fixture(scope="session", autouse=True)
+def sessions_db(tmp_path_factory):
+    """Point the session store at a throwaway SQLite file.
+
+    The default DASHBOARD_SESSIONS_DB is relative to the working directory,
+    so reset_sessions would otherwise wipe the checkout's real chat history.
+    """
+    from dashboard.sessions import session_store
+    path = tmp_path_factory.mktemp("sessions") / "sessions.db"
+    with patch.object(session_store, "_db_path", str(path)), \
+            patch.object(session_store, "_conn", None):
+        yield path
+        if session_store._conn is not None:
+            session_store._conn.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_sessions():
+    """Forget every dashboard session (and its chat log) before and after every test."""
+    from dashboard.sessions import session_store
+    session_store.clear()
+    yield
+    session_store.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_agent_pool():
+    """Drop pooled agents so a mock built in one test never leaks into the next."""
+    from timmy.pool import agent_pool
+    agent_pool.clear()
+    yield
+    agent_pool.clear()
+
+
 @pytest.fixture(autouse=True)
-def reset_message_log():
-    """Clear the in-memory chat log before and after every test."""
-    from dashboard.store import message_log
-    message_log.clear()
+def reset_health():
+    """Drop the cached health snapshot so each test's probe patches take effect."""
+    from dashboard.probes import health_monitor
+    health_monitor.clear()
     yield
-    message_log.clear()
+    health_monitor.clear()
 
 
 @pytest.fixture
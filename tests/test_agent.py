@@ -3,9 +3,9 @@ from unittest.mock import MagicMock, patch
 
 def test_create_timmy_returns_agent():
     """create_timmy should delegate to Agno Agent with correct config."""
-    with patch("timmy.agent.Agent") as MockAgent, \
-         patch("timmy.agent.Ollama"), \
-         patch("timmy.agent.SqliteDb"):
+    with patch("agno.agent.Agent") as MockAgent, \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb"):
 
         mock_instance = MagicMock()
         MockAgent.return_value = mock_instance
@@ -18,9 +18,9 @@ def test_create_timmy_returns_agent():
 
 
 def test_create_timmy_agent_name():
-    with patch("timmy.agent.Agent") as MockAgent, \
-         patch("timmy.agent.Ollama"), \
-         patch("timmy.agent.SqliteDb"):
+    with patch("agno.agent.Agent") as MockAgent, \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb"):
 
         from timmy.agent import create_timmy
         create_timmy()
@@ -30,34 +30,99 @@ def test_create_timmy_agent_name():
 
 
 def test_create_timmy_uses_llama32():
-    with patch("timmy.agent.Agent"), \
-         patch("timmy.agent.Ollama") as MockOllama, \
-         patch("timmy.agent.SqliteDb"):
+    with patch("agno.agent.Agent"), \
+         patch("agno.models.ollama.Ollama") as MockOllama, \
+         patch("agno.db.sqlite.SqliteDb"):
 
         from timmy.agent import create_timmy
         create_timmy()
 
-        MockOllama.assert_called_once_with(id="llama3.2")
+        MockOllama.assert_called_once()
+        assert MockOllama.call_args.kwargs["id"] == "llama3.2"
+
+
+def test_create_timmy_routes_ollama_through_balancer():
+    with patch("agno.agent.Agent"), \
+         patch("agno.models.ollama.Ollama") as MockOllama, \
+         patch("agno.db.sqlite.SqliteDb"):
+
+        from timmy.agent import create_timmy
+        from timmy.balancer import BalancedAsyncOllamaClient, BalancedOllamaClient
+        create_timmy()
+
+        kwargs = MockOllama.call_args.kwargs
+        assert isinstance(kwargs["client"], BalancedOllamaClient)
+        assert isinstance(kwargs["async_client"], BalancedAsyncOllamaClient)
 
 
 def test_create_timmy_history_config():
-    with patch("timmy.agent.Agent") as MockAgent, \
-         patch("timmy.agent.Ollama"), \
-         patch("timmy.agent.SqliteDb"):
+    with patch("agno.agent.Agent") as MockAgent, \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb"):
 
         from timmy.agent import create_timmy
         create_timmy()
 
         kwargs = MockAgent.call_args.kwargs
-        assert kwargs["add_history_to_context"] is True
-        assert kwargs["num_history_runs"] == 10
+        # History comes from the token-budgeted ContextWindow, not Agno replay.
+        assert kwargs["add_history_to_context"] is False
+        assert "num_history_runs" not in kwargs
+        assert len(kwargs["pre_hooks"]) == 1
+        assert len(kwargs["post_hooks"]) == 1
         assert kwargs["markdown"] is True
 
 
+def test_create_timmy_hooks_inject_previous_exchange():
+    with patch("agno.agent.Agent") as MockAgent, \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb"):
+
+        from timmy.agent import create_timmy
+        create_timmy()
+
+        kwargs = MockAgent.call_args.kwargs
+        load_context = kwargs["pre_hooks"][0]
+        record_exchange = kwargs["post_hooks"][0]
+        agent = MagicMock()
+
+        run_input = MagicMock()
+        run_input.input_content_string.return_value = "What is sovereignty?"
+        load_context(agent=agent, run_input=run_input)
+        assert agent.additional_context is None
+
+        run_output = MagicMock()
+        run_output.input = run_input
+        run_output.content = "Sir, self-custody."
+        record_exchange(agent=agent, run_output=run_output)
+
+        load_context(agent=agent, run_input=run_input)
+        assert "User: What is sovereignty?" in agent.additional_context
+        assert "Timmy: Sir, self-custody." in agent.additional_context
+
+        MockAgent.return_value.reset()
+        load_context(agent=agent, run_input=run_input)
+        assert agent.additional_context is None
+
+        MockAgent.return_value.restore([("Who are you?", "Timmy, sir.")])
+        load_context(agent=agent, run_input=run_input)
+        assert "Timmy: Timmy, sir." in agent.additional_context
+
+
+def test_create_timmy_passes_session_id():
+    with patch("agno.agent.Agent") as MockAgent, \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb"):
+
+        from timmy.agent import create_timmy
+        create_timmy(session_id="abc")
+
+        assert MockAgent.call_args.kwargs["session_id"] == "abc"
+
+
 def test_create_timmy_custom_db_file():
-    with patch("timmy.agent.Agent"), \
-         patch("timmy.agent.Ollama"), \
-         patch("timmy.agent.SqliteDb") as MockDb:
+    with patch("agno.agent.Agent"), \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb") as MockDb:
 
         from timmy.agent import create_timmy
         create_timmy(db_file="custom.db")
@@ -68,9 +133,9 @@ def test_create_timmy_custom_db_file():
 def test_create_timmy_embeds_system_prompt():
     from timmy.prompts import TIMMY_SYSTEM_PROMPT
 
-    with patch("timmy.agent.Agent") as MockAgent, \
-         patch("timmy.agent.Ollama"), \
-         patch("timmy.agent.SqliteDb"):
+    with patch("agno.agent.Agent") as MockAgent, \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb"):
 
         from timmy.agent import create_timmy
         create_timmy()
@@ -94,7 +159,7 @@ def test_create_timmy_airllm_returns_airllm_agent():
 
 def test_create_timmy_airllm_does_not_call_agno_agent():
     """When using the airllm backend, Agno Agent should never be instantiated."""
-    with patch("timmy.agent.Agent") as MockAgent, \
+    with patch("agno.agent.Agent") as MockAgent, \
          patch("timmy.backends.is_apple_silicon", return_value=False):
 
         from timmy.agent import create_timmy
@@ -105,9 +170,9 @@ def test_create_timmy_airllm_does_not_call_agno_agent():
 
 def test_create_timmy_explicit_ollama_ignores_autodetect():
     """backend='ollama' must always use Ollama, even on Apple Silicon."""
-    with patch("timmy.agent.Agent") as MockAgent, \
-         patch("timmy.agent.Ollama"), \
-         patch("timmy.agent.SqliteDb"):
+    with patch("agno.agent.Agent") as MockAgent, \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb"):
 
         from timmy.agent import create_timmy
         create_timmy(backend="ollama")
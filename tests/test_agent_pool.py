@@ -0,0 +1,162 @@
+"""Tests for src/timmy/pool.py — warm agent pool."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from timmy.pool import AgentPool
+
+
+def _factory():
+    """Factory that returns a distinct mock agent per call."""
+    return MagicMock(side_effect=lambda **kw: MagicMock(name="agent"))
+
+
+# ── Reuse ────────────────────────────────────────────────────────────────────
+
+def test_checkout_builds_agent_on_miss():
+    pool = AgentPool()
+    factory = _factory()
+    agent = pool.checkout(factory=factory)
+    assert agent is not None
+    factory.assert_called_once()
+    assert pool.stats()["misses"] == 1
+
+
+def test_released_agent_is_reused():
+    pool = AgentPool()
+    factory = _factory()
+    first = pool.checkout(factory=factory)
+    pool.release(first)
+    second = pool.checkout(factory=factory)
+    assert second is first
+    assert factory.call_count == 1
+    assert pool.stats()["hits"] == 1
+
+
+def test_factory_receives_resolved_backend():
+    pool = AgentPool()
+    factory = _factory()
+    pool.checkout(db_file="x.db", factory=factory)
+    kwargs = factory.call_args.kwargs
+    assert kwargs["db_file"] == "x.db"
+    assert kwargs["backend"] == "ollama"
+
+
+def test_different_keys_do_not_share_agents():
+    pool = AgentPool()
+    factory = _factory()
+    a = pool.checkout(db_file="a.db", factory=factory)
+    pool.release(a)
+    b = pool.checkout(db_file="b.db", factory=factory)
+    assert b is not a
+    assert pool.stats()["keys"] == 2
+
+
+def test_concurrent_checkouts_get_distinct_agents():
+    pool = AgentPool(max_size=2)
+    factory = _factory()
+    a = pool.checkout(factory=factory)
+    b = pool.checkout(factory=factory)
+    assert a is not b
+    assert pool.stats()["leased"] == 2
+
+
+# ── Bounds ───────────────────────────────────────────────────────────────────
+
+def test_checkout_times_out_when_key_exhausted():
+    pool = AgentPool(max_size=1, checkout_timeout=0.05)
+    factory = _factory()
+    pool.checkout(factory=factory)
+    with pytest.raises(TimeoutError):
+        pool.checkout(factory=factory)
+
+
+def test_waiting_checkout_gets_released_agent():
+    pool = AgentPool(max_size=1, checkout_timeout=2.0)
+    factory = _factory()
+    first = pool.checkout(factory=factory)
+    timer = threading.Timer(0.05, pool.release, args=(first,))
+    timer.start()
+    second = pool.checkout(factory=factory)
+    timer.join()
+    assert second is first
+
+
+def test_airllm_key_capped_at_one_instance():
+    pool = AgentPool(max_size=4, checkout_timeout=0.05)
+    factory = _factory()
+    pool.checkout(backend="airllm", factory=factory)
+    with pytest.raises(TimeoutError):
+        pool.checkout(backend="airllm", factory=factory)
+
+
+def test_factory_error_frees_reserved_slot():
+    pool = AgentPool(max_size=1, checkout_timeout=0.05)
+    broken = MagicMock(side_effect=RuntimeError("boom"))
+    with pytest.raises(RuntimeError):
+        pool.checkout(factory=broken)
+    # The failed build must not leave the key looking exhausted.
+    assert pool.checkout(factory=_factory()) is not None
+
+
+# ── Eviction ─────────────────────────────────────────────────────────────────
+
+def test_idle_agent_evicted_after_timeout():
+    pool = AgentPool(idle_timeout=10.0)
+    factory = _factory()
+    with patch("timmy.pool.time.monotonic", return_value=100.0):
+        agent = pool.checkout(factory=factory)
+        pool.release(agent)
+    with patch("timmy.pool.time.monotonic", return_value=200.0):
+        fresh = pool.checkout(factory=factory)
+    assert fresh is not agent
+    assert pool.stats()["evicted"] == 1
+
+
+# ── lease() ──────────────────────────────────────────────────────────────────
+
+def test_lease_releases_on_success():
+    pool = AgentPool()
+    factory = _factory()
+    with pool.lease(factory=factory) as agent:
+        pass
+    assert pool.stats()["idle"] == 1
+    assert pool.stats()["leased"] == 0
+    with pool.lease(factory=factory) as again:
+        assert again is agent
+
+
+def test_lease_discards_on_error():
+    pool = AgentPool()
+    factory = _factory()
+    with pytest.raises(ValueError):
+        with pool.lease(factory=factory):
+            raise ValueError("agent blew up")
+    assert pool.stats()["idle"] == 0
+    assert pool.stats()["leased"] == 0
+
+
+def test_lease_keeps_agent_when_generation_cancelled():
+    from timmy.inference import GenerationCancelled
+
+    pool = AgentPool()
+    with pytest.raises(GenerationCancelled):
+        with pool.lease(factory=_factory()):
+            raise GenerationCancelled()
+    assert pool.stats()["idle"] == 1
+
+
+# ── Dashboard integration ────────────────────────────────────────────────────
+
+def test_chat_route_reuses_agent_across_requests(client):
+    mock_agent = MagicMock()
+    mock_agent.run.side_effect = lambda message, stream: iter([MagicMock(content="OK.")])
+
+    with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent) as factory:
+        client.post("/agents/timmy/chat", data={"message": "one"})
+        client.post("/agents/timmy/chat", data={"message": "two"})
+
+    factory.assert_called_once()
+    assert mock_agent.run.call_count == 2
@@ -0,0 +1,104 @@
+"""Tests for src/dashboard/assets.py — fingerprinted, precompressed static files."""
+
+import gzip
+from unittest.mock import patch
+
+import pytest
+
+from dashboard import assets
+from dashboard.assets import IMMUTABLE, STATIC_DIR, build, negotiate, static_url
+
+
+@pytest.fixture
+def built(tmp_path):
+    """A fresh build of static/ into tmp_path, reset afterwards."""
+    assets._manifest = None
+    with patch("dashboard.assets.settings.dashboard_static_build", str(tmp_path)):
+        yield tmp_path, build()
+    assets._manifest = None
+
+
+# ── build ────────────────────────────────────────────────────────────────────
+
+def test_build_fingerprints_and_gzips(built):
+    out, manifest = built
+    hashed = manifest["style.css"]
+    assert hashed.startswith("style.") and hashed.endswith(".css")
+    assert (out / hashed).read_bytes() == (STATIC_DIR / "style.css").read_bytes()
+    assert gzip.decompress((out / f"{hashed}.gz").read_bytes()) == (out / hashed).read_bytes()
+    assert (out / assets.MANIFEST).exists()
+
+
+def test_build_is_reproducible(built):
+    out, manifest = built
+    gz = (out / f"{manifest['style.css']}.gz").read_bytes()
+    assert build() == manifest
+    assert (out / f"{manifest['style.css']}.gz").read_bytes() == gz
+
+
+def test_build_writes_brotli_when_available(built):
+    brotli = pytest.importorskip("brotli")
+    out, manifest = built
+    packed = (out / f"{manifest['style.css']}.br").read_bytes()
+    assert brotli.decompress(packed) == (STATIC_DIR / "style.css").read_bytes()
+
+
+def test_static_url_uses_manifest(built):
+    _, manifest = built
+    assert static_url("style.css") == f"/static/{manifest['style.css']}"
+    assert static_url("missing.js") == "/static/missing.js"
+
+
+def test_static_url_is_plain_without_a_build():
+    assets._manifest = None
+    with patch("dashboard.assets.settings.dashboard_static_build", ""):
+        assert static_url("style.css") == "/static/style.css"
+    assets._manifest = None
+
+
+# ── negotiation ──────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, *", "gzip"),
+    ("*", "br"),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header, ["br", "gzip"]) == expected
+
+
+# ── serving ──────────────────────────────────────────────────────────────────
+
+def test_hashed_asset_is_immutable_and_gzipped(built, client):
+    _, manifest = built
+    url = f"/static/{manifest['style.css']}"
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.content == (STATIC_DIR / "style.css").read_bytes()
+
+
+def test_hashed_asset_without_accept_encoding_is_identity(built, client):
+    _, manifest = built
+    response = client.get(f"/static/{manifest['style.css']}",
+                          headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["cache-control"] == IMMUTABLE
+
+
+def test_plain_name_is_still_served_without_immutable(built, client):
+    response = client.get("/static/style.css")
+    assert response.status_code == 200
+    assert response.headers.get("cache-control") != IMMUTABLE
+
+
+def test_pages_link_the_fingerprinted_stylesheet(built, client):
+    _, manifest = built
+    assert f"/static/{manifest['style.css']}" in client.get("/").text
@@ -141,3 +141,82 @@ def test_print_response_stream_flag_accepted():
     """stream=False should not raise — it's accepted for API compatibility."""
     agent = _make_agent()
     agent.print_response("hello", stream=False)  # no error
+
+
+# ── TimmyAirLLMAgent.run(stream=True) ────────────────────────────────────────
+
+def test_run_stream_yields_deltas_from_streamer():
+    """Tokens pushed through the streamer surface as separate RunResult chunks."""
+    agent = _make_agent()
+    words = ["Sir", "Sir,", "Sir, affirmative."]
+    agent._model.tokenizer.decode.side_effect = lambda ids, **kw: words[len(ids) - 1]
+
+    def fake_generate(**kwargs):
+        streamer = kwargs["streamer"]
+        streamer.put([[1, 2, 3]])        # prompt — skipped
+        for token in (10, 11, 12):
+            streamer.put([token])
+        streamer.end()
+        return [list(range(13))]
+
+    agent._model.generate.side_effect = fake_generate
+    chunks = [c.content for c in agent.run("status?", stream=True)]
+    assert chunks == ["Sir", ",", " affirmative."]
+    assert agent._history[-1] == "Timmy: Sir, affirmative."
+
+
+def test_run_stream_falls_back_when_streamer_ignored():
+    """A generate() that never touches the streamer still yields the full reply."""
+    agent = _make_agent()
+    chunks = [c.content for c in agent.run("hello", stream=True)]
+    assert chunks == ["Sir, affirmative."]
+    assert agent._history == ["User: hello", "Timmy: Sir, affirmative."]
+
+
+def test_run_stream_propagates_generate_errors():
+    agent = _make_agent()
+    agent._model.generate.side_effect = RuntimeError("disk read failed")
+    with pytest.raises(RuntimeError, match="disk read failed"):
+        list(agent.run("hello", stream=True))
+    assert agent._history == []
+
+
+def test_closing_stream_stops_generate():
+    """An abandoned stream trips the stopping criterion so generate() ends early."""
+    import threading
+
+    agent = _make_agent()
+    agent._model.tokenizer.decode.side_effect = lambda ids, **kw: "x" * len(ids)
+    stopped = threading.Event()
+
+    def fake_generate(**kwargs):
+        streamer, (criterion,) = kwargs["streamer"], kwargs["stopping_criteria"]
+        streamer.put([[1, 2, 3]])
+        for token in range(1000):
+            if criterion(None, None):
+                stopped.set()
+                break
+            streamer.put([token])
+        streamer.end()
+        return [[1]]
+
+    agent._model.generate.side_effect = fake_generate
+    stream = agent.run("hello", stream=True)
+    next(stream)
+    stream.close()
+    assert stopped.is_set()
+
+
+def test_restore_replaces_history():
+    agent = _make_agent()
+    agent.run("forget me")
+    agent.restore([("hi", "hello")])
+    assert agent._history == ["User: hi", "Timmy: hello"]
+
+
+def test_run_without_stream_returns_single_result():
+    from timmy.backends import RunResult
+    agent = _make_agent()
+    result = agent.run("hello")
+    assert isinstance(result, RunResult)
+    assert result.content == "Sir, affirmative."
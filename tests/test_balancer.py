@@ -0,0 +1,180 @@
+"""Tests for src/timmy/balancer.py — multi-host Ollama load balancing."""
+
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from config import Settings
+from timmy.balancer import OllamaBalancer
+from timmy.fake_ollama import FakeOllama
+
+A, B, C = "http://a:11434", "http://b:11434", "http://c:11434"
+
+
+# ── settings ─────────────────────────────────────────────────────────────────
+
+def test_ollama_url_accepts_comma_separated_hosts():
+    s = Settings(ollama_url=" http://a:11434/, http://b:11434 ,")
+    assert s.ollama_hosts == ["http://a:11434", "http://b:11434"]
+    assert Settings().ollama_hosts == ["http://localhost:11434"]
+
+
+# ── selection ────────────────────────────────────────────────────────────────
+
+def test_acquire_prefers_least_outstanding_host():
+    balancer = OllamaBalancer([A, B])
+    first = balancer.acquire()
+    second = balancer.acquire()
+    assert {first, second} == {A, B}
+
+    balancer.release(first)
+    assert balancer.acquire() == first  # the other host is still busy
+
+
+def test_transport_error_ejects_host_until_cooldown():
+    balancer = OllamaBalancer([A, B], cooldown=0.05)
+    with pytest.raises(ConnectionError):
+        with balancer.lease() as url:
+            assert url == A
+            raise ConnectionError("refused")
+
+    assert [balancer.acquire() for _ in range(3)] == [B, B, B]
+    stats = {h["url"]: h for h in balancer.stats()}
+    assert stats[A]["status"] == "ejected"
+    assert stats[A]["last_error"] == "refused"
+
+    time.sleep(0.06)
+    assert balancer.pick() == A  # back in rotation, and idle
+
+
+def test_application_error_does_not_eject():
+    balancer = OllamaBalancer([A, B])
+    with pytest.raises(ValueError):
+        with balancer.lease():
+            raise ValueError("model not found")
+    assert all(h["status"] == "up" for h in balancer.stats())
+
+
+def test_all_ejected_fails_open_on_soonest_recovery():
+    balancer = OllamaBalancer([A, B], cooldown=60)
+    balancer.mark_down(B)
+    balancer.mark_down(A)
+    assert balancer.pick() == B
+
+
+# ── balanced client ──────────────────────────────────────────────────────────
+
+def _factory(behaviour: dict):
+    """Per-host fake ollama.Client whose chat() result comes from ``behaviour``."""
+    def make(url):
+        client = MagicMock()
+        outcome = behaviour[url]
+        if isinstance(outcome, BaseException):
+            client.chat.side_effect = outcome
+        else:
+            client.chat.return_value = outcome
+        return client
+    return make
+
+
+def test_client_retries_next_host_on_connection_error():
+    balancer = OllamaBalancer([A, B])
+    client = balancer.client(_factory({A: ConnectionError("refused"), B: "reply-from-b"}))
+    assert client.chat(model="llama3.2", messages=[]) == "reply-from-b"
+    assert {h["url"]: h["status"] for h in balancer.stats()} == {A: "ejected", B: "up"}
+
+
+def test_client_raises_when_every_host_fails():
+    balancer = OllamaBalancer([A, B])
+    client = balancer.client(_factory({A: ConnectionError("a"), B: ConnectionError("b")}))
+    with pytest.raises(ConnectionError):
+        client.chat(model="llama3.2", messages=[])
+
+
+def test_stream_holds_host_until_exhausted():
+    balancer = OllamaBalancer([A, B])
+    client = balancer.client(_factory({A: iter(["x", "y"]), B: iter([])}))
+    stream = client.chat(model="llama3.2", messages=[], stream=True)
+    assert next(stream) == "x"
+    assert {h["url"]: h["outstanding"] for h in balancer.stats()}[A] == 1
+    assert list(stream) == ["y"]
+    assert {h["url"]: h["outstanding"] for h in balancer.stats()}[A] == 0
+
+
+async def test_async_client_routes_and_releases():
+    balancer = OllamaBalancer([A])
+    upstream = MagicMock()
+    upstream.chat = AsyncMock(return_value="async-reply")
+    client = balancer.async_client(lambda url: upstream)
+    assert await client.chat(model="llama3.2", messages=[]) == "async-reply"
+    assert balancer.stats()[0]["outstanding"] == 0
+
+
+# ── several local stub servers ───────────────────────────────────────────────
+
+@pytest.fixture
+def stub_hosts():
+    servers = [FakeOllama(reply="hello there", token_delay=0.01).start() for _ in range(3)]
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+def test_concurrent_chats_spread_across_stub_servers(stub_hosts):
+    pytest.importorskip("ollama")
+    balancer = OllamaBalancer([s.url for s in stub_hosts])
+    client = balancer.client()
+
+    def chat():
+        reply = client.chat(model="llama3.2", messages=[{"role": "user", "content": "hi"}])
+        assert reply["message"]["content"] == "hello there"
+
+    threads = [threading.Thread(target=chat) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert [len(s.requests) for s in stub_hosts] == [2, 2, 2]
+    assert all(h["outstanding"] == 0 for h in balancer.stats())
+
+
+def test_dead_stub_server_is_ejected_and_skipped(stub_hosts):
+    pytest.importorskip("ollama")
+    balancer = OllamaBalancer([s.url for s in stub_hosts], cooldown=60)
+    client = balancer.client()
+    stub_hosts[0].stop()
+
+    for _ in range(3):
+        client.chat(model="llama3.2", messages=[{"role": "user", "content": "hi"}])
+
+    stats = {h["url"]: h for h in balancer.stats()}
+    assert stats[stub_hosts[0].url]["status"] == "ejected"
+    assert len(stub_hosts[1].requests) + len(stub_hosts[2].requests) == 3
+
+
+async def test_health_probe_readmits_and_ejects_hosts(stub_hosts):
+    from timmy.ollama_client import OllamaClient
+    dead = "http://127.0.0.1:9"
+    balancer = OllamaBalancer([stub_hosts[0].url, dead], cooldown=60)
+    balancer.mark_down(stub_hosts[0].url, "earlier failure")
+    probe = OllamaClient([stub_hosts[0].url, dead], "llama3.2", balancer=balancer)
+
+    assert await probe.ping() is True
+    stats = {h["url"]: h["status"] for h in balancer.stats()}
+    assert stats == {stub_hosts[0].url: "up", dead: "ejected"}
+
+
+def test_health_reports_per_host_status(client):
+    balancer = OllamaBalancer([A, B])
+    balancer.mark_down(B, "refused")
+    with patch("dashboard.routes.health.ollama_balancer", balancer), \
+         patch("dashboard.routes.health.check_ollama", new_callable=AsyncMock, return_value=True):
+        data = client.get("/health").json()
+        panel = client.get("/health/status").text
+
+    assert [(h["url"], h["status"]) for h in data["ollama_hosts"]] == [(A, "up"), (B, "ejected")]
+    assert "b:11434" in panel
+    assert "EJECTED" in panel
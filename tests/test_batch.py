@@ -0,0 +1,156 @@
+"""Tests for src/timmy/batch.py and `timmy batch`."""
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from timmy.batch import agent_asker, completed_ids, read_jobs, run_batch
+from timmy.cli import app
+
+runner = CliRunner()
+
+
+def _write_jobs(path, prompts):
+    path.write_text("".join(json.dumps({"id": f"q{i}", "prompt": p}) + "\n"
+                            for i, p in enumerate(prompts)))
+    return path
+
+
+def _rows(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_read_jobs_defaults_ids_and_flags_bad_lines(tmp_path):
+    src = tmp_path / "in.jsonl"
+    src.write_text('{"prompt": "a"}\n\nnot json\n{"id": 9}\n{"id": "x", "message": "b"}\n')
+    jobs = list(read_jobs(src))
+    assert [(j.id, j.prompt) for j in jobs] == [(1, "a"), (3, None), (9, None), ("x", "b")]
+    assert "invalid JSON" in jobs[1].error
+    assert "no 'prompt'" in jobs[2].error
+
+
+def test_run_batch_writes_every_result(tmp_path):
+    src = _write_jobs(tmp_path / "in.jsonl", ["a", "b", "c", "d", "e"])
+    out = tmp_path / "out.jsonl"
+    stats = run_batch(src, out, ask=str.upper, concurrency=3)
+
+    assert (stats.total, stats.ok, stats.failed) == (5, 5, 0)
+    rows = {r["id"]: r for r in _rows(out)}
+    assert {k: r["response"] for k, r in rows.items()} == {
+        "q0": "A", "q1": "B", "q2": "C", "q3": "D", "q4": "E"}
+    assert all(r["latency_ms"] >= 0 for r in rows.values())
+
+
+def test_run_batch_bounds_concurrency(tmp_path):
+    src = _write_jobs(tmp_path / "in.jsonl", ["p"] * 12)
+    lock = threading.Lock()
+    active = peak = 0
+
+    def ask(prompt):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return prompt
+
+    run_batch(src, tmp_path / "out.jsonl", ask=ask, concurrency=3)
+    assert peak <= 3
+
+
+def test_run_batch_records_failures_and_retries_them_on_resume(tmp_path):
+    src = _write_jobs(tmp_path / "in.jsonl", ["ok", "boom", "ok"])
+    out = tmp_path / "out.jsonl"
+
+    def flaky(prompt):
+        if prompt == "boom":
+            raise RuntimeError("model not found")
+        return "fine"
+
+    first = run_batch(src, out, ask=flaky)
+    assert (first.ok, first.failed) == (2, 1)
+    assert completed_ids(out) == {"q0", "q2"}
+
+    calls = []
+    second = run_batch(src, out, ask=lambda p: calls.append(p) or "fine")
+    assert calls == ["boom"]  # only the failed prompt reran
+    assert (second.skipped, second.ok) == (2, 1)
+    assert completed_ids(out) == {"q0", "q1", "q2"}
+
+
+def test_resume_tolerates_torn_last_line(tmp_path):
+    src = _write_jobs(tmp_path / "in.jsonl", ["a", "b"])
+    out = tmp_path / "out.jsonl"
+    out.write_text('{"id": "q0", "response": "A", "latency_ms": 1}\n{"id": "q1", "resp')
+
+    run_batch(src, out, ask=str.upper)
+    last = json.loads(out.read_text().splitlines()[-1])
+    assert (last["id"], last["response"]) == ("q1", "B")
+    assert completed_ids(out) == {"q0", "q1"}
+
+
+def test_agent_asker_reuses_pooled_agent_and_resets_between_prompts():
+    agent = MagicMock()
+    agent.shared = False
+    agent.run.side_effect = lambda prompt, stream: MagicMock(content=f"re: {prompt}")
+    factory = MagicMock(return_value=agent)
+
+    ask = agent_asker(backend="ollama", concurrency=2, factory=factory)
+    assert ask("one") == "re: one"
+    assert ask("two") == "re: two"
+    factory.assert_called_once()
+    assert agent.reset.call_count == 2
+
+
+def test_agent_asker_runs_shared_scheduler_prompts_without_history():
+    from timmy.backends import TimmyAirLLMAgent
+    from timmy.batching import BatchScheduler
+
+    agent = MagicMock(spec=TimmyAirLLMAgent)
+    seen = []
+
+    def run(prompt, stream=False, conversation=None):
+        seen.append(conversation)
+        conversation._remember(prompt, "ok")
+        return MagicMock(content="ok")
+
+    agent.run.side_effect = run
+    scheduler = BatchScheduler(agent, max_wait_ms=1)
+
+    ask = agent_asker(backend="airllm", concurrency=2, factory=MagicMock(return_value=scheduler))
+    assert ask("one") == "ok"
+    assert ask("two") == "ok"
+    assert seen[0] is not seen[1]
+    assert seen[1]._history == ["User: two", "Timmy: ok"]
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def test_cli_batch_runs_and_resumes(tmp_path):
+    src = _write_jobs(tmp_path / "in.jsonl", ["a", "b", "c"])
+    out = tmp_path / "out.jsonl"
+    agent = MagicMock()
+    agent.run.side_effect = lambda prompt, stream: MagicMock(content="ok")
+
+    with patch("timmy.agent.create_timmy", return_value=agent) as factory:
+        result = runner.invoke(app, ["batch", str(src), "--out", str(out), "-c", "2",
+                                     "--backend", "ollama"])
+        assert result.exit_code == 0, result.output
+        assert "3 answered, 0 failed" in result.output
+        factory.assert_called()
+        assert len(_rows(out)) == 3
+
+        again = runner.invoke(app, ["batch", str(src), "--out", str(out)])
+        assert again.exit_code == 0, again.output
+        assert "Nothing to do" in again.output
+        assert len(_rows(out)) == 3
+
+
+def test_cli_batch_missing_input(tmp_path):
+    result = runner.invoke(app, ["batch", str(tmp_path / "nope.jsonl"), "-o", "x.jsonl"])
+    assert result.exit_code == 1
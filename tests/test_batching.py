@@ -0,0 +1,368 @@
+"""Tests for src/timmy/batching.py — micro-batched AirLLM generation."""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from timmy.backends import RunResult
+from timmy.batching import BatchScheduler
+
+
+def _fake_agent():
+    """Agent double whose run / run_batch record how they were called."""
+    agent = MagicMock()
+    agent.run.side_effect = lambda message, stream=False, conversation=None: (
+        iter([RunResult(content="a"), RunResult(content="b")])
+        if stream else RunResult(content=f"single:{message}")
+    )
+    agent.run_batch.side_effect = _fake_run_batch
+    return agent
+
+
+def _fake_run_batch(turns):
+    results = []
+    for turn in turns:
+        if turn.on_text is not None:
+            turn.on_text("batched:")
+            turn.on_text(turn.message)
+        results.append(RunResult(content=f"batched:{turn.message}"))
+    return results
+
+
+# ── Scheduler ────────────────────────────────────────────────────────────────
+
+def test_lone_request_uses_plain_run():
+    agent = _fake_agent()
+    scheduler = BatchScheduler(agent, max_batch_size=4, max_wait_ms=1)
+    assert scheduler.run("hi").content == "single:hi"
+    agent.run_batch.assert_not_called()
+
+
+def _blocking_agent(started: threading.Event, gate: threading.Event):
+    """Agent whose plain run() holds the scheduler thread until `gate` opens."""
+    agent = _fake_agent()
+
+    def run(message, stream=False, conversation=None):
+        started.set()
+        gate.wait(2)
+        return RunResult(content=f"single:{message}")
+
+    agent.run.side_effect = run
+    return agent
+
+
+def test_concurrent_requests_share_one_generate():
+    started, gate = threading.Event(), threading.Event()
+    # Hold the worker on the first request so the rest pile up together.
+    agent = _blocking_agent(started, gate)
+    scheduler = BatchScheduler(agent, max_batch_size=3, max_wait_ms=200)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(scheduler.run, "q0")
+        started.wait(2)
+        rest = [pool.submit(scheduler.run, f"q{i}") for i in range(1, 4)]
+        gate.set()
+        results = [first.result(2).content] + [f.result(2).content for f in rest]
+
+    assert results[0] == "single:q0"
+    assert sorted(results[1:]) == ["batched:q1", "batched:q2", "batched:q3"]
+    agent.run_batch.assert_called_once()
+    assert scheduler.stats()["largest_batch"] == 3
+
+
+def test_batch_respects_max_batch_size():
+    started, gate = threading.Event(), threading.Event()
+    agent = _blocking_agent(started, gate)
+    scheduler = BatchScheduler(agent, max_batch_size=2, max_wait_ms=200)
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        first = pool.submit(scheduler.run, "q0")
+        started.wait(2)
+        rest = [pool.submit(scheduler.run, f"q{i}") for i in range(1, 5)]
+        gate.set()
+        first.result(2)
+        for f in rest:
+            f.result(2)
+
+    assert all(len(c.args[0]) <= 2 for c in agent.run_batch.call_args_list)
+
+
+def test_batch_error_reaches_every_caller():
+    agent = _fake_agent()
+    agent.run_batch.side_effect = RuntimeError("OOM")
+    scheduler = BatchScheduler(agent)
+    from timmy.batching import _Job
+    jobs = [_Job("a"), _Job("b")]
+    scheduler._run_batch(jobs)
+    for job in jobs:
+        with pytest.raises(RuntimeError, match="OOM"):
+            job.future.result()
+
+
+def test_lone_stream_uses_plain_run():
+    agent = _fake_agent()
+    scheduler = BatchScheduler(agent, max_batch_size=4, max_wait_ms=1)
+    chunks = [c.content for c in scheduler.run("s", stream=True)]
+    assert chunks == ["a", "b"]
+    agent.run_batch.assert_not_called()
+
+
+def test_concurrent_streams_share_one_generate():
+    started, gate = threading.Event(), threading.Event()
+    agent = _blocking_agent(started, gate)
+    scheduler = BatchScheduler(agent, max_batch_size=4, max_wait_ms=200)
+
+    def stream(message):
+        return "".join(c.content for c in scheduler.run(message, stream=True))
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(scheduler.run, "q0")
+        started.wait(2)
+        streams = [pool.submit(stream, m) for m in ("s1", "s2")]
+        gate.set()
+        first.result(2)
+        assert sorted(f.result(2) for f in streams) == ["batched:s1", "batched:s2"]
+
+    agent.run_batch.assert_called_once()
+    turns = agent.run_batch.call_args.args[0]
+    assert sorted(t.message for t in turns) == ["s1", "s2"]
+    assert all(t.on_text is not None for t in turns)
+
+
+def test_abandoned_stream_drops_out_of_the_batch():
+    from timmy.batching import _Job
+
+    agent = _fake_agent()
+    scheduler = BatchScheduler(agent)
+    jobs = [_Job("a", stream=True, chunks=queue.Queue()), _Job("b")]
+    jobs[0].cancel.set()
+    agent.run_batch.side_effect = lambda turns: [
+        RunResult(content="") if t.cancelled else RunResult(content="ok") for t in turns
+    ]
+    scheduler._run_batch(jobs)
+    assert jobs[1].future.result().content == "ok"
+
+
+def test_abandoned_stream_job_is_skipped():
+    from timmy.batching import _Job
+
+    agent = _fake_agent()
+    scheduler = BatchScheduler(agent, max_batch_size=4, max_wait_ms=1)
+    job = _Job("s", stream=True, chunks=queue.Queue())
+    job.cancel.set()  # consumer left while the job was still queued
+    scheduler._run_stream(job)
+    agent.run.assert_not_called()
+    assert job.chunks.empty()
+
+
+def test_scheduler_delegates_attributes_to_agent():
+    agent = _fake_agent()
+    agent._history = ["User: hi"]
+    scheduler = BatchScheduler(agent)
+    assert scheduler._history == ["User: hi"]
+
+
+# ── TimmyAirLLMAgent.run_batch ───────────────────────────────────────────────
+
+def test_run_batch_pads_left_and_splits_rows():
+    with patch("timmy.backends.is_apple_silicon", return_value=False):
+        from timmy.backends import TimmyAirLLMAgent
+        agent = TimmyAirLLMAgent(model_size="8b")
+
+    model = MagicMock()
+    ids = MagicMock()
+    ids.shape = [2, 4]
+    model.tokenizer.return_value = {"input_ids": ids}
+    model.tokenizer.pad_token = None
+    model.generate.return_value = [[0, 0, 0, 0, 11], [0, 0, 0, 0, 22]]
+    model.tokenizer.decode.side_effect = lambda tokens, **kw: f"reply{tokens[0]}"
+    agent._model = model
+
+    results = agent.run_batch(["first", "second"])
+
+    assert [r.content for r in results] == ["reply11", "reply22"]
+    assert model.tokenizer.padding_side == "left"
+    assert model.tokenizer.pad_token is model.tokenizer.eos_token
+    assert len(model.tokenizer.call_args.args[0]) == 2
+    model.generate.assert_called_once()
+    assert agent._history == [
+        "User: first", "Timmy: reply11", "User: second", "Timmy: reply22",
+    ]
+
+
+def test_run_batch_streams_each_row_its_own_text():
+    from timmy.backends import BatchTurn
+
+    with patch("timmy.backends.is_apple_silicon", return_value=False):
+        from timmy.backends import TimmyAirLLMAgent
+        agent = TimmyAirLLMAgent(model_size="8b")
+
+    model = MagicMock()
+    ids = MagicMock()
+    ids.shape = [2, 4]
+    model.tokenizer.return_value = {"input_ids": ids}
+    # Token n decodes to the n-th letter; 0 is padding.
+    model.tokenizer.decode.side_effect = lambda tokens, **kw: "".join(
+        chr(96 + t) for t in tokens if t)
+
+    def generate(streamer, stopping_criteria, **kwargs):
+        streamer.put([[0, 0, 0, 0], [0, 0, 0, 0]])  # the prompt
+        streamer.put([1, 2])
+        streamer.put([3, 0])
+        return [[0, 0, 0, 0, 1, 3], [0, 0, 0, 0, 2, 0]]
+
+    model.generate.side_effect = generate
+    agent._model = model
+    seen = {"x": [], "y": []}
+    turns = [BatchTurn("x", on_text=seen["x"].append, cancel=threading.Event()),
+             BatchTurn("y", on_text=seen["y"].append, cancel=threading.Event())]
+
+    results = agent.run_batch(turns)
+
+    assert seen == {"x": ["a", "c"], "y": ["b"]}
+    assert [r.content for r in results] == ["ac", "b"]
+
+
+def test_run_batch_drops_cancelled_rows():
+    from timmy.backends import BatchTurn, _StopWhenAllCancelled
+
+    with patch("timmy.backends.is_apple_silicon", return_value=False):
+        from timmy.backends import TimmyAirLLMAgent
+        agent = TimmyAirLLMAgent(model_size="8b")
+
+    model = MagicMock()
+    ids = MagicMock()
+    ids.shape = [2, 4]
+    model.tokenizer.return_value = {"input_ids": ids}
+    model.tokenizer.decode.side_effect = lambda tokens, **kw: "".join(
+        chr(96 + t) for t in tokens if t)
+    model.generate.return_value = [[0, 0, 0, 0, 1], [0, 0, 0, 0, 2]]
+    agent._model = model
+    left = threading.Event()
+    left.set()
+    seen = []
+    turns = [BatchTurn("x", on_text=seen.append, cancel=left),
+             BatchTurn("y", cancel=threading.Event())]
+
+    results = agent.run_batch(turns)
+
+    assert seen == []
+    assert [r.content for r in results] == ["", "b"]
+    assert agent._history == ["User: y", "Timmy: b"]
+    stop = _StopWhenAllCancelled(turns)
+    assert not stop(None, None)
+    turns[1].cancel.set()
+    assert stop(None, None)
+
+
+def test_batched_sessions_keep_their_own_history():
+    from timmy.backends import BatchTurn
+
+    with patch("timmy.backends.is_apple_silicon", return_value=False):
+        from timmy.backends import TimmyAirLLMAgent
+        agent = TimmyAirLLMAgent(model_size="8b")
+
+    model = MagicMock()
+    ids = MagicMock()
+    ids.shape = [2, 4]
+    model.tokenizer.return_value = {"input_ids": ids}
+    model.tokenizer.decode.side_effect = lambda tokens, **kw: f"reply{tokens[0]}"
+    model.generate.return_value = [[0, 0, 0, 0, 1], [0, 0, 0, 0, 2]]
+    agent._model = model
+    scheduler = BatchScheduler(agent)
+    alice, bob = scheduler.conversation("a" * 32), scheduler.conversation("b" * 32)
+    alice.restore([("my cat is Tom", "noted")])
+    bob.restore([("my dog is Rex", "noted")])
+
+    agent.run_batch([BatchTurn("pet?", conversation=alice), BatchTurn("pet?", conversation=bob)])
+
+    prompts = model.tokenizer.call_args.args[0]
+    assert "Tom" in prompts[0] and "Rex" not in prompts[0]
+    assert "Rex" in prompts[1] and "Tom" not in prompts[1]
+    assert alice._history[-2:] == ["User: pet?", "Timmy: reply1"]
+    assert bob._history[-2:] == ["User: pet?", "Timmy: reply2"]
+    assert agent._history == [] and agent.turns == 0
+
+
+def test_conversations_are_per_session_and_bounded():
+    from timmy import batching
+
+    scheduler = BatchScheduler(_fake_agent())
+    first = scheduler.conversation("a" * 32)
+    assert scheduler.conversation("a" * 32) is first
+    assert scheduler.conversation(None) is not scheduler.conversation(None)
+    with patch.object(batching, "_MAX_CONVERSATIONS", 2):
+        scheduler.conversation("b" * 32)
+        scheduler.conversation("c" * 32)
+    assert scheduler.conversation("a" * 32) is not first
+
+
+def test_conversation_runs_carry_it_to_the_agent():
+    agent = _fake_agent()
+    scheduler = BatchScheduler(agent, max_wait_ms=1)
+    mine = scheduler.conversation("a" * 32)
+    assert mine.run("hi").content == "single:hi"
+    assert agent.run.call_args.kwargs["conversation"] is mine
+
+
+# ── Wiring ───────────────────────────────────────────────────────────────────
+
+def test_create_timmy_wraps_airllm_when_batching_enabled():
+    with patch("timmy.backends.is_apple_silicon", return_value=False), \
+         patch("timmy.agent.settings.airllm_max_batch_size", 4):
+        from timmy.agent import create_timmy
+        agent = create_timmy(backend="airllm", model_size="8b")
+    assert isinstance(agent, BatchScheduler)
+
+
+def test_pool_shares_scheduler_between_concurrent_callers():
+    from timmy.pool import AgentPool
+    scheduler = BatchScheduler(_fake_agent())
+    pool = AgentPool()
+    factory = MagicMock(return_value=scheduler)
+
+    first = pool.checkout(backend="airllm", factory=factory)
+    second = pool.checkout(backend="airllm", factory=factory)   # would time out if leased
+
+    assert first is second is scheduler
+    factory.assert_called_once()
+
+
+def test_dashboard_chat_turns_batch_together():
+    """The dashboard streams every turn (to honour disconnects) — they still batch."""
+    import dashboard.routes.agents as agents_routes
+    from dashboard.sessions import session_store
+    from timmy.pool import AgentPool
+
+    from timmy.backends import TimmyAirLLMAgent
+
+    started, gate = threading.Event(), threading.Event()
+    agent = MagicMock(spec=TimmyAirLLMAgent)
+    agent.run_batch.side_effect = _fake_run_batch
+
+    def run(message, stream=False, conversation=None):
+        started.set()
+        gate.wait(2)
+        return iter([RunResult(content=f"single:{message}")])
+
+    agent.run.side_effect = run
+    scheduler = BatchScheduler(agent, max_batch_size=4, max_wait_ms=200)
+    pool = AgentPool()
+    sessions = [session_store.get(c * 32) for c in "abc"]
+
+    with patch("timmy.pool.agent_pool", pool), \
+         patch.object(pool, "key_for", return_value=("airllm", "", "8b", "timmy.db")), \
+         patch.object(agents_routes, "create_timmy", lambda **kw: scheduler), \
+         ThreadPoolExecutor(max_workers=3) as workers:
+        ask = lambda i: agents_routes._ask_timmy(f"q{i}", sessions[i], threading.Event())
+        first = workers.submit(ask, 0)
+        started.wait(2)
+        rest = [workers.submit(ask, i) for i in (1, 2)]
+        gate.set()
+        assert first.result(2) == "single:q0"
+        assert sorted(f.result(2) for f in rest) == ["batched:q1", "batched:q2"]
+
+    agent.run_batch.assert_called_once()
@@ -0,0 +1,141 @@
+"""Tests for src/timmy/bench.py, timmy/fake_ollama.py and `timmy bench`."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from typer.testing import CliRunner
+
+from timmy.bench import AgentTarget, HttpTarget, Sample, measure, percentile, run_bench
+from timmy.cli import app
+from timmy.fake_ollama import FakeOllama
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def fake_ollama():
+    with FakeOllama(reply="one two three four", token_delay=0.002) as fake:
+        yield fake
+
+
+# ── stats helpers ────────────────────────────────────────────────────────────
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) is None
+
+
+def test_sample_decode_rate_excludes_first_token():
+    sample = Sample("p", latency_ms=1100, ttft_ms=100, tokens=11)
+    assert sample.tokens_per_sec == pytest.approx(10.0)
+    assert Sample("p", latency_ms=5, ttft_ms=5, tokens=1).tokens_per_sec is None
+
+
+def test_measure_records_error_without_raising():
+    def broken(prompt):
+        yield "partial"
+        raise RuntimeError("connection reset")
+
+    sample = measure(broken, "hi")
+    assert sample.error == "connection reset"
+    assert sample.tokens == 1
+    assert sample.ttft_ms is not None
+
+
+# ── fake Ollama ──────────────────────────────────────────────────────────────
+
+def test_fake_ollama_streams_chat_chunks(fake_ollama):
+    with httpx.stream("POST", f"{fake_ollama.url}/api/chat",
+                      json={"model": "llama3.2", "messages": []}) as r:
+        chunks = [json.loads(line) for line in r.iter_lines() if line]
+    text = "".join(c["message"]["content"] for c in chunks)
+    assert text == "one two three four"
+    assert chunks[-1]["done"] is True
+    assert chunks[-1]["eval_count"] == 4
+
+
+def test_fake_ollama_preload_request(fake_ollama):
+    r = httpx.post(f"{fake_ollama.url}/api/generate", json={"model": "llama3.2"})
+    assert r.json()["done"] is True
+    assert httpx.get(fake_ollama.url).text == "Ollama is running"
+
+
+# ── runner ───────────────────────────────────────────────────────────────────
+
+def test_run_bench_against_fake_ollama(fake_ollama):
+    target = HttpTarget(fake_ollama.url, "llama3.2")
+    try:
+        report = run_bench(target, prompts=["a", "b", "c"], concurrency=2, rounds=2)
+    finally:
+        target.close()
+
+    summary = report.summary()
+    assert summary["requests"] == 6
+    assert summary["errors"] == 0
+    assert summary["tokens"] == 24
+    assert summary["ttft_ms"]["p50"] is not None
+    assert summary["latency_ms"]["p99"] >= summary["latency_ms"]["p50"]
+    assert summary["tokens_per_sec"] > 0
+    assert summary["warmup_ms"] is not None
+    # 6 measured requests + 1 warm-up reached the server
+    assert len([p for p, _ in fake_ollama.requests if p == "/api/chat"]) == 7
+
+
+def test_run_bench_reports_unreachable_host_as_errors():
+    target = HttpTarget("http://127.0.0.1:9", "llama3.2", timeout=1)
+    report = run_bench(target, prompts=["a"], warmup=False)
+    target.close()
+    assert report.summary()["errors"] == 1
+
+
+def test_agent_target_streams_pooled_agent_chunks():
+    agent = MagicMock()
+    agent.run.return_value = iter([MagicMock(content="Sir"), MagicMock(content=", yes.")])
+    target = AgentTarget(backend="ollama", factory=MagicMock(return_value=agent))
+    assert list(target("hi")) == ["Sir", ", yes."]
+    agent.run.assert_called_once_with("hi", stream=True)
+
+
+def test_agent_target_runs_each_prompt_without_earlier_ones():
+    agent = MagicMock(shared=False)
+    agent.run.side_effect = lambda prompt, stream: iter([MagicMock(content=prompt)])
+    target = AgentTarget(backend="ollama", factory=MagicMock(return_value=agent))
+    for prompt in ("one", "two", "three"):
+        list(target(prompt))
+    assert agent.reset.call_count == 3
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def test_cli_bench_fake_writes_json(tmp_path):
+    out = tmp_path / "bench.json"
+    with patch("timmy.bench.BENCH_PROMPTS", ["one", "two"]):
+        result = runner.invoke(app, ["bench", "--fake", "-c", "2", "-o", str(out)])
+
+    assert result.exit_code == 0, result.output
+    assert "TTFT ms" in result.output
+    data = json.loads(out.read_text())
+    assert data["config"]["target"] == "ollama-http"
+    assert data["config"]["fake"] is True
+    assert data["config"]["concurrency"] == 2
+    assert data["summary"]["requests"] == 2
+    assert data["summary"]["errors"] == 0
+    assert set(data["summary"]["latency_ms"]) == {"p50", "p95", "p99"}
+
+
+def test_cli_bench_agent_uses_create_timmy():
+    agent = MagicMock()
+    agent.run.side_effect = lambda prompt, stream: iter([MagicMock(content="ok")])
+    with patch("timmy.agent.create_timmy", return_value=agent) as factory, \
+         patch("timmy.bench.BENCH_PROMPTS", ["one"]):
+        result = runner.invoke(app, ["bench", "--backend", "ollama"])
+
+    assert result.exit_code == 0, result.output
+    factory.assert_called_once()
+    assert "Requests: 1 (0 failed)" in result.output
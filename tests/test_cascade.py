@@ -0,0 +1,140 @@
+"""Tests for src/timmy/cascade.py — small/large model cascade routing."""
+
+import logging
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from timmy.cascade import LARGE, SMALL, CascadeRouter, classify
+from timmy.pool import AgentPool
+
+
+# ── classifier ───────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("prompt", [
+    "status?",
+    "what can you do",
+    "hi there",
+    "thanks!",
+    "What is the capital of France?",
+])
+def test_easy_prompts_go_small(prompt):
+    assert classify(prompt).tier == SMALL
+
+
+@pytest.mark.parametrize("prompt", [
+    "Explain step by step why proof of work resists Sybil attacks.",
+    "Compare Lightning and Liquid and analyse the trade-offs for merchants.",
+    "Implement a function that parses BOLT11 invoices and debug this regex.",
+    " ".join(["word"] * 60),
+])
+def test_hard_prompts_go_large(prompt):
+    assert classify(prompt).tier == LARGE
+
+
+def test_nlu_command_intent_overrides_keywords():
+    decision = classify("explain the swarm status")
+    assert decision.tier == SMALL
+    assert decision.reasons[0].startswith("intent=")
+
+
+def test_threshold_is_tunable():
+    prompt = "Why is the sky blue?"
+    assert classify(prompt, threshold=0.9).tier == SMALL
+    assert classify(prompt, threshold=0.1).tier == LARGE
+
+
+# ── router ───────────────────────────────────────────────────────────────────
+
+def _router(threshold=0.5):
+    agents = {}
+
+    def factory(db_file, backend, model_size):
+        agent = MagicMock()
+        agent.shared = False
+        agent.run.side_effect = lambda message, stream=False: (
+            iter([MagicMock(content=backend)]) if stream else MagicMock(content=backend))
+        agents[backend] = agent
+        return agent
+
+    router = CascadeRouter(small=("ollama", None), large=("airllm", "70b"),
+                           threshold=threshold, factory=factory, pool=AgentPool())
+    return router, agents
+
+
+def test_router_sends_each_prompt_to_its_tier():
+    router, agents = _router()
+    assert router.run("status?").content == "ollama"
+    assert router.run("Explain in detail how to design a multisig backup plan.").content == "airllm"
+    stats = router.stats()
+    assert stats[SMALL]["requests"] == 1
+    assert stats[LARGE]["requests"] == 1
+    assert stats[LARGE]["model_size"] == "70b"
+    assert stats[SMALL]["mean_ms"] is not None
+
+
+def test_router_streams_and_times_the_tier():
+    router, _ = _router()
+    chunks = list(router.run("hello", stream=True))
+    assert [c.content for c in chunks] == ["ollama"]
+    assert router.stats()[SMALL]["requests"] == 1
+
+
+def test_reset_only_touches_tiers_already_loaded():
+    router, agents = _router()
+    router.run("hi")
+    router.reset()
+    agents["ollama"].reset.assert_called_once()
+    assert "airllm" not in agents
+
+
+def test_session_binding_wraps_each_tier_turn():
+    router, agents = _router()
+    seen = []
+
+    @contextmanager
+    def sync(agent):
+        seen.append(agent)
+        yield agent
+
+    bound = router.for_session(sync)
+    assert bound.run("status?").content == "ollama"
+    assert [c.content for c in bound.run("Explain in detail why.", stream=True)] == ["airllm"]
+    assert seen == [agents["ollama"], agents["airllm"]]
+    assert bound.stats() == router.stats()
+
+
+def test_router_counts_tier_errors():
+    router, _ = _router()
+    router._factory = MagicMock(side_effect=ConnectionError("refused"))
+    with pytest.raises(ConnectionError):
+        router.run("hi")
+    assert router.stats()[SMALL]["errors"] == 1
+
+
+def test_router_logs_decision_and_latency(caplog):
+    router, _ = _router()
+    with caplog.at_level(logging.INFO, logger="timmy.cascade"):
+        router.run("status?")
+    text = caplog.text
+    assert "small tier (ollama) score=0.00 [intent=status]" in text
+    assert "small tier answered in" in text
+
+
+def test_create_timmy_cascade_backend_returns_router():
+    with patch("timmy.agent.settings") as mock_settings, \
+         patch("timmy.cascade.settings") as cascade_settings:
+        mock_settings.airllm_model_size = "405b"
+        cascade_settings.cascade_small_tier = "8b"
+        cascade_settings.airllm_model_size = "405b"
+        cascade_settings.cascade_threshold = 0.6
+        cascade_settings.cascade_max_easy_words = 30
+
+        from timmy.agent import create_timmy
+        router = create_timmy(backend="cascade")
+
+    assert isinstance(router, CascadeRouter)
+    assert router.tiers == {SMALL: ("airllm", "8b"), LARGE: ("airllm", "405b")}
+    assert router.threshold == 0.6
+    assert router.shared is True
@@ -0,0 +1,57 @@
+"""Import-time budget for `timmy --help`.
+
+Runs the CLI in a fresh interpreter under ``python -X importtime`` and
+sums the cumulative time of every top-level import.  Agno alone costs
+most of a second, so an accidental module-level import of timmy.agent
+(or config / httpx) in timmy.cli blows the budget.
+
+Override the budget on slow CI machines with TIMMY_HELP_IMPORT_BUDGET_MS.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+BUDGET_MS = float(os.environ.get("TIMMY_HELP_IMPORT_BUDGET_MS", "500"))
+
+# Modules `timmy --help` must never pull in.
+_HEAVY = ("agno", "pydantic_settings", "httpx", "timmy.agent", "timmy.backends", "airllm")
+
+
+def _help_imports() -> tuple[subprocess.CompletedProcess, float, set[str]]:
+    """Run `timmy --help` under -X importtime; return (process, top-level ms, modules)."""
+    code = "import sys; sys.argv = ['timmy', '--help']; from timmy.cli import main; main()"
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, timeout=60,
+    )
+    total_us = 0
+    modules: set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        if not name.startswith("  "):  # nested imports are indented further
+            total_us += int(cumulative)
+    return proc, total_us / 1000, modules
+
+
+def test_help_skips_heavy_imports():
+    proc, _, modules = _help_imports()
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert "Usage" in proc.stdout
+    heavy = sorted(m for m in modules if m in _HEAVY or m.split(".")[0] in _HEAVY)
+    assert not heavy, f"`timmy --help` imported heavy modules: {heavy[:10]}"
+
+
+def test_help_import_time_within_budget():
+    proc, total_ms, _ = _help_imports()
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert total_ms <= BUDGET_MS, (
+        f"`timmy --help` spent {total_ms:.0f} ms importing modules "
+        f"(budget {BUDGET_MS:.0f} ms) — move heavy imports into the commands"
+    )
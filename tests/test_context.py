@@ -0,0 +1,139 @@
+"""Tests for src/timmy/context.py — token-budgeted conversation history."""
+
+from unittest.mock import MagicMock, patch
+
+from timmy.context import ContextWindow, approx_tokens, extractive_summary, token_counter
+
+
+def _words(text: str) -> int:
+    """Deterministic counter: one token per whitespace-separated word."""
+    return len(text.split())
+
+
+# ── counters ─────────────────────────────────────────────────────────────────
+
+def test_approx_tokens_rounds_up():
+    assert approx_tokens("") == 0
+    assert approx_tokens("abcde") == 2
+
+
+def test_token_counter_uses_tokenizer_encode():
+    tokenizer = MagicMock()
+    tokenizer.encode.return_value = [1, 2, 3]
+    assert token_counter(tokenizer)("anything") == 3
+    tokenizer.encode.assert_called_once_with("anything", add_special_tokens=False)
+
+
+def test_token_counter_falls_back_when_encode_is_unusable():
+    # A mocked tokenizer returns a MagicMock, not a list of IDs.
+    assert token_counter(MagicMock())("abcdefgh") == 2
+    assert token_counter(None)("abcdefgh") == 2
+
+
+# ── ContextWindow ────────────────────────────────────────────────────────────
+
+def test_render_empty_window_is_blank():
+    assert ContextWindow().render() == ""
+
+
+def test_render_keeps_everything_under_budget():
+    window = ContextWindow(budget_tokens=100, count_tokens=_words)
+    window.add_exchange("hello there", "Sir, affirmative.")
+    assert window.render() == "User: hello there\nTimmy: Sir, affirmative.\n\n"
+    assert window.folds == 0
+
+
+def test_render_folds_oldest_turns_into_summary():
+    window = ContextWindow(budget_tokens=40, summary_tokens=10, count_tokens=_words)
+    for i in range(10):
+        window.add_exchange(f"question number {i}", f"answer number {i}. More detail here.")
+    rendered = window.render()
+
+    assert window.folds == 1
+    assert _words(rendered) <= 40 + 5  # + section header words
+    assert "Earlier in this conversation:" in rendered
+    # Newest exchange is verbatim; the oldest survives only as summary.
+    assert "Timmy: answer number 9. More detail here." in rendered
+    assert "User: question number 0" not in rendered.split("\n\n")[-2]
+
+
+def test_reserve_shrinks_history_not_the_new_message():
+    window = ContextWindow(budget_tokens=20, summary_tokens=0, count_tokens=_words)
+    for i in range(4):
+        window.add_exchange(f"q{i} one two", f"a{i} one two")
+    assert _words(window.render(reserve=15)) <= 5
+
+
+def test_fold_hysteresis_keeps_prefix_stable():
+    window = ContextWindow(budget_tokens=40, summary_tokens=8, count_tokens=_words)
+    for i in range(8):
+        window.add_exchange(f"q{i} one two", f"a{i} one two")
+    first = window.render()
+    assert window.folds == 1
+
+    # Folding overshoots to half the budget, so the next turn fits without
+    # touching the summary or the lines already rendered.
+    window.add_exchange("q8 one two", "a8 one two")
+    second = window.render()
+    assert window.folds == 1
+    assert second.startswith(first.rstrip("\n"))
+
+
+def test_custom_summarizer_is_called_once_per_fold():
+    summarize = MagicMock(return_value="the gist")
+    window = ContextWindow(budget_tokens=10, summary_tokens=4,
+                           count_tokens=_words, summarize=summarize)
+    for i in range(4):
+        window.add_exchange(f"q{i} a b", f"a{i} a b")
+    window.render()
+    window.render()
+    assert summarize.call_count == 1
+    assert window.summary == "the gist"
+
+
+def test_clear_drops_lines_and_summary():
+    window = ContextWindow(budget_tokens=10, summary_tokens=4, count_tokens=_words)
+    for i in range(4):
+        window.add_exchange(f"q{i} a b", f"a{i} a b")
+    window.render()
+    window.clear()
+    assert window.render() == ""
+    assert window.stats()["tokens"] == 0
+
+
+def test_extractive_summary_drops_oldest_over_limit():
+    summary = extractive_summary(
+        "User: old", ["Timmy: First sentence. Second sentence."], 3, _words
+    )
+    assert summary == "Timmy: First sentence."
+
+
+# ── AirLLM integration ───────────────────────────────────────────────────────
+
+def _make_agent():
+    with patch("timmy.backends.is_apple_silicon", return_value=False):
+        from timmy.backends import TimmyAirLLMAgent
+        return TimmyAirLLMAgent(model_size="8b")
+
+
+def test_airllm_prompt_always_ends_with_new_message():
+    with patch("timmy.backends.settings.context_budget_tokens", 200):
+        agent = _make_agent()
+    for i in range(50):
+        agent._remember(f"question {i} " + "x" * 200, "reply " + "y" * 200)
+    prompt = agent._build_prompt("the newest question")
+
+    assert prompt.endswith("User: the newest question\nTimmy:")
+    assert approx_tokens(prompt) < 600
+    assert "question 0 " not in prompt.split("Earlier in this conversation:")[-1]
+    assert len(agent._history) == 100
+    assert agent.turns == 50
+
+
+def test_airllm_transcript_is_capped():
+    agent = _make_agent()
+    for i in range(300):
+        agent._remember(f"q{i}", f"a{i}")
+    assert agent.turns == 300
+    assert len(agent._history) == 200
+    assert agent._history[-1] == "Timmy: a299"
@@ -0,0 +1,130 @@
+"""Tests for src/timmy/daemon.py — persistent AirLLM daemon and thin client."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from typer.testing import CliRunner
+
+from timmy.backends import RunResult
+from timmy.daemon import DaemonClient, TimmyDaemon, connect_daemon
+
+runner = CliRunner()
+
+
+class _EchoAgent:
+    """Stands in for TimmyAirLLMAgent: streams two chunks and keeps history."""
+
+    def __init__(self) -> None:
+        self.turns = 0
+
+    def run(self, message, *, stream=False):
+        self.turns += 1
+        return iter([RunResult(content="echo: "), RunResult(content=message)])
+
+    def reset(self):
+        self.turns = 0
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    """Start a daemon on a temp socket in a background thread."""
+    path = tmp_path / "t.sock"
+    daemon = TimmyDaemon(_EchoAgent(), model_size="8b", path=str(path))
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if path.exists():
+            break
+        time.sleep(0.01)
+    yield daemon
+    daemon.shutdown()
+    thread.join(timeout=2)
+
+
+# ── Client / server round-trip ───────────────────────────────────────────────
+
+def test_connect_returns_none_without_socket(tmp_path):
+    assert connect_daemon(str(tmp_path / "missing.sock")) is None
+
+
+def test_connect_reports_model_size(running_daemon):
+    client = connect_daemon(str(running_daemon.path))
+    assert isinstance(client, DaemonClient)
+    assert client.model_size == "8b"
+
+
+def test_run_returns_full_content(running_daemon):
+    client = connect_daemon(str(running_daemon.path))
+    result = client.run("hello")
+    assert result.content == "echo: hello"
+
+
+def test_run_stream_yields_chunks(running_daemon):
+    client = connect_daemon(str(running_daemon.path))
+    chunks = [c.content for c in client.run("hi", stream=True)]
+    assert chunks == ["echo: ", "hi"]
+
+
+def test_history_spans_client_connections(running_daemon):
+    path = str(running_daemon.path)
+    connect_daemon(path).run("first")
+    connect_daemon(path).run("second")
+    assert connect_daemon(path).info["turns"] == 2
+
+
+def test_reset_clears_daemon_history(running_daemon):
+    path = str(running_daemon.path)
+    connect_daemon(path).run("first")
+    connect_daemon(path).reset()
+    assert connect_daemon(path).info["turns"] == 0
+
+
+def test_run_error_is_raised_on_client(running_daemon):
+    running_daemon.agent.run = MagicMock(side_effect=RuntimeError("layer load failed"))
+    client = connect_daemon(str(running_daemon.path))
+    with pytest.raises(RuntimeError, match="layer load failed"):
+        client.run("hello")
+
+
+def test_second_daemon_refuses_live_socket(running_daemon):
+    other = TimmyDaemon(_EchoAgent(), model_size="8b", path=str(running_daemon.path))
+    with pytest.raises(RuntimeError, match="already listening"):
+        other.serve_forever()
+
+
+# ── CLI auto-detection ───────────────────────────────────────────────────────
+
+def test_cli_uses_daemon_when_serving_airllm(running_daemon):
+    from timmy.cli import app
+
+    with patch("timmy.agent.create_timmy") as mock_create, \
+         patch("timmy.daemon.settings.timmy_daemon_socket", str(running_daemon.path)), \
+         patch("timmy.daemon.TimmyAirLLMAgent._render") as mock_render:
+        result = runner.invoke(app, ["chat", "ping", "--backend", "airllm", "--model-size", "8b"])
+
+    assert result.exit_code == 0
+    mock_create.assert_not_called()
+    mock_render.assert_called_once_with("echo: ping")
+
+
+def test_cli_falls_back_when_daemon_size_differs(running_daemon):
+    from timmy.cli import app
+
+    with patch("timmy.agent.create_timmy") as mock_create, \
+         patch("timmy.daemon.settings.timmy_daemon_socket", str(running_daemon.path)):
+        runner.invoke(app, ["chat", "ping", "--backend", "airllm", "--model-size", "70b"])
+
+    mock_create.assert_called_once_with(backend="airllm", model_size="70b")
+
+
+def test_cli_ollama_backend_never_probes_daemon():
+    from timmy.cli import app
+
+    with patch("timmy.agent.create_timmy") as mock_create, \
+         patch("timmy.daemon.connect_daemon") as mock_connect:
+        runner.invoke(app, ["chat", "ping", "--backend", "ollama"])
+
+    mock_connect.assert_not_called()
+    mock_create.assert_called_once()
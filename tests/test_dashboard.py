@@ -76,7 +76,7 @@ def test_chat_timmy_success(client):
     mock_agent = MagicMock()
     mock_run = MagicMock()
     mock_run.content = "I am Timmy, operational and sovereign."
-    mock_agent.run.return_value = mock_run
+    mock_agent.run.return_value = iter([mock_run])
 
     with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent):
         response = client.post("/agents/timmy/chat", data={"message": "status?"})
@@ -88,7 +88,7 @@ def test_chat_timmy_success(client):
 
 def test_chat_timmy_shows_user_message(client):
     mock_agent = MagicMock()
-    mock_agent.run.return_value = MagicMock(content="Acknowledged.")
+    mock_agent.run.return_value = iter([MagicMock(content="Acknowledged.")])
 
     with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent):
         response = client.post("/agents/timmy/chat", data={"message": "hello there"})
@@ -120,7 +120,7 @@ def test_history_empty_shows_init_message(client):
 
 def test_history_records_user_and_agent_messages(client):
     mock_agent = MagicMock()
-    mock_agent.run.return_value = MagicMock(content="I am operational.")
+    mock_agent.run.return_value = iter([MagicMock(content="I am operational.")])
 
     with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent):
         client.post("/agents/timmy/chat", data={"message": "status check"})
@@ -141,7 +141,7 @@ def test_history_records_error_when_offline(client):
 
 def test_history_clear_resets_to_init_message(client):
     mock_agent = MagicMock()
-    mock_agent.run.return_value = MagicMock(content="Acknowledged.")
+    mock_agent.run.return_value = iter([MagicMock(content="Acknowledged.")])
 
     with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent):
         client.post("/agents/timmy/chat", data={"message": "hello"})
@@ -153,7 +153,7 @@ def test_history_clear_resets_to_init_message(client):
 
 def test_history_empty_after_clear(client):
     mock_agent = MagicMock()
-    mock_agent.run.return_value = MagicMock(content="OK.")
+    mock_agent.run.return_value = iter([MagicMock(content="OK.")])
 
     with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent):
         client.post("/agents/timmy/chat", data={"message": "test"})
@@ -162,3 +162,81 @@ def test_history_empty_after_clear(client):
     response = client.get("/agents/timmy/history")
     assert "test" not in response.text
     assert "Mission Control initialized" in response.text
+
+
+# ── Streaming chat (SSE) ──────────────────────────────────────────────────────
+
+def _start_stream(client, message: str) -> str:
+    """POST a message and return the SSE url embedded in the partial."""
+    import re
+    response = client.post("/agents/timmy/chat/stream", data={"message": message})
+    assert response.status_code == 200
+    return re.search(r'data-stream="([^"]+)"', response.text).group(1)
+
+
+def test_chat_stream_partial_shows_user_message(client):
+    response = client.post("/agents/timmy/chat/stream", data={"message": "hi there"})
+    assert "hi there" in response.text
+    assert "data-stream=" in response.text
+
+
+def test_chat_stream_emits_token_events(client):
+    mock_agent = MagicMock()
+    mock_agent.run.return_value = iter([MagicMock(content="Sir, "), MagicMock(content="affirmative.")])
+
+    url = _start_stream(client, "status?")
+    with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent):
+        response = client.get(url)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: token\ndata: Sir, \n\n" in response.text
+    assert "event: token\ndata: affirmative.\n\n" in response.text
+    assert response.text.endswith("event: done\ndata: \n\n")
+    mock_agent.run.assert_called_once_with("status?", stream=True)
+
+
+def test_chat_stream_appends_final_message_to_history(client):
+    mock_agent = MagicMock()
+    mock_agent.run.return_value = iter([MagicMock(content="I am "), MagicMock(content="operational.")])
+
+    url = _start_stream(client, "status check")
+    with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent):
+        client.get(url)
+
+    response = client.get("/agents/timmy/history")
+    assert "status check" in response.text
+    assert "I am operational." in response.text
+
+
+def test_chat_stream_multiline_token_uses_multiple_data_lines(client):
+    mock_agent = MagicMock()
+    mock_agent.run.return_value = iter([MagicMock(content="line one\nline two")])
+
+    url = _start_stream(client, "poem")
+    with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent):
+        response = client.get(url)
+
+    assert "data: line one\ndata: line two\n\n" in response.text
+
+
+def test_chat_stream_error_event_when_offline(client):
+    url = _start_stream(client, "ping")
+    with patch("dashboard.routes.agents.create_timmy", side_effect=Exception("refused")):
+        response = client.get(url)
+
+    assert "event: error\ndata: Timmy is offline: refused" in response.text
+    assert "Timmy is offline" in client.get("/agents/timmy/history").text
+
+
+def test_chat_stream_unknown_id_returns_404(client):
+    assert client.get("/agents/timmy/stream/nope").status_code == 404
+
+
+def test_chat_stream_id_is_single_use(client):
+    mock_agent = MagicMock()
+    mock_agent.run.return_value = iter([MagicMock(content="OK.")])
+
+    url = _start_stream(client, "once")
+    with patch("dashboard.routes.agents.create_timmy", return_value=mock_agent):
+        client.get(url)
+        assert client.get(url).status_code == 404
@@ -0,0 +1,106 @@
+"""Tests for src/dashboard/disconnect.py and disconnect handling in the chat routes."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from dashboard.disconnect import ClientDisconnected, ClosingStreamingResponse, until_disconnected
+
+
+class _FakeRequest:
+    """Minimal stand-in for a Starlette Request: receive() yields given messages."""
+
+    def __init__(self, disconnect_after: float | None) -> None:
+        self._delay = disconnect_after
+
+    async def receive(self) -> dict:
+        if self._delay is None:
+            await asyncio.Event().wait()  # client stays connected
+        await asyncio.sleep(self._delay)
+        return {"type": "http.disconnect"}
+
+
+async def test_returns_result_while_client_connected():
+    async def work():
+        return "answer"
+
+    assert await until_disconnected(_FakeRequest(None), work()) == "answer"
+
+
+async def test_disconnect_cancels_work():
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(ClientDisconnected):
+        await until_disconnected(_FakeRequest(0.01), work())
+    assert cancelled.is_set()
+
+
+async def test_disconnect_sets_inference_cancel_event():
+    from timmy.inference import InferenceExecutor
+
+    executor = InferenceExecutor(workers=1, queue_size=0)
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def generate(cancel):
+        started.set()
+        if cancel.wait(5):
+            stopped.set()
+
+    with pytest.raises(ClientDisconnected):
+        await until_disconnected(
+            _FakeRequest(0.05), executor.run(generate, cancel=threading.Event())
+        )
+    assert await asyncio.to_thread(stopped.wait, 5)
+    assert started.is_set()
+
+
+async def test_stream_dropped_before_first_chunk_stops_generation():
+    from starlette.requests import ClientDisconnect
+
+    from timmy.inference import InferenceExecutor
+
+    executor = InferenceExecutor(workers=1, queue_size=0)
+    started = threading.Event()
+    closed = threading.Event()
+
+    def generate():
+        started.set()
+        try:
+            while True:
+                time.sleep(0.005)
+                yield "token"
+        finally:
+            closed.set()
+
+    async def send(message):
+        raise OSError("client went away")  # before the response even starts
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    stream = executor.stream(generate)
+    await asyncio.to_thread(started.wait, 5)
+    response = ClosingStreamingResponse(stream, on_close=stream.cancel)
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    assert await asyncio.to_thread(closed.wait, 5)
+
+
+def test_chat_route_still_answers_connected_client(client):
+    agent = MagicMock()
+    agent.run.return_value = iter([MagicMock(content="Sir, "), MagicMock(content="affirmative.")])
+    with patch("dashboard.routes.agents.create_timmy", return_value=agent):
+        response = client.post("/agents/timmy/chat", data={"message": "status?"})
+    assert response.status_code == 200
+    assert "Sir, affirmative." in response.text
@@ -0,0 +1,82 @@
+"""Tests for src/dashboard/fragments.py — cached message HTML and history ETags."""
+
+from unittest.mock import MagicMock, patch
+
+from dashboard.fragments import etag_matches, fragment, history_etag, render_message
+from dashboard.sessions import SessionStore
+from dashboard.store import Message
+
+
+def test_fragment_is_rendered_once_and_escaped():
+    message = Message("user", "<script>x</script>", "10:00", id=1)
+    with patch("dashboard.fragments.render_message", wraps=render_message) as render:
+        first = fragment(message)
+        assert fragment(message) is first
+    assert render.call_count == 1
+    assert "&lt;script&gt;" in first
+    assert "chat-message user" in first
+
+
+def test_session_log_renders_on_append():
+    store = SessionStore(render=render_message)
+    message = store.get("a" * 32).log.append("agent", "Aye, sir.", "10:00")
+    assert "Aye, sir." in message.html
+
+
+def test_etag_tracks_page_contents():
+    page = [Message("user", "a", "t", id=3), Message("agent", "b", "t", id=4)]
+    etag = history_etag(page, more=False)
+    assert history_etag(page + [Message("user", "c", "t", id=5)], more=False) != etag
+    assert history_etag(page, more=True) != etag
+    assert history_etag([], more=False) != etag
+
+
+def test_recreated_memory_only_session_never_reuses_an_etag():
+    store = SessionStore(max_live=1)  # no database
+    log = store.get("a" * 32).log
+    log.append("user", "hi", "t")
+    log.append("agent", "hello", "t")
+    etag = history_etag(log.page(), more=False)
+
+    store.get("b" * 32)  # evicts "a" and its history
+    log = store.get("a" * 32).log
+    assert log.all() == []
+    log.append("user", "other", "t")
+    log.append("agent", "reply", "t")
+    assert history_etag(log.page(), more=False) != etag
+
+
+def test_etag_matching_accepts_lists_and_weak_tags():
+    assert etag_matches('"x"', '"y", "x"')
+    assert etag_matches('"x"', 'W/"x"')
+    assert etag_matches('"x"', "*")
+    assert not etag_matches('"x"', "")
+
+
+# ── route ────────────────────────────────────────────────────────────────────
+
+def test_unchanged_history_returns_304(client):
+    agent = MagicMock()
+    agent.run.side_effect = lambda message, stream: iter([MagicMock(content="Aye.")])
+    first = client.get("/agents/timmy/history")
+    etag = first.headers["etag"]
+    assert client.get("/agents/timmy/history", headers={"If-None-Match": etag}).status_code == 304
+
+    with patch("dashboard.routes.agents.create_timmy", return_value=agent):
+        client.post("/agents/timmy/chat", data={"message": "status"})
+    changed = client.get("/agents/timmy/history", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert "status" in changed.text and "Aye." in changed.text
+
+
+def test_history_after_clear_is_not_revalidated_as_unchanged(client):
+    agent = MagicMock()
+    agent.run.side_effect = lambda message, stream: iter([MagicMock(content="Aye.")])
+    with patch("dashboard.routes.agents.create_timmy", return_value=agent):
+        client.post("/agents/timmy/chat", data={"message": "status"})
+    etag = client.get("/agents/timmy/history").headers["etag"]
+    client.delete("/agents/timmy/history")
+    response = client.get("/agents/timmy/history", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Mission Control initialized" in response.text
@@ -0,0 +1,265 @@
+"""Tests for src/timmy/inference.py — bounded inference executor."""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from timmy.inference import (
+    GenerationCancelled,
+    InferenceExecutor,
+    InferenceQueueFull,
+    until_cancelled,
+)
+
+
+# ── run() ────────────────────────────────────────────────────────────────────
+
+async def test_run_returns_result():
+    executor = InferenceExecutor(workers=1, queue_size=0)
+    assert await executor.run(lambda x: x * 2, 21) == 42
+
+
+async def test_run_propagates_exceptions():
+    executor = InferenceExecutor(workers=1, queue_size=0)
+
+    def boom():
+        raise RuntimeError("model crashed")
+
+    with pytest.raises(RuntimeError, match="model crashed"):
+        await executor.run(boom)
+    assert executor.stats()["running"] == 0
+
+
+async def test_run_does_not_block_event_loop():
+    """Other coroutines keep running while a blocking call is in flight."""
+    executor = InferenceExecutor(workers=1, queue_size=0)
+    release = threading.Event()
+    task = asyncio.create_task(executor.run(release.wait, 5))
+
+    await asyncio.sleep(0.01)
+    assert not task.done()     # still generating…
+    release.set()              # …yet this coroutine got to run
+    assert await task is True
+
+
+async def test_overflow_fails_fast():
+    executor = InferenceExecutor(workers=1, queue_size=1, retry_after=7)
+    release = threading.Event()
+    running = asyncio.create_task(executor.run(release.wait, 5))
+    waiting = asyncio.create_task(executor.run(release.wait, 5))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(InferenceQueueFull) as exc_info:
+        await executor.run(release.wait, 5)
+    assert exc_info.value.retry_after == 7
+
+    release.set()
+    await asyncio.gather(running, waiting)
+    assert executor.stats()["rejected"] == 1
+
+
+async def test_stats_report_queue_depth():
+    executor = InferenceExecutor(workers=1, queue_size=2)
+    release = threading.Event()
+    tasks = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    stats = executor.stats()
+    assert stats["running"] == 1
+    assert stats["queue_depth"] == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    stats = executor.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["completed"] == 3
+    assert stats["wait_ms_max"] >= stats["wait_ms_avg"] >= 0
+
+
+# ── stream() ─────────────────────────────────────────────────────────────────
+
+async def test_stream_yields_items_in_order():
+    executor = InferenceExecutor(workers=1, queue_size=0)
+    items = [item async for item in executor.stream(lambda: iter(["a", "b", "c"]))]
+    assert items == ["a", "b", "c"]
+
+
+async def test_stream_propagates_errors():
+    executor = InferenceExecutor(workers=1, queue_size=0)
+
+    def gen():
+        yield "partial"
+        raise RuntimeError("stream broke")
+
+    received = []
+    with pytest.raises(RuntimeError, match="stream broke"):
+        async for item in executor.stream(gen):
+            received.append(item)
+    assert received == ["partial"]
+
+
+async def test_stream_admission_is_eager():
+    executor = InferenceExecutor(workers=1, queue_size=0)
+    release = threading.Event()
+    busy = asyncio.create_task(executor.run(release.wait, 5))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(InferenceQueueFull):
+        executor.stream(lambda: iter(["never"]))
+
+    release.set()
+    await busy
+
+
+# ── cancellation ─────────────────────────────────────────────────────────────
+
+def test_until_cancelled_stops_and_closes_source():
+    closed = []
+
+    def gen():
+        try:
+            yield from "abc"
+        finally:
+            closed.append(True)
+
+    cancel = threading.Event()
+    received = []
+    with pytest.raises(GenerationCancelled):
+        for chunk in until_cancelled(gen(), cancel):
+            received.append(chunk)
+            cancel.set()
+    assert received == ["a"]
+    assert closed == [True]
+
+
+async def test_cancelled_queued_run_frees_its_slot():
+    executor = InferenceExecutor(workers=1, queue_size=1)
+    release = threading.Event()
+    busy = asyncio.create_task(executor.run(release.wait, 5))
+    queued_fn = MagicMock()
+    queued = asyncio.create_task(executor.run(queued_fn, cancel=threading.Event()))
+    await asyncio.sleep(0.01)
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert executor.stats()["queue_depth"] == 0
+    assert executor.stats()["cancelled"] == 1
+
+    release.set()
+    await busy
+    queued_fn.assert_not_called()
+
+
+async def test_cancelling_running_call_sets_its_event():
+    executor = InferenceExecutor(workers=1, queue_size=0)
+    started = threading.Event()
+    seen = []
+
+    def generate(cancel):
+        started.set()
+        seen.append(cancel.wait(5))
+
+    task = asyncio.create_task(executor.run(generate, cancel=threading.Event()))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    for _ in range(100):
+        if executor.stats()["running"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert seen == [True]
+    assert executor.stats()["running"] == 0
+
+
+async def test_closing_stream_early_closes_generator():
+    executor = InferenceExecutor(workers=1, queue_size=0)
+    closed = threading.Event()
+    pull = threading.Event()
+
+    def gen():
+        try:
+            for i in range(1000):
+                pull.wait(5)
+                yield i
+        finally:
+            closed.set()
+
+    stream = executor.stream(gen)
+    pull.set()
+    assert await stream.__anext__() == 0
+    await stream.aclose()
+    assert await asyncio.to_thread(closed.wait, 5)
+
+
+async def test_cancelling_unstarted_stream_drops_queued_job():
+    executor = InferenceExecutor(workers=1, queue_size=1)
+    release = threading.Event()
+    busy = asyncio.create_task(executor.run(release.wait, 5))
+    await asyncio.sleep(0.01)
+    gen = MagicMock()
+    stream = executor.stream(gen)
+
+    stream.cancel()
+    stream.cancel()  # idempotent
+    release.set()
+    await busy
+    gen.assert_not_called()
+    assert executor.stats()["cancelled"] == 1
+    assert executor.stats()["queue_depth"] == 0
+
+
+# ── Routes ───────────────────────────────────────────────────────────────────
+
+def test_chat_returns_503_with_retry_after_when_full(client):
+    with patch(
+        "dashboard.routes.agents.inference_executor.run",
+        side_effect=InferenceQueueFull(retry_after=9),
+    ):
+        response = client.post("/agents/timmy/chat", data={"message": "hello"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "9"
+    assert "Timmy is busy" in response.text
+    # Rejected messages never reach the history.
+    assert "hello" not in client.get("/agents/timmy/history").text
+
+
+def test_stream_returns_503_with_retry_after_when_full(client):
+    import re
+    partial = client.post("/agents/timmy/chat/stream", data={"message": "hello"})
+    url = re.search(r'data-stream="([^"]+)"', partial.text).group(1)
+
+    with patch(
+        "dashboard.routes.agents.inference_executor.stream",
+        side_effect=InferenceQueueFull(retry_after=4),
+    ):
+        response = client.get(url)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "4"
+
+
+def test_voice_returns_503_with_retry_after_when_full(client):
+    with patch(
+        "dashboard.routes.voice_enhanced.inference_executor.run",
+        side_effect=InferenceQueueFull(retry_after=3),
+    ):
+        response = client.post(
+            "/voice/enhanced/process",
+            data={"text": "tell me about bitcoin", "speak_response": "false"},
+        )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert response.json()["response"] is None
+
+
+def test_health_exposes_inference_metrics(client):
+    with patch("dashboard.routes.health.check_ollama", return_value=True):
+        data = client.get("/health").json()
+    assert "queue_depth" in data["inference"]
+    assert "wait_ms_avg" in data["inference"]
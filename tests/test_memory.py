@@ -0,0 +1,196 @@
+"""Tests for src/timmy/memory.py — vector-indexed long-term memory."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from timmy.memory import HashingEmbedder, MemoryIndex, OllamaEmbedder  # noqa: E402
+
+
+@pytest.fixture
+def index():
+    return MemoryIndex(HashingEmbedder(dim=256), max_entries=100)
+
+
+# ── embedder ─────────────────────────────────────────────────────────────────
+
+def test_hashing_embedder_is_deterministic_and_normalised():
+    vectors = HashingEmbedder(dim=64).embed(["lightning node alias", "lightning node alias", ""])
+    assert vectors.shape == (3, 64)
+    assert np.allclose(vectors[0], vectors[1])
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[2].any()
+
+
+def test_ollama_embedder_posts_batch_and_normalises():
+    response = MagicMock()
+    response.json.return_value = {"embeddings": [[3.0, 4.0]]}
+    with patch("httpx.post", return_value=response) as post:
+        vectors = OllamaEmbedder("nomic-embed-text").embed(["hi"])
+    assert post.call_args.kwargs["json"] == {"model": "nomic-embed-text", "input": ["hi"]}
+    assert post.call_args.args[0].endswith("/api/embed")
+    assert np.allclose(vectors, [[0.6, 0.8]])
+
+
+# ── index ────────────────────────────────────────────────────────────────────
+
+def test_search_ranks_relevant_exchange_first(index):
+    index.add("What is my lightning node alias?", "Sir, it is satoshi-basement.")
+    index.add("Recommend a pizza topping", "Pineapple, sir.")
+    index.add("How many sats in a bitcoin?", "One hundred million.")
+
+    hits = index.search("remind me of the lightning node alias", k=2)
+    assert hits[0].response == "Sir, it is satoshi-basement."
+    assert hits[0].score > hits[1].score
+
+
+def test_search_respects_scope_and_min_score(index):
+    index.add("my node alias", "satoshi-basement", scope="alice")
+    assert index.search("node alias", scope="bob") == []
+    assert index.search("node alias", scope="alice")[0].message == "my node alias"
+    assert index.search("unrelated pizza", scope="alice", min_score=0.5) == []
+
+
+def test_ring_overwrites_oldest_when_full():
+    index = MemoryIndex(HashingEmbedder(dim=64), max_entries=2)
+    for word in ("alpha", "bravo", "charlie"):
+        index.add(word, word)
+    assert len(index) == 2
+    hits = index.search("alpha bravo charlie", k=5, min_score=-1.0)
+    assert {h.message for h in hits} == {"bravo", "charlie"}
+
+
+def test_recall_block_skips_history_and_fits_budget(index):
+    index.add("node alias?", "satoshi-basement")
+    index.add("node colour?", "orange " * 200)
+    block = index.recall_block("node alias colour", budget_tokens=30)
+    assert "satoshi-basement" in block
+    assert "orange" not in block  # too big for the budget
+    assert index.recall_block("node alias", exclude="User: node alias?\n") == ""
+
+
+def test_persists_to_memmap_and_reloads(tmp_path):
+    path = str(tmp_path / "memory")
+    index = MemoryIndex(HashingEmbedder(dim=64), path=path, max_entries=10)
+    index.add("node alias?", "satoshi-basement")
+    assert (tmp_path / "memory.f32").exists()
+
+    reopened = MemoryIndex(HashingEmbedder(dim=64), path=path, max_entries=10)
+    assert len(reopened) == 1
+    assert reopened.search("node alias")[0].response == "satoshi-basement"
+    reopened.add("second", "entry")
+    assert len(reopened) == 2
+
+
+def test_reload_ignores_torn_line_and_other_embedder(tmp_path):
+    path = str(tmp_path / "memory")
+    MemoryIndex(HashingEmbedder(dim=64), path=path, max_entries=10).add("a", "b")
+    with open(tmp_path / "memory.jsonl", "a") as log:
+        log.write('{"seq": 1, "sco')
+    assert len(MemoryIndex(HashingEmbedder(dim=64), path=path, max_entries=10)) == 1
+    assert len(MemoryIndex(HashingEmbedder(dim=32), path=path, max_entries=10)) == 0
+
+
+@pytest.mark.parametrize("damage", ["delete", "truncate"])
+def test_missing_or_short_matrix_starts_a_fresh_index(tmp_path, damage):
+    path = str(tmp_path / "memory")
+    MemoryIndex(HashingEmbedder(dim=64), path=path, max_entries=10).add("a", "b")
+    matrix = tmp_path / "memory.f32"
+    if damage == "delete":
+        matrix.unlink()
+    else:
+        matrix.write_bytes(b"\0" * 8)
+
+    index = MemoryIndex(HashingEmbedder(dim=64), path=path, max_entries=10)
+    assert len(index) == 0
+    index.add("node alias?", "satoshi-basement")
+    reopened = MemoryIndex(HashingEmbedder(dim=64), path=path, max_entries=10)
+    assert [h.response for h in reopened.search("node alias")] == ["satoshi-basement"]
+
+
+def test_log_is_compacted(tmp_path):
+    path = str(tmp_path / "memory")
+    index = MemoryIndex(HashingEmbedder(dim=16), path=path, max_entries=2)
+    for i in range(10):
+        index.add(f"m{i}", f"r{i}")
+    lines = (tmp_path / "memory.jsonl").read_text().splitlines()
+    assert len(lines) <= 4
+    reopened = MemoryIndex(HashingEmbedder(dim=16), path=path, max_entries=2)
+    assert {h.message for h in reopened.search("m8 m9", k=2)} == {"m8", "m9"}
+
+
+# ── agent integration ────────────────────────────────────────────────────────
+
+def test_ollama_hooks_recall_and_record(index):
+    with patch("agno.agent.Agent") as MockAgent, \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb"), \
+         patch("timmy.agent.long_term_memory", return_value=index):
+        from timmy.agent import create_timmy
+        create_timmy(session_id="s1")
+
+    kwargs = MockAgent.call_args.kwargs
+    load_context, record_exchange = kwargs["pre_hooks"][0], kwargs["post_hooks"][0]
+    agent = MockAgent.return_value
+    run_output = MagicMock()
+    run_output.input.input_content_string.return_value = "What is my node alias?"
+    run_output.content = "Sir, satoshi-basement."
+    record_exchange(agent=agent, run_output=run_output)
+    assert index.search("node alias", scope="s1")[0].response == "Sir, satoshi-basement."
+
+    agent.reset()  # recent history gone — memory still recalls it
+    run_input = MagicMock()
+    run_input.input_content_string.return_value = "node alias again?"
+    load_context(agent=agent, run_input=run_input)
+    assert "Relevant earlier exchanges" in agent.additional_context
+    assert "satoshi-basement" in agent.additional_context
+
+
+def test_pooled_agent_keeps_each_sessions_memories_apart(index, tmp_path):
+    from dashboard.sessions import SessionStore, _blank, _synced
+
+    with patch("agno.agent.Agent") as MockAgent, \
+         patch("agno.models.ollama.Ollama"), \
+         patch("agno.db.sqlite.SqliteDb"), \
+         patch("timmy.agent.long_term_memory", return_value=index):
+        from timmy.agent import create_timmy
+        create_timmy()  # pooled: built with no session
+
+    kwargs = MockAgent.call_args.kwargs
+    load_context, record_exchange = kwargs["pre_hooks"][0], kwargs["post_hooks"][0]
+    agent = MockAgent.return_value
+    store = SessionStore(db_path=str(tmp_path / "sessions.db"))
+    alice, bob = store.get("a" * 32), store.get("b" * 32)
+    run_output = MagicMock()
+    run_output.input.input_content_string.return_value = "What is my node alias?"
+    run_output.content = "Sir, satoshi-basement."
+    run_input = MagicMock()
+    run_input.input_content_string.return_value = "node alias again?"
+
+    with _synced(agent, alice):
+        record_exchange(agent=agent, run_output=run_output)
+    with _synced(agent, bob):
+        load_context(agent=agent, run_input=run_input)
+        assert "satoshi-basement" not in (agent.additional_context or "")
+    with _blank(agent):
+        load_context(agent=agent, run_input=run_input)
+        assert "satoshi-basement" not in (agent.additional_context or "")
+    alice.log.append("user", "What is my node alias?", "10:00")
+    alice.log.append("agent", "Sir, satoshi-basement.", "10:00")
+    with _synced(agent, alice):
+        agent.reset()  # recent history gone — memory still recalls it
+        load_context(agent=agent, run_input=run_input)
+        assert "satoshi-basement" in agent.additional_context
+    assert index.search("node alias", scope="") == []
+
+
+def test_memory_errors_do_not_fail_the_turn():
+    from timmy.agent import memorize, recall
+
+    broken = MagicMock()
+    broken.add.side_effect = ConnectionError("ollama down")
+    broken.recall_block.side_effect = ConnectionError("ollama down")
+    memorize(broken, "q", "a", "")
+    assert recall(broken, "q", "", "") == ""
@@ -0,0 +1,129 @@
+"""Tests for src/timmy/ollama_client.py — shared client, warm-up, keep-alive."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from timmy.ollama_client import OllamaClient
+
+
+def _client(handler) -> OllamaClient:
+    return OllamaClient(
+        "http://ollama.test", "llama3.2", keep_alive="5m",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+async def test_ping_reuses_one_pooled_client():
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, text="Ollama is running")
+
+    client = _client(handler)
+    await client.start()
+    pooled = client._client
+    assert await client.ping() is True
+    assert await client.ping() is True
+    assert client._client is pooled
+    assert seen == ["/", "/"]
+    await client.close()
+    assert client._client is None
+
+
+async def test_ping_false_when_unreachable():
+    def handler(request):
+        raise httpx.ConnectError("refused")
+
+    assert await _client(handler).ping() is False
+
+
+async def test_warm_sends_preload_request_and_records_cold_then_warm():
+    bodies = []
+
+    def handler(request):
+        bodies.append((request.url.path, json.loads(request.content)))
+        return httpx.Response(200, json={"done": True})
+
+    client = _client(handler)
+    await client.start()
+    assert await client.warm() is not None
+    assert await client.warm() is not None
+    await client.close()
+
+    assert bodies[0] == ("/api/generate", {"model": "llama3.2", "keep_alive": "5m"})
+    stats = client.stats()
+    assert stats["cold_ms"] is not None
+    assert stats["warm_ms"] is not None
+    assert stats["warmups"] == 2
+
+
+async def test_warm_failure_is_counted_not_raised():
+    client = _client(lambda request: httpx.Response(500))
+    assert await client.warm() is None
+    assert client.stats()["failures"] == 1
+    assert client.stats()["cold_ms"] is None
+
+
+async def test_keep_alive_loop_only_pings_while_active():
+    client = _client(lambda request: httpx.Response(200))
+    client.warm = AsyncMock()
+
+    task = asyncio.create_task(client.keep_alive_loop(interval=0.01, active_window=60))
+    await asyncio.sleep(0.05)
+    assert client.warm.await_count == 0  # nobody has used the dashboard
+
+    client.touch()
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert client.warm.await_count >= 1
+
+
+# ── Dashboard integration ────────────────────────────────────────────────────
+
+def test_lifespan_opens_and_closes_shared_client():
+    from fastapi.testclient import TestClient
+    from dashboard.app import app
+    from timmy.ollama_client import ollama_client
+
+    with patch.object(ollama_client, "warm", new_callable=AsyncMock):
+        with TestClient(app):
+            assert ollama_client._client is not None
+        assert ollama_client._client is None
+
+
+def test_chat_requests_mark_dashboard_active(client):
+    from timmy.ollama_client import ollama_client
+    ollama_client._last_active = 0.0
+    agent = MagicMock()
+    agent.run.return_value = iter([MagicMock(content="Acknowledged.")])
+    with patch("dashboard.routes.agents.create_timmy", return_value=agent):
+        client.post("/agents/timmy/chat", data={"message": "hello"})
+    assert ollama_client.is_active(60)
+
+
+def test_page_loads_and_health_polling_are_not_activity(client):
+    from timmy.ollama_client import ollama_client
+    ollama_client._last_active = 0.0
+    client.get("/")
+    client.get("/health/status")
+    client.get("/health")
+    assert not ollama_client.is_active(60)
+
+
+def test_health_panel_shows_cold_and_warm_latency(client):
+    from timmy.ollama_client import ollama_client
+    with patch.object(ollama_client, "cold_ms", 4200.0), \
+         patch.object(ollama_client, "warm_ms", 35.0), \
+         patch("dashboard.routes.health.check_ollama", new_callable=AsyncMock, return_value=True):
+        response = client.get("/health/status")
+        data = client.get("/health").json()
+    assert "4200 ms" in response.text
+    assert "35 ms" in response.text
+    assert data["ollama"]["cold_ms"] == 4200.0
@@ -0,0 +1,155 @@
+"""Tests for src/timmy/prefix_cache.py — prefix KV reuse across AirLLM turns."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from timmy.prefix_cache import PrefixCache, crop_past_key_values, past_key_values_length
+
+
+class FakeCache:
+    """Mimics a HuggingFace DynamicCache: crop() and get_seq_length()."""
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+
+    def get_seq_length(self) -> int:
+        return self.length
+
+    def crop(self, length: int) -> None:
+        self.length = min(self.length, length)
+
+
+class FakeTensor:
+    """Tiny stand-in for a KV tensor with [..., :n, :] slicing on dim -2."""
+
+    def __init__(self, positions: int) -> None:
+        self.shape = (1, 8, positions, 64)
+
+    def __getitem__(self, index):
+        return FakeTensor(index[1].stop)
+
+
+# ── PrefixCache ──────────────────────────────────────────────────────────────
+
+def test_lookup_misses_when_empty():
+    cache = PrefixCache(min_reuse_tokens=1)
+    assert cache.lookup((1, 2, 3)) == (0, None)
+    assert cache.misses == 1
+
+
+def test_lookup_reuses_longest_common_prefix():
+    cache = PrefixCache(min_reuse_tokens=1)
+    cache.store((1, 2, 3, 4, 5, 6), FakeCache(6))
+    reused, pkv = cache.lookup((1, 2, 3, 9, 9))
+    assert reused == 3
+    assert pkv.get_seq_length() == 3
+
+
+def test_lookup_always_leaves_last_token_uncached():
+    cache = PrefixCache(min_reuse_tokens=1)
+    cache.store((1, 2, 3, 4), FakeCache(4))
+    reused, pkv = cache.lookup((1, 2, 3, 4))
+    assert reused == 3
+    assert pkv.get_seq_length() == 3
+
+
+def test_lookup_does_not_mutate_stored_entry():
+    cache = PrefixCache(min_reuse_tokens=1)
+    stored = FakeCache(6)
+    cache.store((1, 2, 3, 4, 5, 6), stored)
+    cache.lookup((1, 2, 7))
+    assert stored.length == 6
+
+
+def test_lookup_respects_min_reuse_tokens():
+    cache = PrefixCache(min_reuse_tokens=4)
+    cache.store((1, 2, 3, 4, 5), FakeCache(5))
+    assert cache.lookup((1, 2, 3, 9, 9)) == (0, None)
+
+
+def test_store_keys_by_positions_the_cache_covers():
+    """HF returns a cache one short of the final sequence — key must match that."""
+    cache = PrefixCache(min_reuse_tokens=1)
+    cache.store((1, 2, 3, 4, 5), FakeCache(4))
+    reused, _ = cache.lookup((1, 2, 3, 4, 5, 6))
+    assert reused == 4
+
+
+def test_lru_evicts_oldest_entry():
+    cache = PrefixCache(max_entries=1, min_reuse_tokens=1)
+    cache.store((1, 2, 3), FakeCache(3))
+    cache.store((7, 8, 9), FakeCache(3))
+    assert len(cache) == 1
+    assert cache.lookup((1, 2, 3, 4)) == (0, None)
+
+
+def test_legacy_tuple_cache_is_cropped():
+    legacy = ((FakeTensor(10), FakeTensor(10)), (FakeTensor(10), FakeTensor(10)))
+    assert past_key_values_length(legacy) == 10
+    cropped = crop_past_key_values(legacy, 4)
+    assert past_key_values_length(cropped) == 4
+
+
+# ── TimmyAirLLMAgent integration ─────────────────────────────────────────────
+
+class _Ids(list):
+    """List of token rows with the .shape attribute the agent reads."""
+
+    @property
+    def shape(self):
+        return (len(self), len(self[0]))
+
+
+def _agent_with_word_tokenizer():
+    """Agent whose tokenizer maps words to stable ints and records generate kwargs."""
+    with patch("timmy.backends.is_apple_silicon", return_value=False):
+        from timmy.backends import TimmyAirLLMAgent
+        agent = TimmyAirLLMAgent(model_size="8b")
+
+    vocab: dict[str, int] = {}
+
+    def tokenize(texts, **kwargs):
+        ids = [vocab.setdefault(w, len(vocab)) for w in texts[0].split()]
+        return {"input_ids": _Ids([ids])}
+
+    def generate(input_ids, **kwargs):
+        reply = [vocab.setdefault("ok", len(vocab))]
+        sequence = list(input_ids[0]) + reply
+        return SimpleNamespace(
+            sequences=[sequence], past_key_values=FakeCache(len(sequence) - 1)
+        )
+
+    model = MagicMock()
+    model.tokenizer.side_effect = tokenize
+    model.tokenizer.decode.return_value = "ok"
+    model.generate.side_effect = generate
+    agent._model = model
+    return agent
+
+
+def test_agent_reuses_prefix_on_second_turn():
+    agent = _agent_with_word_tokenizer()
+    agent.run("first question")
+    agent.run("second question")
+
+    first_kwargs = agent._model.generate.call_args_list[0].kwargs
+    second_kwargs = agent._model.generate.call_args_list[1].kwargs
+    assert "past_key_values" not in first_kwargs
+    assert second_kwargs["past_key_values"].get_seq_length() > 16
+    assert agent._prefix_cache.hits == 1
+
+
+def test_agent_prefix_cache_disabled_by_setting():
+    with patch("timmy.backends.settings.airllm_prefix_cache_entries", 0):
+        agent = _agent_with_word_tokenizer()
+    agent.run("first question")
+    agent.run("second question")
+    assert agent._prefix_cache is None
+    assert "past_key_values" not in agent._model.generate.call_args.kwargs
+
+
+def test_agent_prefix_cache_off_on_apple_silicon():
+    with patch("timmy.backends.is_apple_silicon", return_value=True):
+        from timmy.backends import TimmyAirLLMAgent
+        agent = TimmyAirLLMAgent(model_size="8b")
+    assert agent._prefix_cache is None
@@ -0,0 +1,127 @@
+"""Tests for src/dashboard/probes.py — shared, cached health probes."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from dashboard.probes import HealthMonitor, probe_redis, probe_swarm_db
+
+
+@pytest.fixture
+def monitor():
+    return HealthMonitor(interval=60.0, timeout=0.5)
+
+
+# ── monitor ──────────────────────────────────────────────────────────────────
+
+async def test_probes_map_to_up_down_and_off(monitor):
+    async def up():
+        return True
+
+    def down():
+        return False
+
+    monitor.register("a", up)
+    monitor.register("b", down)
+    monitor.register("c", lambda: None)
+    monitor.register("d", MagicMock(side_effect=RuntimeError("refused")))
+    snapshot = await monitor.refresh()
+
+    assert [snapshot.status(n) for n in "abcd"] == ["up", "down", "off", "down"]
+    assert snapshot.probes["d"].detail == "refused"
+    assert snapshot.status("unknown") == "down"
+
+
+async def test_probes_run_concurrently_under_their_own_timeouts(monitor):
+    async def slow():
+        await asyncio.sleep(0.2)
+        return True
+
+    async def hung():
+        await asyncio.sleep(10)
+
+    monitor.register("slow1", slow)
+    monitor.register("slow2", slow)
+    monitor.register("hung", hung, timeout=0.05)
+    start = time.perf_counter()
+    snapshot = await monitor.refresh()
+
+    assert time.perf_counter() - start < 0.35
+    assert snapshot.up("slow1") and snapshot.up("slow2")
+    assert snapshot.probes["hung"].detail.startswith("timed out")
+
+
+async def test_concurrent_callers_share_one_probe(monitor):
+    calls = 0
+
+    async def probe():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return True
+
+    monitor.register("ollama", probe)
+    snapshots = await asyncio.gather(*(monitor.snapshot() for _ in range(20)))
+    assert calls == 1
+    assert all(s is snapshots[0] for s in snapshots)
+
+    await monitor.snapshot()  # fresh — served from cache
+    assert calls == 1 and monitor.refreshes == 1
+
+
+async def test_stale_snapshot_is_refreshed(monitor):
+    probe = AsyncMock(return_value=True)
+    monitor.register("ollama", probe)
+    first = await monitor.snapshot()
+    first.taken_at -= 3 * 60.0
+    assert await monitor.snapshot() is not first
+    assert probe.await_count == 2
+
+
+def test_redis_is_off_on_in_memory_fallback():
+    comms = MagicMock(connected=False)
+    with patch("swarm.coordinator.coordinator", MagicMock(comms=comms)):
+        assert probe_redis() is None
+    comms.ping.assert_not_called()
+
+
+def test_swarm_db_probe_fails_on_a_missing_or_bogus_file(tmp_path):
+    import sqlite3
+
+    db = tmp_path / "swarm.db"
+    with patch("swarm.registry.DB_PATH", db):
+        with pytest.raises(sqlite3.OperationalError):
+            probe_swarm_db()
+        assert not db.exists()
+
+        db.write_text("not a database")
+        with pytest.raises(sqlite3.DatabaseError):
+            probe_swarm_db()
+
+        db.unlink()
+        sqlite3.connect(db).close()
+        assert probe_swarm_db() is True
+
+
+# ── routes ───────────────────────────────────────────────────────────────────
+
+def test_endpoints_share_one_snapshot(client):
+    with patch("dashboard.routes.health.check_ollama", new_callable=AsyncMock,
+               return_value=True) as check:
+        for _ in range(3):
+            client.get("/health/status")
+        client.get("/mobile/status")
+        data = client.get("/health").json()
+    assert check.await_count == 1
+    assert data["services"]["ollama"] == "up"
+    assert set(data["services"]) >= {"ollama", "swarm_db", "redis", "tts"}
+    assert data["health"]["age_s"] >= 0
+
+
+def test_mobile_status_reports_snapshot_age(client):
+    with patch("dashboard.routes.health.check_ollama", new_callable=AsyncMock, return_value=False):
+        data = client.get("/mobile/status").json()
+    assert data["ollama"] == "down"
+    assert "age_s" in data
@@ -0,0 +1,189 @@
+"""Tests for src/timmy/profiles.py — AirLLM size / compression selection."""
+
+import json
+import sys
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from timmy.profiles import Hardware, Profile, describe, estimate, resolve_profile
+
+GIB = 2**30
+runner = CliRunner()
+
+
+# ── cost model ───────────────────────────────────────────────────────────────
+
+def test_compression_shrinks_bytes_per_token():
+    hw = Hardware(ram_bytes=16 * GIB, disk_bps=2e9)
+    full, eight, four = (estimate("70b", c, hw) for c in ("none", "8bit", "4bit"))
+    assert full.disk_bytes_per_token == 2 * eight.disk_bytes_per_token == 4 * four.disk_bytes_per_token
+    assert full.seconds_per_token > eight.seconds_per_token > four.seconds_per_token
+
+
+def test_model_that_fits_half_of_ram_reads_nothing_from_disk():
+    hw = Hardware(ram_bytes=64 * GIB, disk_bps=None)
+    cost = estimate("8b", "none", hw)
+    assert cost.cached
+    assert cost.seconds_per_token is not None
+
+
+def test_unknown_disk_speed_leaves_streamed_cost_unknown():
+    cost = estimate("405b", "none", Hardware(ram_bytes=16 * GIB, disk_bps=None))
+    assert not cost.cached
+    assert cost.seconds_per_token is None
+
+
+# ── selection ────────────────────────────────────────────────────────────────
+
+def test_explicit_profile_skips_detection():
+    with patch("timmy.profiles.detect_hardware") as detect:
+        profile = resolve_profile("70b", "8bit")
+    detect.assert_not_called()
+    assert (profile.model_size, profile.compression) == ("70b", "8bit")
+
+
+def test_auto_prefers_largest_uncompressed_model_that_fits():
+    big = Hardware(ram_bytes=2048 * GIB, disk_bps=3e9)
+    with patch("timmy.profiles.settings.airllm_auto_token_seconds", 60.0):
+        profile = resolve_profile("auto", "auto", big)
+    assert (profile.model_size, profile.compression) == ("405b", "none")
+
+
+def test_auto_compression_trades_quality_for_speed_at_fixed_size():
+    laptop = Hardware(ram_bytes=32 * GIB, disk_bps=2e9)   # 70b: 141 GB → 35 GB at 4bit
+    with patch("timmy.profiles.settings.airllm_auto_token_seconds", 30.0):
+        assert resolve_profile("70b", "auto", laptop).compression == "4bit"
+    with patch("timmy.profiles.settings.airllm_auto_token_seconds", 120.0):
+        assert resolve_profile("70b", "auto", laptop).compression == "none"
+
+
+def test_auto_size_falls_back_to_cheapest_when_nothing_fits():
+    slow = Hardware(ram_bytes=4 * GIB, disk_bps=50e6)
+    with patch("timmy.profiles.settings.airllm_auto_token_seconds", 0.001):
+        profile = resolve_profile("auto", "none", slow)
+    assert profile.model_size == "8b"
+    assert "cheapest" in profile.reason
+
+
+def test_configured_disk_speed_skips_measurement(tmp_path):
+    from timmy.profiles import detect_hardware
+    with patch("timmy.profiles.settings.airllm_disk_mbps", 500.0), \
+         patch("timmy.profiles.measure_disk_throughput") as measure:
+        assert detect_hardware().disk_bps == 500e6
+    measure.assert_not_called()
+
+
+def test_measured_disk_speed_is_remembered(tmp_path, monkeypatch):
+    monkeypatch.setenv("HF_HOME", str(tmp_path / "hf"))
+    record = tmp_path / "hardware.json"
+    with patch("timmy.profiles._HARDWARE_FILE", record), \
+         patch("timmy.profiles.measure_disk_throughput", return_value=1.5e9) as measure:
+        from timmy.profiles import _disk_bps
+        assert _disk_bps() == (1.5e9, "")
+        assert _disk_bps(measure=False) == (1.5e9, "")
+    assert measure.call_count == 1
+    assert json.loads(record.read_text())["disk_bps"] == 1.5e9
+
+
+def test_disk_is_not_measured_unless_asked(tmp_path, monkeypatch):
+    from timmy.profiles import detect_hardware
+    monkeypatch.setenv("HF_HOME", str(tmp_path / "hf"))
+    with patch("timmy.profiles._HARDWARE_FILE", tmp_path / "hardware.json"), \
+         patch("timmy.profiles.measure_disk_throughput") as measure:
+        hardware = detect_hardware(measure=False)
+    measure.assert_not_called()
+    assert hardware.disk_bps is None
+    assert "--measure" in describe(Profile("405b", "none"), hardware)
+
+
+def test_disk_test_is_skipped_when_free_space_is_low(tmp_path, monkeypatch):
+    from timmy.profiles import detect_hardware
+    monkeypatch.setenv("HF_HOME", str(tmp_path / "hf"))
+    full = MagicMock(free=64 << 20)
+    with patch("timmy.profiles._HARDWARE_FILE", tmp_path / "hardware.json"), \
+         patch("timmy.profiles.shutil.disk_usage", return_value=full), \
+         patch("timmy.profiles.measure_disk_throughput") as measure:
+        hardware = detect_hardware()
+    measure.assert_not_called()
+    assert not (tmp_path / "hardware.json").exists()
+    assert "only 64 MiB free" in describe(Profile("405b", "none"), hardware)
+
+
+def test_measure_disk_throughput_reads_a_scratch_file(tmp_path):
+    from timmy.profiles import measure_disk_throughput
+    bps = measure_disk_throughput(tmp_path, sample_bytes=4 << 20)
+    if bps is not None:
+        assert bps > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_describe_reports_per_token_cost():
+    text = describe(Profile("70b", "4bit"), Hardware(ram_bytes=16 * GIB, disk_bps=2e9))
+    assert "70b-4bit" in text
+    assert "from disk per token" in text
+    assert "expected per-token cost: ≈" in text
+
+
+# ── wiring ───────────────────────────────────────────────────────────────────
+
+def test_airllm_agent_loads_compressed_weights():
+    from timmy.backends import _AIRLLM_MODELS, TimmyAirLLMAgent
+    with patch("timmy.backends.is_apple_silicon", return_value=False):
+        agent = TimmyAirLLMAgent(model_size="8b", compression="4bit")
+    sys.modules["airllm"].AutoModel.from_pretrained.assert_called_with(
+        _AIRLLM_MODELS["8b"], compression="4bit"
+    )
+    assert agent.profile.label == "8b-4bit"
+
+
+def test_airllm_agent_resolves_auto_size():
+    from timmy.backends import TimmyAirLLMAgent
+    with patch("timmy.backends.is_apple_silicon", return_value=False), \
+         patch("timmy.profiles.resolve_profile", return_value=Profile("8b", "8bit", "auto")):
+        agent = TimmyAirLLMAgent(model_size="auto")
+    assert agent.profile.model_size == "8b"
+    assert agent._model_size == "8b"
+
+
+def test_response_cache_key_separates_quantization():
+    from timmy.response_cache import ResponseCache
+    cache = ResponseCache(enabled=True)
+    plain = cache.key_for("status", backend="airllm")
+    with patch("timmy.response_cache.settings.airllm_quantization", "4bit"):
+        assert cache.key_for("status", backend="airllm") != plain
+
+
+def test_cli_quantization_option_sets_config_and_status_reports_cost():
+    from config import settings
+    from timmy.cli import app
+
+    hw = Hardware(ram_bytes=16 * GIB, disk_bps=2e9)
+    try:
+        with patch("timmy.agent.create_timmy", return_value=MagicMock()), \
+             patch("timmy.profiles.detect_hardware", return_value=hw):
+            result = runner.invoke(app, ["-q", "8bit", "status", "--backend", "airllm"])
+        assert result.exit_code == 0, result.output
+        assert settings.airllm_quantization == "8bit"
+        assert "expected per-token cost" in result.output
+    finally:
+        settings.airllm_quantization = "none"
+
+
+def test_cli_status_measures_disk_only_with_flag():
+    from timmy.cli import app
+
+    hw = Hardware(ram_bytes=16 * GIB, disk_bps=None, disk_note="not measured")
+    with patch("timmy.agent.create_timmy", return_value=MagicMock()), \
+         patch("timmy.profiles.detect_hardware", return_value=hw) as detect:
+        assert runner.invoke(app, ["status", "-b", "airllm", "-s", "70b"]).exit_code == 0
+        detect.assert_called_once_with(measure=False)
+        detect.reset_mock()
+        assert runner.invoke(app, ["status", "-b", "airllm", "-s", "70b", "--measure"]).exit_code == 0
+        detect.assert_called_once_with(measure=True)
+
+
+def test_cli_rejects_unknown_quantization():
+    from timmy.cli import app
+    result = runner.invoke(app, ["-q", "2bit", "status"])
+    assert result.exit_code != 0
@@ -0,0 +1,122 @@
+"""Tests for src/timmy/repl.py and `timmy repl`."""
+
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from rich.console import Console
+from typer.testing import CliRunner
+
+from timmy.cli import app
+from timmy.repl import Repl
+
+runner = CliRunner()
+
+
+def _agent(*chunks: str) -> MagicMock:
+    agent = MagicMock(spec=["run", "reset"])
+    agent.run.side_effect = lambda message, stream: iter([MagicMock(content=c) for c in chunks])
+    return agent
+
+
+def _repl(agent, loader=None) -> tuple[Repl, StringIO]:
+    out = StringIO()
+    loader = loader or MagicMock(return_value=agent)
+    return Repl("ollama", None, loader=loader, console=Console(file=out, width=100)), out
+
+
+def test_ask_streams_and_records_turn():
+    repl, out = _repl(_agent("Sir", ", **affirmative**."))
+    sample = repl.ask("status?")
+    assert "Sir, affirmative." in out.getvalue()
+    assert sample.tokens == 2
+    assert sample.ttft_ms is not None
+    assert sample.error is None
+    assert repl.turns == [sample]
+
+
+def test_ask_reports_backend_error_without_raising():
+    agent = MagicMock(spec=["run"])
+    agent.run.side_effect = ConnectionError("refused")
+    repl, out = _repl(agent)
+    assert repl.ask("hi").error == "refused"
+    assert "offline" in out.getvalue()
+
+
+def test_agent_built_once_across_turns():
+    loader = MagicMock(return_value=_agent("ok"))
+    repl, _ = _repl(None, loader=loader)
+    for _ in range(3):
+        repl.ask("again")
+    loader.assert_called_once_with("ollama", None)
+    assert len(repl.turns) == 3
+
+
+def test_reset_keeps_loaded_agent_when_it_supports_reset():
+    agent = _agent("ok")
+    loader = MagicMock(return_value=agent)
+    repl, _ = _repl(agent, loader=loader)
+    repl.ask("hi")
+    repl.command("/reset")
+    agent.reset.assert_called_once()
+    loader.assert_called_once()
+    assert repl.turns == []
+
+
+def test_reset_rebuilds_agent_without_reset_method():
+    loader = MagicMock(side_effect=lambda *a: MagicMock(spec=["run"]))
+    repl, _ = _repl(None, loader=loader)
+    first = repl.agent
+    repl.command("/reset")
+    assert repl.agent is not first
+    assert loader.call_count == 2
+
+
+def test_backend_command_shows_and_switches():
+    loader = MagicMock(return_value=_agent("ok"))
+    repl, out = _repl(None, loader=loader)
+    repl.command("/backend")
+    assert "Backend: ollama" in out.getvalue()
+    repl.command("/backend airllm")
+    loader.assert_called_with("airllm", None)
+    assert repl.backend == "airllm"
+    repl.command("/backend gpt")
+    assert repl.backend == "airllm"
+    assert "Unknown backend" in out.getvalue()
+
+
+def test_stats_table_lists_turns():
+    repl, out = _repl(_agent("a", "b", "c"))
+    repl.ask("one")
+    repl.ask("two")
+    repl.command("/stats")
+    text = out.getvalue()
+    assert "TTFT ms" in text
+    assert "tok/s" in text
+    assert "6" in text  # footer token total
+
+
+def test_exit_command_ends_loop():
+    repl, _ = _repl(_agent("ok"))
+    assert repl.command("/exit") is False
+    assert repl.command("/help") is True
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def test_cli_repl_runs_turns_and_stats():
+    agent = _agent("Sir", ", yes.")
+    with patch("timmy.agent.create_timmy", return_value=agent) as factory:
+        result = runner.invoke(app, ["repl", "--backend", "ollama"],
+                               input="hello\nagain\n/stats\n/exit\n")
+
+    assert result.exit_code == 0, result.output
+    factory.assert_called_once()
+    assert agent.run.call_count == 2
+    assert "Sir, yes." in result.output
+    assert "latency ms" in result.output
+
+
+def test_cli_repl_exits_on_eof():
+    with patch("timmy.agent.create_timmy", return_value=_agent("ok")):
+        result = runner.invoke(app, ["repl", "--backend", "ollama"], input="")
+    assert result.exit_code == 0, result.output
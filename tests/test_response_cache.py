@@ -0,0 +1,182 @@
+"""Tests for src/timmy/response_cache.py and its use in the chat routes."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from dashboard.store import Message
+from timmy.response_cache import ResponseCache, history_fingerprint, normalize_prompt
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(enabled=True)
+
+
+# ── keys ─────────────────────────────────────────────────────────────────────
+
+def test_normalize_folds_case_space_and_trailing_punctuation():
+    assert normalize_prompt("  What   can you DO?? ") == "what can you do"
+    assert normalize_prompt("Status.") == normalize_prompt("status")
+
+
+def test_key_separates_model_backend_and_history():
+    base = ResponseCache.key("status", "llama3.2", "ollama")
+    assert ResponseCache.key("Status?", "llama3.2", "ollama") == base
+    assert ResponseCache.key("status", "mistral", "ollama") != base
+    assert ResponseCache.key("status", "70b", "airllm") != base
+    assert ResponseCache.key("status", "llama3.2", "ollama", history="abc") != base
+
+
+def test_history_fingerprint_tracks_conversation():
+    empty = history_fingerprint([])
+    one = history_fingerprint([Message("user", "hi", "10:00")])
+    assert one != empty
+    assert history_fingerprint([Message("user", "hi", "11:30")]) == one  # timestamps ignored
+
+
+# ── lookup / eviction ────────────────────────────────────────────────────────
+
+def test_hit_and_miss_counters(cache):
+    key = cache.key("status", "llama3.2", "ollama")
+    assert cache.get(key) is None
+    cache.put(key, "All systems sovereign.")
+    assert cache.get(key) == "All systems sovereign."
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_disabled_cache_never_stores():
+    cache = ResponseCache(enabled=False)
+    cache.put("k", "v")
+    assert cache.get("k") is None
+    assert cache.stats()["misses"] == 0
+
+
+def test_blank_replies_are_not_cached(cache):
+    cache.put("k", "  \n")
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_ttl_expires_entries():
+    cache = ResponseCache(enabled=True, ttl=0.02)
+    cache.put("k", "v")
+    time.sleep(0.03)
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_byte_cap_evicts_least_recently_used():
+    cache = ResponseCache(enabled=True, max_bytes=3 * (1 + 10))
+    for key in "abc":
+        cache.put(key, "x" * 10)
+    cache.get("a")  # a is now most recently used
+    cache.put("d", "x" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+
+
+def test_oversized_reply_is_not_kept_in_memory():
+    cache = ResponseCache(enabled=True, max_bytes=8)
+    cache.put("k", "far too long to fit")
+    assert cache.stats()["entries"] == 0
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    db = str(tmp_path / "cache.db")
+    ResponseCache(enabled=True, db_path=db).put("k", "persisted")
+
+    reopened = ResponseCache(enabled=True, db_path=db)
+    assert reopened.get("k") == "persisted"
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.get("k") == "persisted"
+    assert reopened.stats()["disk_hits"] == 1  # promoted to memory
+
+
+def test_sqlite_tier_respects_ttl(tmp_path):
+    db = str(tmp_path / "cache.db")
+    ResponseCache(enabled=True, ttl=0.02, db_path=db).put("k", "stale")
+    time.sleep(0.03)
+    assert ResponseCache(enabled=True, ttl=0.02, db_path=db).get("k") is None
+
+
+# ── routes ───────────────────────────────────────────────────────────────────
+
+def test_chat_repeat_is_served_from_cache_without_queueing(client, cache):
+    agent = MagicMock()
+    agent.run.side_effect = lambda message, stream: iter([MagicMock(content="Operational.")])
+    with patch("dashboard.routes.agents.response_cache", cache), \
+         patch("dashboard.routes.agents.create_timmy", return_value=agent):
+        client.post("/agents/timmy/chat", data={"message": "status"})
+        client.delete("/agents/timmy/history")  # same (empty) history again
+        with patch("dashboard.routes.agents.inference_executor.run",
+                   new_callable=AsyncMock) as run:
+            response = client.post("/agents/timmy/chat", data={"message": "Status?"})
+
+    run.assert_not_called()
+    assert "Operational." in response.text
+    assert agent.run.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_chat_history_change_misses_cache(client, cache):
+    agent = MagicMock()
+    agent.run.side_effect = lambda message, stream: iter([MagicMock(content="Operational.")])
+    with patch("dashboard.routes.agents.response_cache", cache), \
+         patch("dashboard.routes.agents.create_timmy", return_value=agent):
+        client.post("/agents/timmy/chat", data={"message": "status"})
+        client.post("/agents/timmy/chat", data={"message": "status"})
+    assert agent.run.call_count == 2
+
+
+def test_agent_learns_exchanges_answered_from_cache(client, cache):
+    agent = MagicMock()
+    agent.run.side_effect = lambda message, stream: iter([MagicMock(content=message.upper())])
+    seen = [Message("user", "a", "t"), Message("agent", "A", "t")]
+    cache.put(cache.key_for("b", history=history_fingerprint(seen)), "cached b")
+    with patch("dashboard.routes.agents.response_cache", cache), \
+         patch("dashboard.routes.agents.create_timmy", return_value=agent):
+        client.post("/agents/timmy/chat", data={"message": "a"})
+        client.post("/agents/timmy/chat", data={"message": "b"})  # hit
+        client.post("/agents/timmy/chat", data={"message": "c"})
+
+    assert cache.stats()["hits"] == 1
+    assert agent.run.call_count == 2
+    agent.restore.assert_called_with([("a", "A"), ("b", "cached b")])
+
+
+def test_stream_replays_cached_reply(client, cache):
+    import re
+    cache.put(cache.key_for("ping", history=history_fingerprint([])), "pong")
+    with patch("dashboard.routes.agents.response_cache", cache), \
+         patch("dashboard.routes.agents.inference_executor.stream") as stream:
+        partial = client.post("/agents/timmy/chat/stream", data={"message": "ping"})
+        url = re.search(r'data-stream="([^"]+)"', partial.text).group(1)
+        response = client.get(url)
+
+    stream.assert_not_called()
+    assert "event: token\ndata: pong\n\n" in response.text
+    assert response.text.endswith("event: done\ndata: \n\n")
+
+
+def test_voice_repeat_hits_cache(client, cache):
+    agent = MagicMock()
+    agent.run.side_effect = lambda message, stream: iter([MagicMock(content="Bitcoin is money.")])
+    with patch("dashboard.routes.voice_enhanced.response_cache", cache), \
+         patch("dashboard.routes.voice_enhanced.create_timmy", return_value=agent):
+        for _ in range(3):
+            data = client.post("/voice/enhanced/process",
+                               data={"text": "tell me about Bitcoin"}).json()
+    assert data["response"] == "Bitcoin is money."
+    assert agent.run.call_count == 1
+
+
+def test_health_reports_cache_stats(client):
+    assert "hits" in client.get("/health").json()["response_cache"]
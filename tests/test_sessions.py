@@ -0,0 +1,273 @@
+"""Tests for src/dashboard/sessions.py — per-browser chat sessions."""
+
+import re
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from dashboard.sessions import SESSION_COOKIE, SessionStore, exchanges, session_store
+from dashboard.store import Message, MessageLog
+from timmy.pool import AgentPool
+
+
+def _factory():
+    factory = MagicMock()
+    factory.side_effect = lambda **kwargs: MagicMock(shared=False)
+    return factory
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(max_live=2, db_path=str(tmp_path / "sessions.db"))
+
+
+# ── store ────────────────────────────────────────────────────────────────────
+
+def test_exchanges_pair_answered_turns_only():
+    log = [
+        Message("user", "hi", "t"), Message("agent", "hello", "t"),
+        Message("user", "boom", "t"), Message("error", "offline", "t"),
+        Message("user", "again", "t"), Message("agent", "sir", "t"),
+    ]
+    assert exchanges(log) == [("hi", "hello"), ("again", "sir")]
+
+
+def test_lru_session_is_evicted_and_rehydrated_from_sqlite(store):
+    first = store.get("a" * 32)
+    first.log.append("user", "remember me", "10:00")
+    store.get("b" * 32)
+    store.get("c" * 32)  # over max_live — "a" is least recently used
+
+    assert store.stats()["live"] == 2
+    assert store.stats()["evicted"] == 1
+    again = store.get("a" * 32)
+    assert again is not first
+    assert [m.content for m in again.log.all()] == ["remember me"]
+    assert store.stats()["rehydrated"] == 1
+
+
+def test_log_is_a_ring_with_monotonic_ids():
+    log = MessageLog(max_entries=3)
+    ids = [log.append("user", str(i), "t").id for i in range(5)]
+    assert ids == sorted(ids) and len(set(ids)) == 5
+    assert [m.content for m in log.all()] == ["2", "3", "4"]
+    assert [m.content for m in log.page(before=ids[4], limit=2)] == ["2", "3"]
+
+
+def test_older_pages_come_from_sqlite_past_the_window(tmp_path):
+    store = SessionStore(db_path=str(tmp_path / "sessions.db"), window=4)
+    log = store.get("a" * 32).log
+    for i in range(10):
+        log.append("user", f"m{i}", "t")
+    assert [m.content for m in log.all()] == ["m6", "m7", "m8", "m9"]
+
+    newest = log.page(limit=3)
+    assert [m.content for m in newest] == ["m7", "m8", "m9"]
+    older = log.page(before=newest[0].id, limit=5)
+    assert [m.content for m in older] == ["m2", "m3", "m4", "m5", "m6"]
+    assert [m.content for m in log.page(before=older[0].id, limit=5)] == ["m0", "m1"]
+
+    reopened = SessionStore(db_path=store._db_path, window=4)
+    assert [m.id for m in reopened.get("a" * 32).log.all()] == [m.id for m in log.all()]
+
+
+def test_idle_sessions_are_evicted(tmp_path):
+    store = SessionStore(max_live=10, idle_seconds=0.01)
+    store.get("a" * 32)
+    time.sleep(0.02)
+    store.get("b" * 32)
+    assert store.stats()["live"] == 1
+
+
+def test_forget_clears_persisted_history(store):
+    session = store.get("a" * 32)
+    session.log.append("user", "secret", "10:00")
+    store.forget(session)
+    reopened = SessionStore(db_path=store._db_path)
+    assert reopened.get("a" * 32).log.all() == []
+
+
+def test_rebuilt_agent_is_seeded_with_session_history(store):
+    session = store.get("a" * 32)
+    session.log.append("user", "hi", "10:00")
+    session.log.append("agent", "hello", "10:00")
+    factory = _factory()
+
+    with store.agent(session, factory=factory) as agent:
+        pass
+    agent.restore.assert_called_once_with([("hi", "hello")])
+    assert factory.call_args.kwargs["session_id"] == "a" * 32
+    with store.agent(session, factory=factory) as again:
+        assert again is agent
+
+
+def test_agent_that_raised_is_rebuilt(store):
+    session = store.get("a" * 32)
+    factory = _factory()
+    with pytest.raises(RuntimeError):
+        with store.agent(session, factory=factory):
+            raise RuntimeError("wedged")
+    with store.agent(session, factory=factory):
+        pass
+    assert factory.call_count == 2
+
+
+def test_pooled_agent_is_reseeded_when_it_changes_sessions(store):
+    pool = AgentPool()
+    factory = _factory()
+    one, two = store.get("a" * 32), store.get("b" * 32)
+    two.log.append("user", "hi", "10:00")
+    two.log.append("agent", "hello", "10:00")
+
+    with patch("timmy.pool.agent_pool", pool), \
+         patch.object(AgentPool, "key_for", return_value=("airllm", "", "70b", "timmy.db")):
+        with store.agent(one, factory=factory) as agent:
+            agent.restore.assert_called_once_with([])
+        one.log.append("user", "yo", "10:00")
+        one.log.append("agent", "sir", "10:00")
+        with store.agent(one, factory=factory):
+            assert agent.restore.call_count == 1  # same session, in step — left alone
+        with store.agent(two, factory=factory) as again:
+            assert again is agent
+            agent.restore.assert_called_with([("hi", "hello")])
+    assert factory.call_count == 1
+
+
+def test_agent_behind_its_session_is_reseeded(store):
+    session = store.get("a" * 32)
+    factory = _factory()
+    with store.agent(session, factory=factory) as agent:
+        pass
+    # An exchange the agent never produced (e.g. a response-cache hit).
+    session.log.append("user", "hi", "10:00")
+    session.log.append("agent", "cached", "10:00")
+    session.log.append("user", "hi", "10:01")
+    session.log.append("agent", "cached", "10:01")
+    with store.agent(session, factory=factory):
+        agent.restore.assert_called_with([("hi", "cached"), ("hi", "cached")])
+    assert agent.restore.call_count == 2
+
+
+def test_one_shot_turn_runs_without_history_and_releases_the_agent(store):
+    pool = AgentPool()
+    factory = _factory()
+    session = store.get("a" * 32)
+    session.log.append("user", "secret", "10:00")
+    session.log.append("agent", "kept", "10:00")
+
+    with patch("timmy.pool.agent_pool", pool), \
+         patch.object(AgentPool, "key_for", return_value=("airllm", "", "70b", "timmy.db")):
+        with store.agent(session, factory=factory) as agent:
+            pass
+        with store.one_shot(factory=factory) as blank:
+            assert blank is agent
+            agent.restore.assert_called_with([])
+            assert agent.session_id is None
+        with store.agent(session, factory=factory):
+            agent.restore.assert_called_with([("secret", "kept")])
+
+
+def test_cascade_tiers_are_reseeded_per_session(store):
+    from timmy.cascade import CascadeRouter
+
+    pool = AgentPool()
+    tiers = {}
+
+    def tier_factory(db_file, backend, model_size):
+        tiers[backend] = MagicMock(shared=False)
+        tiers[backend].run.return_value = MagicMock(content=backend)
+        return tiers[backend]
+
+    router = CascadeRouter(factory=tier_factory, pool=AgentPool())
+    one, two = store.get("a" * 32), store.get("b" * 32)
+    one.log.append("user", "secret", "10:00")
+    one.log.append("agent", "kept", "10:00")
+
+    with patch("timmy.pool.agent_pool", pool), \
+         patch.object(pool, "key_for", return_value=("cascade", "", "", "timmy.db")):
+        with store.agent(one, factory=lambda **kw: router) as agent:
+            agent.run("hi")
+        tiers["ollama"].restore.assert_called_once_with([("secret", "kept")])
+        with store.agent(two, factory=lambda **kw: router) as agent:
+            agent.run("hi")
+        tiers["ollama"].restore.assert_called_with([])
+        assert tiers["ollama"].session_id == "b" * 32
+
+
+def test_shared_scheduler_gives_each_session_its_own_conversation(store):
+    from timmy.backends import TimmyAirLLMAgent
+    from timmy.batching import BatchScheduler
+
+    pool = AgentPool()
+    scheduler = BatchScheduler(MagicMock(spec=TimmyAirLLMAgent), max_wait_ms=1)
+    one, two = store.get("a" * 32), store.get("b" * 32)
+    one.log.append("user", "secret", "10:00")
+    one.log.append("agent", "kept", "10:00")
+
+    with patch("timmy.pool.agent_pool", pool), \
+         patch.object(pool, "key_for", return_value=("airllm", "", "8b", "timmy.db")):
+        with store.agent(one, factory=lambda **kw: scheduler) as mine:
+            assert mine is scheduler.conversation(one.id)
+            assert mine._history == ["User: secret", "Timmy: kept"]
+        with store.agent(two, factory=lambda **kw: scheduler) as theirs:
+            assert theirs is not mine and theirs._history == []
+        with store.one_shot(factory=lambda **kw: scheduler) as blank:
+            assert blank._history == [] and blank.session_id is None
+    assert mine._history == ["User: secret", "Timmy: kept"]
+
+
+# ── routes ───────────────────────────────────────────────────────────────────
+
+def _reply(text):
+    agent = MagicMock(shared=False)
+    agent.run.side_effect = lambda message, stream: iter([MagicMock(content=text)])
+    return agent
+
+
+def test_cookie_is_issued_once(client):
+    first = client.get("/agents/timmy/history")
+    assert SESSION_COOKIE in first.cookies
+    assert SESSION_COOKIE not in client.get("/agents/timmy/history").cookies
+
+
+def test_malformed_cookie_is_replaced(client):
+    client.cookies.set(SESSION_COOKIE, "../../etc")
+    response = client.get("/agents/timmy/history")
+    assert len(response.cookies[SESSION_COOKIE]) == 32
+
+
+def test_browsers_get_separate_histories_and_agents(client):
+    factory = MagicMock(side_effect=lambda **kwargs: _reply("Aye."))
+    with patch("dashboard.routes.agents.create_timmy", factory):
+        client.post("/agents/timmy/chat", data={"message": "alice here"})
+        client.cookies.clear()  # a second browser
+        client.post("/agents/timmy/chat", data={"message": "bob here"})
+        history = client.get("/agents/timmy/history").text
+
+    assert "bob here" in history
+    assert "alice here" not in history
+    assert factory.call_count == 2
+
+
+def test_health_reports_session_stats(client):
+    client.get("/agents/timmy/history")
+    assert client.get("/health").json()["sessions"]["live"] >= 1
+
+
+def test_history_pages_lazy_load_older_messages(client):
+    client.get("/agents/timmy/history")
+    log = session_store.get(client.cookies[SESSION_COOKIE]).log
+    for i in range(5):
+        log.append("user", f"msg-{i}", "t")
+
+    newest = client.get("/agents/timmy/history?limit=2").text
+    assert "msg-3" in newest and "msg-4" in newest and "msg-2" not in newest
+    older_url = re.search(r'hx-get="([^"]*before=[^"]*)"', newest).group(1).replace("&amp;", "&")
+
+    older = client.get(older_url).text
+    assert "msg-1" in older and "msg-2" in older and "msg-3" not in older
+    oldest = client.get(re.search(r'hx-get="([^"]*)"', older).group(1).replace("&amp;", "&")).text
+    assert "msg-0" in oldest
+    assert "before=" not in oldest
+    assert "Mission Control initialized" not in oldest
@@ -0,0 +1,129 @@
+"""Tests for src/timmy/shards.py — page-cache prewarm and layer prefetch."""
+
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from timmy.shards import LayerPrefetcher, evict, layer_shards, prewarm, readahead
+
+_LAYERS = ["model.embed_tokens", "model.layers.0", "model.layers.1",
+           "model.layers.10", "model.norm", "lm_head"]
+
+
+@pytest.fixture
+def shard_dir(tmp_path) -> Path:
+    for name in _LAYERS:
+        (tmp_path / f"{name}.safetensors").write_bytes(b"\0" * 4096)
+    return tmp_path
+
+
+def _model(root, names=None):
+    model = MagicMock()
+    model.checkpoint_path = root
+    model.layer_names = names
+    return model
+
+
+# ── discovery ────────────────────────────────────────────────────────────────
+
+def test_layer_shards_follow_layer_names(shard_dir):
+    paths = layer_shards(_model(shard_dir, _LAYERS))
+    assert [p.name for p in paths] == [f"{n}.safetensors" for n in _LAYERS]
+
+
+def test_layer_shards_fall_back_to_natural_order(shard_dir):
+    names = [p.name for p in layer_shards(_model(str(shard_dir)))]
+    assert names.index("model.layers.1.safetensors") < names.index("model.layers.10.safetensors")
+
+
+def test_layer_shards_empty_without_checkpoint_dir():
+    assert layer_shards(MagicMock()) == []
+    assert layer_shards(_model("/nonexistent/model")) == []
+
+
+# ── prewarm / evict ──────────────────────────────────────────────────────────
+
+def test_prewarm_reads_every_shard(shard_dir):
+    stats = prewarm(layer_shards(_model(shard_dir, _LAYERS)))
+    assert (stats.files, stats.bytes, stats.skipped) == (6, 6 * 4096, 0)
+
+
+def test_prewarm_stops_at_budget(shard_dir):
+    stats = prewarm(layer_shards(_model(shard_dir, _LAYERS)), budget_bytes=2 * 4096)
+    assert (stats.files, stats.skipped) == (2, 4)
+
+
+def test_readahead_falls_back_to_madvise(shard_dir, monkeypatch):
+    monkeypatch.delattr(os, "posix_fadvise", raising=False)
+    assert readahead(shard_dir / "lm_head.safetensors") == 4096
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="needs posix_fadvise")
+def test_evict_drops_each_shard(shard_dir):
+    assert evict(layer_shards(_model(shard_dir, _LAYERS))) == len(_LAYERS)
+
+
+# ── next-layer prefetch ──────────────────────────────────────────────────────
+
+def test_prefetcher_reads_next_layer_and_wraps(shard_dir):
+    paths = layer_shards(_model(shard_dir, _LAYERS))
+    prefetcher = LayerPrefetcher(paths)
+    prefetcher._queue = MagicMock()
+    prefetcher.ahead("model.layers.0")
+    prefetcher.ahead("lm_head")
+    prefetcher.ahead("unknown")
+    queued = [c.args[0].name for c in prefetcher._queue.put.call_args_list]
+    assert queued == ["model.layers.1.safetensors", "model.embed_tokens.safetensors"]
+
+
+def test_install_wraps_layer_loader(shard_dir):
+    model = _model(shard_dir, _LAYERS)
+    original = model.load_layer_to_cpu
+    prefetcher = LayerPrefetcher(layer_shards(model))
+    with patch.object(prefetcher, "ahead") as ahead:
+        assert prefetcher.install(model)
+        model.load_layer_to_cpu("model.layers.0")
+    ahead.assert_called_once_with("model.layers.0")
+    original.assert_called_once_with("model.layers.0")
+
+
+def test_install_skipped_without_hook(shard_dir):
+    model = _model(shard_dir, _LAYERS)
+    del model.load_layer_to_cpu
+    assert not LayerPrefetcher(layer_shards(model)).install(model)
+
+
+def test_airllm_agent_prewarms_when_enabled(shard_dir):
+    paths = [shard_dir / f"{n}.safetensors" for n in _LAYERS]
+    with patch("timmy.backends.is_apple_silicon", return_value=False), \
+         patch("timmy.shards.layer_shards", return_value=paths), \
+         patch("timmy.shards.prewarm") as warm, \
+         patch("timmy.shards.LayerPrefetcher") as prefetcher, \
+         patch("timmy.backends.settings") as settings:
+        settings.airllm_prewarm = True
+        settings.airllm_prefetch = True
+        settings.airllm_prefix_cache_entries = 0
+        settings.context_budget_tokens = 1024
+        settings.context_summary_tokens = 256
+        from timmy.backends import TimmyAirLLMAgent
+        agent = TimmyAirLLMAgent(model_size="8b")
+
+    warm.assert_called_once_with(paths)
+    prefetcher.return_value.install.assert_called_once()
+    assert agent.shards == paths
+
+
+# ── cold / warm bench ────────────────────────────────────────────────────────
+
+def test_cold_warm_bench_reports_both_runs(shard_dir):
+    from timmy.bench import format_cold_warm, run_cold_warm
+
+    paths = layer_shards(_model(shard_dir, _LAYERS))
+    report = run_cold_warm(lambda prompt: iter(["Sir", "."]), paths)
+    assert report.cold.tokens == report.warm.tokens == 2
+    assert report.shard_bytes == 6 * 4096
+    assert report.evicted == hasattr(os, "posix_fadvise")
+    text = format_cold_warm(report)
+    assert "cold TTFT" in text and "warm TTFT" in text
@@ -0,0 +1,51 @@
+"""Tests for src/dashboard/templating.py — the shared Jinja2 environment."""
+
+from unittest.mock import patch
+
+from dashboard.templating import TEMPLATES_DIR, _environment, precompile, templates
+
+
+def test_every_route_module_shares_one_environment():
+    from dashboard import app, fragments
+    from dashboard.routes import agents, health, mobile, mobile_test, swarm
+
+    for module in (app, fragments, agents, health, mobile, mobile_test, swarm):
+        assert module.templates is templates
+
+
+def test_precompile_loads_every_template():
+    expected = {p.relative_to(TEMPLATES_DIR).as_posix() for p in TEMPLATES_DIR.rglob("*.html")}
+    assert precompile() == len(expected)
+    assert {t.name for t in templates.env.cache.values()} >= expected
+
+
+def test_bytecode_cache_is_written_and_reused(tmp_path):
+    with patch("dashboard.templating.settings.dashboard_template_cache", str(tmp_path)):
+        env = _environment()
+    env.get_template("base.html")
+    cached = list(tmp_path.iterdir())
+    assert cached
+
+    with patch("dashboard.templating.settings.dashboard_template_cache", str(tmp_path)):
+        fresh = _environment()
+    with patch("jinja2.environment.Environment.compile", side_effect=AssertionError) as compile_:
+        fresh.get_template("base.html")
+    compile_.assert_not_called()
+
+
+def test_memory_only_environment_has_no_bytecode_cache():
+    with patch("dashboard.templating.settings.dashboard_template_cache", ""):
+        assert _environment().bytecode_cache is None
+
+
+def test_swarm_live_page_renders(client):
+    assert client.get("/swarm/live").status_code == 200
+
+
+def test_startup_bench_reports_cold_and_warm_cache():
+    from timmy.bench import format_startup, run_startup
+
+    report = run_startup()
+    assert report.templates > 0
+    assert report.cold.status == report.warm.status == 200
+    assert "warm cache" in format_startup(report)
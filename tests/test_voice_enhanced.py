@@ -54,7 +54,7 @@ class TestVoiceEnhancedProcess:
         mock_agent = MagicMock()
         mock_run = MagicMock()
         mock_run.content = "Hello from Timmy!"
-        mock_agent.run.return_value = mock_run
+        mock_agent.run.return_value = iter([mock_run])
 
         with patch("dashboard.routes.voice_enhanced.create_timmy", return_value=mock_agent):
             resp = client.post(
@@ -66,6 +66,18 @@ class TestVoiceEnhancedProcess:
         assert data["intent"] == "chat"
         assert data["response"] == "Hello from Timmy!"
 
+    def test_chat_fallback_ignores_chat_history(self, client):
+        chat_agent = MagicMock(shared=False)
+        chat_agent.run.side_effect = lambda message, stream: iter([MagicMock(content="hi")])
+        voice_agent = MagicMock(shared=False)
+        voice_agent.run.side_effect = lambda message, stream: iter([MagicMock(content="ok")])
+        with patch("dashboard.routes.agents.create_timmy", return_value=chat_agent), \
+             patch("dashboard.routes.voice_enhanced.create_timmy", return_value=voice_agent):
+            client.post("/agents/timmy/chat", data={"message": "my name is Alexander"})
+            client.post("/voice/enhanced/process", data={"text": "what is my name"})
+        voice_agent.restore.assert_called_once_with([])
+        chat_agent.run.assert_called_once()
+
     def test_chat_fallback_error_handling(self, client):
         """When the agent raises, the error should be captured gracefully."""
         with patch(